@@ -0,0 +1,12 @@
+from .cases import METHODS, Case, expand_cases
+from .registry import Scenario, get_scenario, scenario, scenario_names
+
+__all__ = [
+    "METHODS",
+    "Case",
+    "Scenario",
+    "expand_cases",
+    "get_scenario",
+    "scenario",
+    "scenario_names",
+]
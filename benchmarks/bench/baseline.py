@@ -0,0 +1,262 @@
+import fnmatch
+import math
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .cases import BENCHMARKS_ROOT, scenario_output
+from .phases import Phase, align_phases, detect_phases, slice_series
+from .timer_frames import load_timer_frames, timer_series
+
+BASELINE_ROOT = BENCHMARKS_ROOT / "baselines"
+TESTS: tuple[str, ...] = ("bootstrap", "mannwhitney")
+
+
+@dataclass
+class TimerComparison:
+    timer: str
+    baseline_median: float
+    current_median: float
+    change: float
+    # bootstrap: lower confidence bound of the relative change; mannwhitney: one-sided p-value.
+    evidence: float
+    gated: bool
+    regressed: bool
+    # where a gated timer or a gate pattern found nothing to compare, e.g. "current"; fails the gate
+    missing: str = ""
+
+
+def baseline_dir(scenario: str) -> Path:
+    return BASELINE_ROOT / scenario
+
+
+def update_baseline(scenario: str, case_ids: list[str] | None = None) -> list[Path]:
+    """Copy the current `timer_frames.json` of each case into the committed baseline tree."""
+    written = []
+    for case_dir in sorted(p for p in scenario_output(scenario).iterdir() if p.is_dir()):
+        src = case_dir / "timer_frames.json"
+        if not src.exists() or (case_ids and case_dir.name not in case_ids):
+            continue
+        dst = baseline_dir(scenario) / case_dir.name / "timer_frames.json"
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(src, dst)
+        written.append(dst)
+    return written
+
+
+def bootstrap_change_bound(
+    baseline: np.ndarray,
+    current: np.ndarray,
+    confidence: float,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> float:
+    """One-sided lower confidence bound of `median(current) / median(baseline) - 1`."""
+    rng = np.random.default_rng(seed)
+    b = rng.choice(baseline, size=(resamples, baseline.size), replace=True)
+    c = rng.choice(current, size=(resamples, current.size), replace=True)
+    b_med = np.median(b, axis=1)
+    c_med = np.median(c, axis=1)
+    ratios = c_med / np.maximum(b_med, np.finfo(float).tiny) - 1.0
+    return float(np.quantile(ratios, 1.0 - confidence))
+
+
+def mann_whitney_greater(x: np.ndarray, y: np.ndarray) -> float:
+    """One-sided Mann-Whitney U p-value for `x` being stochastically greater than `y`.
+
+    Uses the tie-corrected normal approximation, which is accurate for the
+    tens-to-hundreds of frames a benchmark run produces.
+    """
+    n1, n2 = x.size, y.size
+    values = np.concatenate([x, y])
+    order = np.argsort(values, kind="mergesort")
+    ranks = np.empty(values.size)
+    sorted_values = values[order]
+    i = 0
+    while i < values.size:
+        j = i
+        while j + 1 < values.size and sorted_values[j + 1] == sorted_values[i]:
+            j += 1
+        ranks[order[i : j + 1]] = 0.5 * (i + j) + 1.0
+        i = j + 1
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+
+    _, tie_counts = np.unique(values, return_counts=True)
+    n = n1 + n2
+    tie_term = (tie_counts**3 - tie_counts).sum() / (n * (n - 1)) if n > 1 else 0.0
+    sigma = math.sqrt(n1 * n2 / 12.0 * ((n + 1) - tie_term))
+    if sigma == 0.0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def compare_series(
+    baseline: dict[str, np.ndarray],
+    current: dict[str, np.ndarray],
+    gate: list[str],
+    threshold: float,
+    confidence: float,
+    test: str,
+    top: int,
+) -> list[TimerComparison]:
+    """Compare per-frame timer durations; timers matching a `gate` pattern can fail the run.
+
+    A gated timer regresses when its median slowed down by more than
+    `threshold` (relative) with the requested confidence. A gated timer
+    missing from the current run, or a pattern that matches no timer of the
+    baseline or of the current run (a typo, a renamed scope), fails too, so
+    the gate can not be switched off by accident.
+    """
+    if test not in TESTS:
+        raise ValueError(f"unknown test '{test}', expected one of {TESTS}")
+
+    common = [name for name in baseline if name in current]
+    gated = [name for name in common if any(_match(name, p) for p in gate)]
+    heaviest = sorted(
+        (name for name in common if name not in gated),
+        key=lambda name: -float(baseline[name].sum()),
+    )[:top]
+
+    results = []
+    for pattern in gate:
+        if not any(_match(name, pattern) for name in baseline):
+            in_current = any(_match(name, pattern) for name in current)
+            results.append(_missing(pattern, "baseline" if in_current else "baseline and current"))
+    for name in baseline:
+        if name not in current and any(_match(name, p) for p in gate):
+            results.append(_missing(name, "current", float(np.median(baseline[name]))))
+    for name in gated + heaviest:
+        b, c = baseline[name], current[name]
+        b_med, c_med = float(np.median(b)), float(np.median(c))
+        change = c_med / b_med - 1.0 if b_med > 0 else 0.0
+        if test == "bootstrap":
+            evidence = bootstrap_change_bound(b, c, confidence)
+            regressed = evidence > threshold
+        else:
+            evidence = mann_whitney_greater(c, b * (1.0 + threshold))
+            regressed = evidence < 1.0 - confidence
+        is_gated = name in gated
+        results.append(
+            TimerComparison(
+                timer=name,
+                baseline_median=b_med,
+                current_median=c_med,
+                change=change,
+                evidence=evidence,
+                gated=is_gated,
+                regressed=is_gated and regressed,
+            )
+        )
+    return results
+
+
+def _missing(timer: str, missing: str, baseline_median: float = math.nan) -> TimerComparison:
+    return TimerComparison(
+        timer=timer,
+        baseline_median=baseline_median,
+        current_median=math.nan,
+        change=math.nan,
+        evidence=math.nan,
+        gated=True,
+        regressed=True,
+        missing=missing,
+    )
+
+
+def _match(name: str, pattern: str) -> bool:
+    leaf = name.rsplit("/", 1)[-1]
+    return fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(leaf, pattern)
+
+
+def compare_case(
+    baseline_json: Path,
+    current_json: Path,
+    gate: list[str],
+    threshold: float = 0.05,
+    confidence: float = 0.95,
+    test: str = "bootstrap",
+    top: int = 8,
+) -> list[TimerComparison]:
+    baseline = timer_series(load_timer_frames(baseline_json))
+    current = timer_series(load_timer_frames(current_json))
+    return compare_series(baseline, current, gate, threshold, confidence, test, top)
+
+
+def compare_case_phases(
+    baseline_json: Path,
+    current_json: Path,
+    gate: list[str],
+    threshold: float = 0.05,
+    confidence: float = 0.95,
+    test: str = "bootstrap",
+    top: int = 8,
+) -> list[tuple[Phase, Phase | None, list[TimerComparison]]]:
+    """Like `compare_case`, but per phase: the baseline is segmented and the current run aligned to it.
+
+    A current run too short to hold every baseline phase gets `None` for the
+    phases it lacks, with every gate pattern reported missing, so a phase
+    that disappeared fails the gate instead of dropping out of it.
+    """
+    baseline_frames = load_timer_frames(baseline_json)
+    current_frames = load_timer_frames(current_json)
+    baseline_phases = detect_phases(baseline_frames)
+    current_phases = align_phases(baseline_phases, current_frames)
+    baseline = timer_series(baseline_frames)
+    current = timer_series(current_frames)
+    results = []
+    for i, bp in enumerate(baseline_phases):
+        if i >= len(current_phases):
+            results.append((bp, None, [_missing(pattern, "current phase") for pattern in gate]))
+            continue
+        cp = current_phases[i]
+        results.append(
+            (
+                bp,
+                cp,
+                compare_series(
+                    slice_series(baseline, bp),
+                    slice_series(current, cp),
+                    gate,
+                    threshold,
+                    confidence,
+                    test,
+                    top,
+                ),
+            )
+        )
+    return results
+
+
+def markdown_table(case_id: str, results: list[TimerComparison], test: str) -> str:
+    evidence_header = "CI low" if test == "bootstrap" else "p"
+    lines = [
+        f"### {case_id}",
+        "",
+        f"| timer | baseline (ms) | current (ms) | change | {evidence_header} | status |",
+        "|---|---:|---:|---:|---:|---|",
+    ]
+    for r in results:
+        if r.missing:
+            status = f"MISSING ({r.missing})"
+        elif r.regressed:
+            status = "REGRESSED"
+        elif r.gated:
+            status = "ok"
+        else:
+            status = "info"
+        if r.missing:
+            lines.append(f"| `{r.timer}` | {_ms(r.baseline_median)} | {_ms(r.current_median)} | - | - | {status} |")
+            continue
+        evidence = f"{r.evidence:+.1%}" if test == "bootstrap" else f"{r.evidence:.3g}"
+        lines.append(
+            f"| `{r.timer}` | {r.baseline_median * 1e3:.3f} | {r.current_median * 1e3:.3f} "
+            f"| {r.change:+.1%} | {evidence} | {status} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _ms(seconds: float) -> str:
+    return "-" if math.isnan(seconds) else f"{seconds * 1e3:.3f}"
@@ -0,0 +1,202 @@
+import json
+import statistics
+import struct
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from uipc import view
+from uipc.geometry import SimplicialComplex, SimplicialComplexIO, linemesh, tetmesh, trimesh
+
+from .asset_dir import AssetDir
+from .cases import BENCHMARKS_ROOT
+from .mesh_cache import SURFACE_STEPS, PreTransform, apply_steps, file_digest, read_mesh
+
+MAGIC = b"UIPCMESH"
+VERSION = 1
+SUFFIX = ".uimesh"
+# every array starts on a cache line so it can be memory-mapped and used in place
+ALIGN = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+# simplex collections by dimension, and their topology width
+COLLECTIONS: tuple[tuple[str, int], ...] = (("edges", 2), ("triangles", 3), ("tetrahedra", 4))
+# attributes written by the surface preprocessing steps, stored so readers can skip them
+LABELS: dict[str, tuple[str, ...]] = {
+    "vertices": ("is_surf",),
+    "edges": ("is_surf",),
+    "triangles": ("is_surf", "orient"),
+}
+_CONSTRUCTORS = {1: linemesh, 2: trimesh, 3: tetmesh}
+
+
+def default_binmesh_dir() -> Path:
+    return Path(AssetDir.output_path(BENCHMARKS_ROOT)) / "binmesh"
+
+
+def _collection(sc: SimplicialComplex, name: str):
+    return getattr(sc, name)()
+
+
+def mesh_arrays(sc: SimplicialComplex) -> dict[str, np.ndarray]:
+    """Positions, topology of every non-empty simplex collection and the surface labels of `sc`."""
+    arrays = {"positions": np.asarray(view(sc.positions()), dtype=np.float64).reshape(-1, 3)}
+    for name, width in COLLECTIONS:
+        collection = _collection(sc, name)
+        if collection.size() > 0:
+            arrays[name] = np.asarray(view(collection.topo()), dtype=np.int32).reshape(-1, width)
+    for name, labels in LABELS.items():
+        collection = _collection(sc, name)
+        for label in labels:
+            attr = collection.find(label)
+            if attr is not None and collection.size() > 0:
+                arrays[f"{name}/{label}"] = np.asarray(view(attr), dtype=np.int32).reshape(-1)
+    return arrays
+
+
+def write_binmesh(path: str | Path, arrays: dict[str, np.ndarray], meta: dict | None = None) -> Path:
+    """Write `arrays` as `MAGIC, version, header length, JSON header` followed by the aligned raw arrays."""
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+
+    dim = max([d for d, (name, _) in enumerate(COLLECTIONS, start=1) if name in arrays], default=0)
+    header = json.dumps({"dim": dim, "arrays": entries, "meta": meta or {}}).encode("utf-8")
+    data_start = -(-(_PREAMBLE.size + len(header)) // ALIGN) * ALIGN
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".partial")
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    tmp.replace(path)
+    return path
+
+
+def read_header(path: str | Path) -> tuple[dict, int]:
+    """The JSON header of a binary mesh and the file offset its arrays are relative to."""
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary mesh")
+        if version != VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+        header = json.loads(f.read(header_len))
+    return header, -(-(_PREAMBLE.size + header_len) // ALIGN) * ALIGN
+
+
+def open_arrays(path: str | Path) -> tuple[dict, dict[str, np.memmap]]:
+    """Memory-map every array of a binary mesh read-only; nothing is parsed or copied."""
+    header, data_start = read_header(path)
+    arrays = {
+        name: np.memmap(
+            path,
+            dtype=np.dtype(e["dtype"]),
+            mode="r",
+            offset=data_start + e["offset"],
+            shape=tuple(e["shape"]),
+        )
+        for name, e in header["arrays"].items()
+    }
+    return header, arrays
+
+
+def read_binmesh(path: str | Path) -> SimplicialComplex:
+    """Build a `SimplicialComplex` from a binary mesh, with its precomputed surface labels."""
+    header, arrays = open_arrays(path)
+    dim = header["dim"]
+    top, _ = COLLECTIONS[dim - 1]
+    sc = _CONSTRUCTORS[dim](arrays["positions"], arrays[top])
+
+    for name, _ in COLLECTIONS[: dim - 1]:
+        if name not in arrays:
+            continue
+        collection = _collection(sc, name)
+        if collection.size() != len(arrays[name]):
+            collection.resize(len(arrays[name]))
+        topo = view(collection.topo())
+        topo[:] = arrays[name].reshape(topo.shape)
+
+    for name, labels in LABELS.items():
+        collection = _collection(sc, name)
+        for label in labels:
+            key = f"{name}/{label}"
+            if key not in arrays:
+                continue
+            attr = collection.find(label)
+            if attr is None:
+                attr = collection.create(label, 0)
+            values = view(attr)
+            values[:] = arrays[key].reshape(values.shape)
+    return sc
+
+
+def binmesh_path(src: str | Path, out_dir: Path | None = None) -> Path:
+    src = Path(src)
+    return (out_dir or default_binmesh_dir()) / f"{src.name}{SUFFIX}"
+
+
+def convert(
+    src: str | Path,
+    dst: str | Path | None = None,
+    pre_transform: PreTransform = None,
+    steps: Iterable[str] = SURFACE_STEPS,
+) -> Path:
+    """Read a text mesh, run `steps` and store the result as a binary mesh (default: `binmesh_path(src)`)."""
+    steps = tuple(steps)
+    sc = read_mesh(src, pre_transform, steps)
+    meta = {"source": str(src), "source_sha256": file_digest(src), "steps": list(steps)}
+    return write_binmesh(dst or binmesh_path(src), mesh_arrays(sc), meta)
+
+
+def _median_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def benchmark(srcs: list[Path], repeat: int = 5, out_dir: Path | None = None) -> list[dict]:
+    """Median time of text parse, text parse + surface steps and binary read, per asset."""
+    rows = []
+    io = SimplicialComplexIO()
+    for src in srcs:
+        dst = convert(src, binmesh_path(src, out_dir))
+        rows.append(
+            {
+                "asset": src.name,
+                "text_bytes": src.stat().st_size,
+                "binary_bytes": dst.stat().st_size,
+                "text_read": _median_time(lambda: io.read(str(src)), repeat),
+                "text_read_labelled": _median_time(lambda: apply_steps(io.read(str(src)), SURFACE_STEPS), repeat),
+                "binary_read": _median_time(lambda: read_binmesh(dst), repeat),
+            }
+        )
+    return rows
+
+
+def benchmark_table(rows: list[dict]) -> str:
+    lines = [
+        "| asset | text (KiB) | binary (KiB) | text read (ms) | text read + labels (ms) | binary read (ms) | speedup |",
+        "|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    for r in rows:
+        speedup = r["text_read_labelled"] / r["binary_read"] if r["binary_read"] > 0 else float("inf")
+        lines.append(
+            f"| {r['asset']} | {r['text_bytes'] / 1024:.1f} | {r['binary_bytes'] / 1024:.1f} "
+            f"| {r['text_read'] * 1e3:.2f} | {r['text_read_labelled'] * 1e3:.2f} | {r['binary_read'] * 1e3:.2f} "
+            f"| {speedup:.1f}x |"
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,131 @@
+import itertools
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from .asset_dir import AssetDir
+
+BENCHMARKS_ROOT = Path(__file__).resolve().parent.parent
+METHODS: tuple[str, ...] = ("stackless_bvh", "info_stackless_bvh")
+
+
+@dataclass(frozen=True)
+class Case:
+    """One cell of the scenario x method x overrides matrix."""
+
+    scenario: str
+    method: str
+    frames: int
+    overrides: tuple[tuple[str, Any], ...] = ()
+    params: tuple[tuple[str, Any], ...] = ()
+    backend: str = "cuda"
+    # sample RSS / tracemalloc per frame; tracing slows the run, so memory runs get their own case id
+    memory: bool = False
+    # load the built scene from the scene cache when its fingerprint matches; same scene either way
+    scene_cache: bool = False
+
+    @property
+    def case_id(self) -> str:
+        parts = [self.method]
+        for key, value in self.params + self.overrides:
+            parts.append(f"{key.replace('/', '.')}={_slug(value)}")
+        if self.memory:
+            parts.append("memory")
+        return "__".join(parts)
+
+    def output_dir(self) -> Path:
+        return scenario_output(self.scenario) / self.case_id
+
+    def timer_frames_json(self) -> Path:
+        return self.output_dir() / "timer_frames.json"
+
+    def to_dict(self) -> dict:
+        return {
+            "scenario": self.scenario,
+            "method": self.method,
+            "frames": self.frames,
+            "overrides": [list(kv) for kv in self.overrides],
+            "params": [list(kv) for kv in self.params],
+            "backend": self.backend,
+            "memory": self.memory,
+            "scene_cache": self.scene_cache,
+        }
+
+    @staticmethod
+    def from_dict(d: dict) -> "Case":
+        return Case(
+            scenario=d["scenario"],
+            method=d["method"],
+            frames=int(d["frames"]),
+            overrides=tuple((k, v) for k, v in d.get("overrides", [])),
+            params=tuple((k, v) for k, v in d.get("params", [])),
+            backend=d.get("backend", "cuda"),
+            memory=bool(d.get("memory", False)),
+            scene_cache=bool(d.get("scene_cache", False)),
+        )
+
+
+def _slug(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":")).replace("/", "_")
+
+
+def scenario_output(scenario: str) -> Path:
+    return Path(AssetDir.output_path(BENCHMARKS_ROOT / scenario))
+
+
+def parse_values(text: str) -> list[Any]:
+    """Parse a comma separated CLI value list, e.g. `0.01,0.02` or `[[0],[-9.8],[0]]`."""
+    try:
+        values = json.loads(f"[{text}]")
+    except json.JSONDecodeError:
+        return [v.strip() for v in text.split(",")]
+    return values
+
+
+def parse_assignments(items: Iterable[str]) -> dict[str, list[Any]]:
+    """Parse repeated `key=v1,v2` CLI arguments into a value axis per key."""
+    axes: dict[str, list[Any]] = {}
+    for item in items:
+        key, sep, text = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"expected key=value, got '{item}'")
+        axes[key] = parse_values(text)
+    return axes
+
+
+def expand_cases(
+    scenarios: Iterable[str],
+    methods: Iterable[str],
+    frames: dict[str, int],
+    overrides: dict[str, list[Any]] | None = None,
+    params: dict[str, list[Any]] | None = None,
+    backend: str = "cuda",
+    memory: bool = False,
+    scene_cache: bool = False,
+) -> list[Case]:
+    """Expand the full scenario x method x overrides x params matrix."""
+    overrides = overrides or {}
+    params = params or {}
+    override_keys = sorted(overrides)
+    param_keys = sorted(params)
+    cases = []
+    for scenario_name in scenarios:
+        for method in methods:
+            for override_values in itertools.product(*(overrides[k] for k in override_keys)):
+                for param_values in itertools.product(*(params[k] for k in param_keys)):
+                    cases.append(
+                        Case(
+                            scenario=scenario_name,
+                            method=method,
+                            frames=frames[scenario_name],
+                            overrides=tuple(zip(override_keys, override_values)),
+                            params=tuple(zip(param_keys, param_values)),
+                            backend=backend,
+                            memory=memory,
+                            scene_cache=scene_cache,
+                        )
+                    )
+    return cases
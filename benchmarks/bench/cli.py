@@ -0,0 +1,551 @@
+import argparse
+import json
+from pathlib import Path
+
+from .cases import METHODS, Case, expand_cases, parse_assignments, scenario_output
+from .registry import get_scenario, scenario_names
+
+
+def _add_run_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "run",
+        help="Run a scenario x method x overrides matrix and write an N-way report per scenario.",
+    )
+    parser.add_argument("scenarios", nargs="+", help="Registered scenario names.")
+    parser.add_argument(
+        "--method",
+        action="append",
+        default=None,
+        help=f"collision_detection.method to run, repeatable (default: {', '.join(METHODS)}).",
+    )
+    parser.add_argument("--frames", type=int, default=None, help="Frames per case (default: per scenario).")
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="Config override axis, e.g. --set contact/d_hat=0.01,0.02. Repeatable.",
+    )
+    parser.add_argument(
+        "--param",
+        dest="params",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="Scenario parameter axis passed to create_scene, e.g. --param grid_x=5,10. Repeatable.",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="cuda",
+        help="Engine backend; 'none' is a stand-in engine for CPU-only boxes.",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Cases run concurrently, one per worker.")
+    parser.add_argument("--dry-run", action="store_true", help="List the cases and exit.")
+    parser.add_argument("--force", action="store_true", help="Rerun cases whose timer_frames.json exists.")
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Sample RSS and tracemalloc peaks per frame and around world.init/retrieve/stats.collect.",
+    )
+    parser.add_argument(
+        "--scene-cache",
+        action="store_true",
+        help="Load built scenes from output/benchmarks/scene_cache when their fingerprint matches.",
+    )
+
+
+def _add_baseline_parsers(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "compare-baseline",
+        help="Test current results against the committed baseline; exit 1 on a gated regression.",
+    )
+    parser.add_argument("scenario", type=str)
+    parser.add_argument("--case", action="append", default=None, help="Case ids to compare (default: all in baseline).")
+    parser.add_argument(
+        "--timer",
+        action="append",
+        default=None,
+        help="Gated timer path or leaf-name glob, e.g. '*Newton*'. Repeatable (default: whole frame).",
+    )
+    parser.add_argument("--threshold", type=float, default=0.05, help="Allowed relative slowdown of the median.")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--test", type=str, default="bootstrap", choices=("bootstrap", "mannwhitney"))
+    parser.add_argument("--top", type=int, default=8, help="Extra heaviest timers listed for information.")
+    parser.add_argument("--phases", action="store_true", help="Compare per detected phase instead of per run.")
+    parser.add_argument("--output", type=str, default=None, help="Markdown report path.")
+
+    parser = subparsers.add_parser("update-baseline", help="Store current results as the baseline.")
+    parser.add_argument("scenario", type=str)
+    parser.add_argument("--case", action="append", default=None)
+
+
+def _cmd_compare_baseline(args) -> None:
+    from .baseline import baseline_dir, compare_case, compare_case_phases, markdown_table
+    from .timer_frames import TOTAL
+
+    root = baseline_dir(args.scenario)
+    if not root.exists():
+        raise SystemExit(f"[benchmark] no baseline for '{args.scenario}' in {root}")
+    case_ids = args.case or sorted(p.name for p in root.iterdir() if (p / "timer_frames.json").exists())
+    gate = args.timer or [TOTAL]
+
+    report = [
+        f"## {args.scenario}: {args.test}, threshold {args.threshold:.0%}, confidence {args.confidence:.0%}",
+        "",
+    ]
+    regressions = []
+    for case_id in case_ids:
+        current = scenario_output(args.scenario) / case_id / "timer_frames.json"
+        if not current.exists():
+            report.append(f"### {case_id}\n\nmissing current result: `{current}`\n")
+            regressions.append(f"{case_id} (missing)")
+            continue
+        options = dict(threshold=args.threshold, confidence=args.confidence, test=args.test, top=args.top)
+        baseline_json = root / case_id / "timer_frames.json"
+        if args.phases:
+            for bp, cp, results in compare_case_phases(baseline_json, current, gate, **options):
+                current_frames = f"{cp.start}-{cp.stop - 1}" if cp is not None else "none"
+                title = f"{case_id}, phase {bp.index} (baseline {bp.start}-{bp.stop - 1}, current {current_frames})"
+                report.append(markdown_table(title, results, args.test))
+                regressions += [f"{case_id}[phase {bp.index}]: {r.timer}" for r in results if r.regressed]
+        else:
+            results = compare_case(baseline_json, current, gate, **options)
+            report.append(markdown_table(case_id, results, args.test))
+            regressions += [f"{case_id}: {r.timer}" for r in results if r.regressed]
+
+    text = "\n".join(report)
+    print(text)
+    output = Path(args.output) if args.output else scenario_output(args.scenario) / "baseline_compare.md"
+    output.write_text(text, encoding="utf-8")
+    if regressions:
+        print(f"[benchmark] regressions: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+def _cmd_update_baseline(args) -> None:
+    from .baseline import update_baseline
+
+    for path in update_baseline(args.scenario, args.case):
+        print(f"[benchmark] baseline written: {path}")
+
+
+def _add_phases_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "phases",
+        help="Split each case of a scenario into phases and report per-phase timings aligned to a reference case.",
+    )
+    parser.add_argument("scenario", type=str)
+    parser.add_argument("--case", action="append", default=None, help="Case ids; the first one is the reference.")
+    parser.add_argument("--timer", action="append", default=None, help="Timer paths to report (default: whole frame).")
+    parser.add_argument("--penalty", type=float, default=None, help="Change-point penalty (default: BIC-style).")
+    parser.add_argument("--min-size", type=int, default=5, help="Minimum frames per phase.")
+
+
+def _cmd_phases(args) -> None:
+    from .phases import align_phases, detect_phases, phase_medians, phase_table
+    from .timer_frames import TOTAL, load_timer_frames
+
+    output = scenario_output(args.scenario)
+    case_ids = args.case or sorted(p.name for p in output.iterdir() if (p / "timer_frames.json").exists())
+    if not case_ids:
+        raise SystemExit(f"[benchmark] no results in {output}")
+    frames = {case_id: load_timer_frames(output / case_id / "timer_frames.json") for case_id in case_ids}
+
+    reference_id = case_ids[0]
+    reference = detect_phases(frames[reference_id], penalty=args.penalty, min_size=args.min_size)
+    others = {}
+    for case_id in case_ids[1:]:
+        phases = align_phases(reference, frames[case_id], min_size=args.min_size)
+        others[case_id] = (phases, phase_medians(frames[case_id], phases))
+
+    text = phase_table(
+        reference_id,
+        reference,
+        others,
+        phase_medians(frames[reference_id], reference),
+        args.timer or [TOTAL],
+    )
+    print(text)
+    (output / "phases.md").write_text(text, encoding="utf-8")
+    with open(output / "phases.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                reference_id: [p.to_dict() for p in reference],
+                **{case_id: [p.to_dict() for p in phases] for case_id, (phases, _) in others.items()},
+            },
+            f,
+            indent=2,
+        )
+
+
+def _add_sweep_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "sweep",
+        help="Run a scenario at growing sizes and fit time per frame against bodies, vertices and active contacts.",
+    )
+    parser.add_argument("scenario", type=str)
+    parser.add_argument("--max-size", type=int, default=16, help="Largest size; sizes double from 1.")
+    parser.add_argument("--sizes", type=str, default=None, help="Explicit comma separated sizes.")
+    parser.add_argument(
+        "--size-param",
+        action="append",
+        default=None,
+        help="Scenario parameter set to the size (default: the scenario's size_params). Repeatable.",
+    )
+    parser.add_argument("--method", action="append", default=None)
+    parser.add_argument("--frames", type=int, default=None)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=V")
+    parser.add_argument("--param", dest="params", action="append", default=[], metavar="KEY=V1,V2")
+    parser.add_argument("--backend", type=str, default="cuda")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--scene-cache", action="store_true")
+
+
+def _cmd_sweep(args) -> None:
+    from .scheduler import describe, run_cases
+    from .sweep import collect_point, doubling_sizes, plot, sweep_cases, sweep_output, sweep_report, write_csv
+
+    s = get_scenario(args.scenario)
+    sizes = [int(v) for v in args.sizes.split(",")] if args.sizes else doubling_sizes(args.max_size)
+    cases_by_size = sweep_cases(
+        args.scenario,
+        tuple(args.size_param or s.size_params),
+        sizes,
+        args.method or list(METHODS),
+        args.frames if args.frames is not None else s.frames,
+        overrides=parse_assignments(args.overrides),
+        backend=args.backend,
+        params=parse_assignments(args.params),
+        scene_cache=args.scene_cache,
+    )
+    cases = [case for size_cases in cases_by_size.values() for case in size_cases]
+    print(f"[benchmark] sweep sizes {sizes}, {len(cases)} case(s)")
+    if args.dry_run:
+        describe(cases, args.jobs, force=args.force)
+        return
+
+    done, failed = run_cases(cases, jobs=args.jobs, force=args.force)
+    finished = {case.case_id for case in done}
+    points = [
+        collect_point(case, size)
+        for size, size_cases in cases_by_size.items()
+        for case in size_cases
+        if case.case_id in finished
+    ]
+
+    output = sweep_output(args.scenario)
+    text = sweep_report(args.scenario, points)
+    print(text)
+    (output / "sweep.md").write_text(text, encoding="utf-8")
+    write_csv(points, output / "sweep.csv")
+    if plot(points, output / "sweep.png"):
+        print(f"[benchmark] plot written to: {output / 'sweep.png'}")
+    else:
+        print("[benchmark] matplotlib not available, skipping plot")
+
+    for case, error in failed:
+        print(f"[benchmark] FAILED {case.scenario}/{case.case_id}: {error}")
+    if failed:
+        raise SystemExit(1)
+
+
+def _add_startup_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "startup",
+        help="Time scene construction, SceneIO save/load and world.init separately at growing sizes.",
+    )
+    parser.add_argument("scenario", type=str)
+    parser.add_argument("--sizes", type=str, default="1", help="Comma separated sizes, e.g. 1,4,18.")
+    parser.add_argument(
+        "--size-param",
+        action="append",
+        default=None,
+        help="Scenario parameter set to the size (default: the scenario's size_params). Repeatable.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per size; medians are reported.")
+    parser.add_argument("--method", type=str, default=METHODS[0])
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=V")
+    parser.add_argument(
+        "--param",
+        dest="params",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="Scenario parameter axis, e.g. --param instanced=false,true. Repeatable.",
+    )
+    parser.add_argument("--format", dest="formats", action="append", default=None, help="SceneIO format, repeatable.")
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="none",
+        help="Engine backend for world.init (default: the CPU-only stand-in).",
+    )
+    parser.add_argument(
+        "--scene-cache",
+        action="store_true",
+        help="Load built scenes from output/benchmarks/scene_cache when their fingerprint matches.",
+    )
+
+
+def _cmd_startup(args) -> None:
+    from .startup import FORMATS, startup_output, startup_point, startup_report, write_points
+    from .sweep import sweep_cases
+
+    s = get_scenario(args.scenario)
+    sizes = [int(v) for v in args.sizes.split(",")]
+    cases_by_size = sweep_cases(
+        args.scenario,
+        tuple(args.size_param or s.size_params),
+        sizes,
+        [args.method],
+        0,
+        overrides=parse_assignments(args.overrides),
+        backend=args.backend,
+        params=parse_assignments(args.params),
+        scene_cache=args.scene_cache,
+    )
+    formats = tuple(args.formats or FORMATS)
+    points = []
+    for size, size_cases in cases_by_size.items():
+        for case in size_cases:
+            print(f"[benchmark] startup {args.scenario}/{case.case_id} x{args.repeat}")
+            points.append(startup_point(case, size, args.repeat, formats))
+
+    output = startup_output(args.scenario)
+    text = startup_report(args.scenario, points)
+    print(text)
+    (output / "startup.md").write_text(text, encoding="utf-8")
+    write_points(points, output / "startup.json")
+    print(f"[benchmark] startup report written to: {output}")
+
+
+def _add_mesh_cache_parser(subparsers) -> None:
+    parser = subparsers.add_parser("mesh-cache", help="Inspect, trim or clear the preprocessed mesh cache.")
+    parser.add_argument("--dir", type=str, default=None, help="Cache folder (default: output/benchmarks/mesh_cache).")
+    parser.add_argument("--evict", type=float, default=None, metavar="MiB", help="Trim the cache to this size.")
+    parser.add_argument("--clear", action="store_true", help="Remove every entry.")
+
+
+def _cmd_mesh_cache(args) -> None:
+    from .mesh_cache import MeshCache
+
+    cache = MeshCache(Path(args.dir) if args.dir else None)
+    if args.clear:
+        print(f"[benchmark] removed {cache.clear()} entries")
+    elif args.evict is not None:
+        removed = cache.evict(int(args.evict * 2**20))
+        print(f"[benchmark] evicted {len(removed)} entries")
+    entries = cache.entries()
+    print(f"[benchmark] {cache.root}: {len(entries)} entries, {sum(e[1] for e in entries) / 2**20:.2f} MiB")
+
+
+def _add_binmesh_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "binmesh",
+        help="Convert text meshes to the memory-mappable binary format, or benchmark it against the text readers.",
+    )
+    parser.add_argument("action", choices=("convert", "bench"))
+    parser.add_argument(
+        "meshes",
+        nargs="*",
+        help="Mesh files (default: the wrecking-ball, bunny and cloth assets).",
+    )
+    parser.add_argument("--out", type=str, default=None, help="Output folder (default: output/benchmarks/binmesh).")
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+def _cmd_binmesh(args) -> None:
+    from .asset_dir import AssetDir
+    from .binmesh import benchmark, benchmark_table, binmesh_path, convert, default_binmesh_dir
+
+    tetmesh_dir = Path(AssetDir.tetmesh_path())
+    trimesh_dir = Path(AssetDir.trimesh_path())
+    meshes = [Path(m) for m in args.meshes] or [
+        tetmesh_dir / "cube.msh",
+        tetmesh_dir / "ball.msh",
+        tetmesh_dir / "link.msh",
+        tetmesh_dir / "bunny0.msh",
+        trimesh_dir / "grid80x80.obj",
+    ]
+    out_dir = Path(args.out) if args.out else None
+    if args.action == "convert":
+        for mesh in meshes:
+            print(f"[benchmark] {mesh} -> {convert(mesh, binmesh_path(mesh, out_dir))}")
+        return
+
+    text = benchmark_table(benchmark(meshes, repeat=args.repeat, out_dir=out_dir))
+    print(text)
+    report = (out_dir or default_binmesh_dir()) / "binmesh.md"
+    report.write_text(text, encoding="utf-8")
+    print(f"[benchmark] report written to: {report}")
+
+
+def _add_history_parser(subparsers) -> None:
+    parser = subparsers.add_parser("history", help="Query the benchmark history database.")
+    parser.add_argument("--db", type=str, default=None, help="SQLite file (default: output/benchmarks/history.sqlite).")
+    queries = parser.add_subparsers(dest="query", required=True)
+
+    trend = queries.add_parser("trend", help="A timer's median per run over time.")
+    trend.add_argument("scenario", type=str)
+    trend.add_argument("--timer", type=str, default=None, help="Timer path (default: whole frame).")
+    trend.add_argument("--method", type=str, default=None)
+    trend.add_argument("--host", type=str, default=None)
+    trend.add_argument("--last", type=int, default=50, help="Number of most recent runs.")
+
+    slowest = queries.add_parser("slowest", help="Slowest timers per git revision.")
+    slowest.add_argument("--scenario", type=str, default=None)
+    slowest.add_argument("--rev", type=str, default=None, help="Revision prefix.")
+    slowest.add_argument("--top", type=int, default=10)
+
+
+def _cmd_history(args) -> None:
+    from .history import HistoryStore, slowest_table, trend_table
+    from .timer_frames import TOTAL
+
+    store = HistoryStore(Path(args.db) if args.db else None)
+    if args.query == "trend":
+        rows = store.trend(args.scenario, args.timer or TOTAL, method=args.method, host=args.host, limit=args.last)
+        first = store.first_medians(args.scenario, args.timer or TOTAL, method=args.method, host=args.host)
+        print(trend_table(rows, first))
+    else:
+        print(slowest_table(store.slowest(scenario=args.scenario, revision=args.rev, top=args.top)))
+    store.close()
+
+
+def _add_export_trace_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "export-trace",
+        help="Convert timer_frames.json to a speedscope or Chrome trace-event profile.",
+    )
+    parser.add_argument("timer_frames", type=str, help="timer_frames.json or a case output folder.")
+    parser.add_argument("--format", type=str, default="speedscope", choices=("speedscope", "chrome"))
+    parser.add_argument("-o", "--output", type=str, default=None, help="Output file (default: next to the input).")
+    parser.add_argument("--first", type=int, default=0, help="First frame to export.")
+    parser.add_argument("--count", type=int, default=None, help="Number of frames to export.")
+
+
+def _cmd_export_trace(args) -> None:
+    from .timer_frames import load_timer_frames
+    from .trace_export import to_chrome_trace, to_speedscope
+
+    src = Path(args.timer_frames)
+    if src.is_dir():
+        src = src / "timer_frames.json"
+    frames = load_timer_frames(src)
+    stop = None if args.count is None else args.first + args.count
+    frames = frames[args.first : stop]
+    name = src.parent.name
+    if args.format == "speedscope":
+        profile = to_speedscope(frames, name=name, first_index=args.first)
+        default = src.with_name("timer_frames.speedscope.json")
+    else:
+        profile = to_chrome_trace(frames, name=name, first_index=args.first)
+        default = src.with_name("timer_frames.trace.json")
+    output = Path(args.output) if args.output else default
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(profile, f)
+    print(f"[benchmark] {len(frames)} frame(s) exported to: {output}")
+
+
+def _cmd_list(args) -> None:
+    for name in scenario_names():
+        s = get_scenario(name)
+        print(f"{name:<24} frames={s.frames:<5} {s.description}")
+
+
+def _cmd_run(args) -> None:
+    from .scheduler import describe, run_cases
+
+    methods = args.method or list(METHODS)
+    frames = {
+        name: args.frames if args.frames is not None else get_scenario(name).frames
+        for name in args.scenarios
+    }
+    cases = expand_cases(
+        args.scenarios,
+        methods,
+        frames,
+        overrides=parse_assignments(args.overrides),
+        params=parse_assignments(args.params),
+        backend=args.backend,
+        memory=args.memory,
+        scene_cache=args.scene_cache,
+    )
+    print(f"[benchmark] {len(cases)} case(s), {args.jobs} job(s)")
+    if args.dry_run:
+        describe(cases, args.jobs, force=args.force)
+        return
+
+    from .runner import compare
+
+    done, failed = run_cases(cases, jobs=args.jobs, force=args.force)
+    for scenario_name in args.scenarios:
+        comparison_map = {
+            case.case_id: case.timer_frames_json()
+            for case in done
+            if case.scenario == scenario_name
+        }
+        if not comparison_map:
+            continue
+        nway_dir = scenario_output(scenario_name) / "nway_compare"
+        compare(comparison_map, nway_dir)
+        print(f"[benchmark] N-way report written to: {nway_dir}")
+
+    for case, error in failed:
+        print(f"[benchmark] FAILED {case.scenario}/{case.case_id}: {error}")
+    if failed:
+        raise SystemExit(1)
+
+
+def _cmd_run_case(args) -> None:
+    from .runner import run_case, setup_logging
+    from .scheduler import pin_to_cpus
+
+    if args.cpus:
+        pin_to_cpus([int(c) for c in args.cpus.split(",")])
+    setup_logging()
+    run_case(Case.from_dict(json.loads(args.case)), record_history=not args.no_history)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="bench",
+        description="No-GUI libuipc benchmark harness over registered scenarios.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List registered scenarios.")
+    _add_run_parser(subparsers)
+    _add_baseline_parsers(subparsers)
+    _add_phases_parser(subparsers)
+    _add_sweep_parser(subparsers)
+    _add_startup_parser(subparsers)
+    _add_mesh_cache_parser(subparsers)
+    _add_binmesh_parser(subparsers)
+    _add_history_parser(subparsers)
+    _add_export_trace_parser(subparsers)
+    run_case_parser = subparsers.add_parser("run-case", help="Run one serialized case (internal use).")
+    run_case_parser.add_argument("case", type=str, help="Case as JSON.")
+    run_case_parser.add_argument("--cpus", type=str, default=None, help="Comma separated CPU affinity.")
+    run_case_parser.add_argument("--no-history", action="store_true", help="Do not record the run in the history.")
+
+    args = parser.parse_args(argv)
+    commands = {
+        "list": _cmd_list,
+        "run": _cmd_run,
+        "run-case": _cmd_run_case,
+        "compare-baseline": _cmd_compare_baseline,
+        "update-baseline": _cmd_update_baseline,
+        "phases": _cmd_phases,
+        "sweep": _cmd_sweep,
+        "startup": _cmd_startup,
+        "mesh-cache": _cmd_mesh_cache,
+        "binmesh": _cmd_binmesh,
+        "history": _cmd_history,
+        "export-trace": _cmd_export_trace,
+    }
+    commands[args.command](args)
@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import json
+import platform
+import sqlite3
+import subprocess
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+from .asset_dir import AssetDir
+from .cases import BENCHMARKS_ROOT, Case
+from .timer_frames import TOTAL, load_timer_frames, timer_series
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario TEXT NOT NULL,
+    method TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    config TEXT NOT NULL,
+    host TEXT NOT NULL,
+    git_rev TEXT NOT NULL,
+    git_dirty INTEGER NOT NULL,
+    uipc_version TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    frames INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS timers (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    timer TEXT NOT NULL,
+    median REAL NOT NULL,
+    mean REAL NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (run_id, timer)
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (scenario, method, config_hash, host, git_rev);
+CREATE INDEX IF NOT EXISTS timers_timer ON timers (timer);
+"""
+
+
+def default_db_path() -> Path:
+    return Path(AssetDir.output_path(BENCHMARKS_ROOT)) / "history.sqlite"
+
+
+def config_hash(config: dict, params: dict) -> str:
+    blob = json.dumps({"config": config, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def git_revision() -> tuple[str, bool]:
+    """`(revision, dirty)` of the samples checkout, or `("unknown", False)` outside git."""
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"],
+            cwd=BENCHMARKS_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BENCHMARKS_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return rev, bool(status.strip())
+
+
+def uipc_version() -> str:
+    try:
+        return metadata.version("pyuipc")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class HistoryStore:
+    """Append-only SQLite store of benchmark runs with per-timer summaries."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path is not None else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # several workers may finish at once; wait for the write lock instead of failing
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record(self, case: Case, config: dict, timer_frames_json: Path) -> int:
+        """Append one finished case and the median/mean/total of each of its timers."""
+        series = timer_series(load_timer_frames(timer_frames_json))
+        rev, dirty = git_revision()
+        params = dict(case.params)
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (scenario, method, case_id, config_hash, config, host, git_rev, git_dirty, "
+                "uipc_version, backend, frames, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    case.scenario,
+                    case.method,
+                    case.case_id,
+                    config_hash(config, params),
+                    json.dumps({"config": config, "params": params}, sort_keys=True, default=str),
+                    platform.node(),
+                    rev,
+                    int(dirty),
+                    uipc_version(),
+                    case.backend,
+                    case.frames,
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO timers (run_id, timer, median, mean, total) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, name, float(np.median(values)), float(values.mean()), float(values.sum()))
+                    for name, values in series.items()
+                    if values.size
+                ],
+            )
+        return run_id
+
+    def trend(
+        self,
+        scenario: str,
+        timer: str = TOTAL,
+        method: str | None = None,
+        host: str | None = None,
+        limit: int = 50,
+    ) -> list[tuple]:
+        """Median of `timer` per run over time: `(created_at, git_rev, dirty, method, config_hash, host, median)`."""
+        query = (
+            "SELECT r.created_at, r.git_rev, r.git_dirty, r.method, r.config_hash, r.host, t.median "
+            "FROM runs r JOIN timers t ON t.run_id = r.id WHERE r.scenario = ? AND t.timer = ?"
+        )
+        args: list = [scenario, timer]
+        if method is not None:
+            query += " AND r.method = ?"
+            args.append(method)
+        if host is not None:
+            query += " AND r.host = ?"
+            args.append(host)
+        query += " ORDER BY r.id DESC LIMIT ?"
+        args.append(limit)
+        return list(reversed(self.conn.execute(query, args).fetchall()))
+
+    def first_medians(
+        self,
+        scenario: str,
+        timer: str = TOTAL,
+        method: str | None = None,
+        host: str | None = None,
+    ) -> dict[tuple[str, str], float]:
+        """Median of `timer` in the first recorded run of every method and config: `{(method, config_hash): median}`."""
+        query = (
+            "SELECT r.method, r.config_hash, t.median FROM runs r JOIN timers t ON t.run_id = r.id "
+            "WHERE r.id IN (SELECT MIN(r.id) FROM runs r JOIN timers t ON t.run_id = r.id "
+            "WHERE r.scenario = ? AND t.timer = ?"
+        )
+        args: list = [scenario, timer]
+        if method is not None:
+            query += " AND r.method = ?"
+            args.append(method)
+        if host is not None:
+            query += " AND r.host = ?"
+            args.append(host)
+        query += " GROUP BY r.method, r.config_hash) AND t.timer = ?"
+        args.append(timer)
+        return {(m, chash): median for m, chash, median in self.conn.execute(query, args)}
+
+    def slowest(
+        self,
+        scenario: str | None = None,
+        revision: str | None = None,
+        top: int = 10,
+    ) -> dict[str, list[tuple[str, float, int]]]:
+        """Per git revision, the `top` timers by mean per-frame median: `{rev: [(timer, median, runs)]}`."""
+        query = (
+            "SELECT r.git_rev, t.timer, AVG(t.median), COUNT(*), MIN(r.id) FROM runs r "
+            "JOIN timers t ON t.run_id = r.id WHERE t.timer != ?"
+        )
+        args: list = [TOTAL]
+        if scenario is not None:
+            query += " AND r.scenario = ?"
+            args.append(scenario)
+        if revision is not None:
+            query += " AND r.git_rev LIKE ?"
+            args.append(f"{revision}%")
+        query += " GROUP BY r.git_rev, t.timer"
+        rows = self.conn.execute(query, args).fetchall()
+
+        first_run: dict[str, int] = {}
+        for rev, _, _, _, run_id in rows:
+            first_run[rev] = min(run_id, first_run.get(rev, run_id))
+        out: dict[str, list[tuple[str, float, int]]] = {}
+        for rev in sorted(first_run, key=first_run.get):
+            timers = sorted((r for r in rows if r[0] == rev), key=lambda r: -r[2])[:top]
+            out[rev] = [(timer, median, runs) for _, timer, median, runs, _ in timers]
+        return out
+
+
+def trend_table(rows: list[tuple], first: dict[tuple[str, str], float] | None = None) -> str:
+    """Markdown table of `HistoryStore.trend` rows.
+
+    "vs first" is the change against `first` (see `HistoryStore.first_medians`);
+    a method/config missing from it falls back to its oldest row shown.
+    """
+    lines = [
+        "| date | revision | method | config | host | median (ms) | vs first |",
+        "|---|---|---|---|---|---:|---:|",
+    ]
+    first = dict(first or {})
+    for created_at, rev, dirty, method, chash, host, median in rows:
+        ref = first.setdefault((method, chash), median)
+        change = f"{median / ref - 1.0:+.1%}" if ref > 0 else "-"
+        rev_text = f"{rev}{'+' if dirty else ''}"
+        lines.append(f"| {created_at} | {rev_text} | {method} | {chash} | {host} | {median * 1e3:.3f} | {change} |")
+    return "\n".join(lines) + "\n"
+
+
+def slowest_table(per_revision: dict[str, list[tuple[str, float, int]]]) -> str:
+    lines = []
+    for rev, rows in per_revision.items():
+        lines += [f"### {rev}", "", "| timer | median (ms) | runs |", "|---|---:|---:|"]
+        lines += [f"| `{timer}` | {median * 1e3:.3f} | {runs} |" for timer, median, runs in rows]
+        lines.append("")
+    return "\n".join(lines)
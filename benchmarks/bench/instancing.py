@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from uipc import view
+from uipc.geometry import SimplicialComplex
+
+# ABD mass density used when an entry carries none (AffineBodyConstitution's default).
+DEFAULT_DENSITY = 1e3
+
+
+@dataclass
+class InstanceGroup:
+    """All entries of one mesh as columns: positions (N, 3), rotations in degrees (N, 3), flags and densities (N,)."""
+
+    mesh: str
+    positions: np.ndarray
+    rotations: np.ndarray
+    is_fixed: np.ndarray
+    density: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def group_entries(entries: list[dict]) -> dict[str, InstanceGroup]:
+    """Group `wrecking_ball.json`-style entries by `mesh`, keeping their order within each group."""
+    rows: dict[str, list[dict]] = {}
+    for entry in entries:
+        rows.setdefault(entry["mesh"], []).append(entry)
+    return {
+        mesh: InstanceGroup(
+            mesh=mesh,
+            positions=np.array([e.get("position", (0.0, 0.0, 0.0)) for e in group], dtype=np.float64).reshape(-1, 3),
+            rotations=np.array([e.get("rotation", (0.0, 0.0, 0.0)) for e in group], dtype=np.float64).reshape(-1, 3),
+            is_fixed=np.array([int(e.get("is_dof_fixed", 0)) for e in group], dtype=np.int32),
+            density=np.array([e.get("density", DEFAULT_DENSITY) for e in group], dtype=np.float64),
+        )
+        for mesh, group in rows.items()
+    }
+
+
+def euler_to_matrices(positions: np.ndarray, rotations: np.ndarray) -> np.ndarray:
+    """(N, 4, 4) rigid transforms from positions and XYZ Euler angles in degrees.
+
+    Matches `build_mesh`: the rotation is `Rz * Ry * Rx`, applied before the translation.
+    """
+    a, b, c = np.radians(rotations).T
+    ca, sa = np.cos(a), np.sin(a)
+    cb, sb = np.cos(b), np.sin(b)
+    cc, sc = np.cos(c), np.sin(c)
+
+    m = np.zeros((len(positions), 4, 4))
+    m[:, 0, 0] = cc * cb
+    m[:, 0, 1] = cc * sb * sa - sc * ca
+    m[:, 0, 2] = cc * sb * ca + sc * sa
+    m[:, 1, 0] = sc * cb
+    m[:, 1, 1] = sc * sb * sa + cc * ca
+    m[:, 1, 2] = sc * sb * ca - cc * sa
+    m[:, 2, 0] = -sb
+    m[:, 2, 1] = cb * sa
+    m[:, 2, 2] = cb * ca
+    m[:, :3, 3] = positions
+    m[:, 3, 3] = 1.0
+    return m
+
+
+def instance_geometry(mesh: SimplicialComplex, group: InstanceGroup) -> SimplicialComplex:
+    """One copy of `mesh` with an instance per entry of `group`.
+
+    Transforms and `is_fixed` are written through their views in one go;
+    `density` is kept as an instance attribute alongside them.
+    """
+    geo = mesh.copy()
+    geo.instances().resize(len(group))
+    view(geo.transforms())[:] = euler_to_matrices(group.positions, group.rotations)
+    is_fixed = view(geo.instances().find("is_fixed"))
+    is_fixed[:] = group.is_fixed.reshape(is_fixed.shape)
+    density_attr = geo.instances().find("density")
+    if density_attr is None:
+        density_attr = geo.instances().create("density", DEFAULT_DENSITY)
+    density = view(density_attr)
+    density[:] = group.density.reshape(density.shape)
+    return geo
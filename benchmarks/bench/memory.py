@@ -0,0 +1,109 @@
+import os
+import resource
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from .timer_frames import TOTAL, frame_metric, load_timer_frames, timer_series
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryProbe:
+    """Samples process RSS and the Python `tracemalloc` peak around named scopes and per frame.
+
+    tracemalloc keeps a single peak, which every scope resets; the peak seen so
+    far is folded into the frame and into every enclosing scope first, so the
+    frame `py_peak` covers the whole frame and nested scopes do not hide each
+    other's allocations.
+    """
+
+    def __init__(self, trace_python: bool = True):
+        self.trace_python = trace_python
+        self._frame_peak = 0
+        self._open: list[int] = []  # running peaks of the scopes currently entered
+        if trace_python and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _py_peak(self) -> int:
+        return tracemalloc.get_traced_memory()[1] if self.trace_python else 0
+
+    def _reset_py_peak(self) -> None:
+        if self.trace_python:
+            tracemalloc.reset_peak()
+
+    def _fold_py_peak(self) -> None:
+        peak = self._py_peak()
+        self._frame_peak = max(self._frame_peak, peak)
+        self._open = [max(p, peak) for p in self._open]
+
+    @contextmanager
+    def scope(self, out: dict, name: str):
+        """Record `{rss_before, rss_after, rss_delta, py_peak}` of the enclosed block into `out[name]`."""
+        self._fold_py_peak()
+        self._reset_py_peak()
+        self._open.append(0)
+        before = rss_bytes()
+        try:
+            yield
+        finally:
+            after = rss_bytes()
+            self._fold_py_peak()
+            out[name] = {
+                "rss_before": before,
+                "rss_after": after,
+                "rss_delta": after - before,
+                "py_peak": self._open.pop(),
+            }
+
+    def begin_frame(self) -> None:
+        self._reset_py_peak()
+        self._frame_peak = 0
+
+    def end_frame(self) -> dict:
+        self._fold_py_peak()
+        return {"rss": rss_bytes(), "peak_rss": peak_rss_bytes(), "py_peak": self._frame_peak}
+
+    def stop(self) -> None:
+        if self.trace_python and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def memory_table(comparison_map: dict[str, Path]) -> str | None:
+    """Markdown table of memory next to duration for every case that recorded memory."""
+    rows = []
+    for case_id, path in comparison_map.items():
+        frames = load_timer_frames(path)
+        rss = frame_metric(frames, "rss")
+        if rss is None:
+            continue
+        py_peak = frame_metric(frames, "py_peak")
+        peak_rss = frame_metric(frames, "peak_rss")
+        duration = float(np.median(timer_series(frames)[TOTAL]))
+        rows.append(
+            f"| {case_id} | {duration * 1e3:.3f} | {np.median(rss) / 2**20:.1f} | {peak_rss.max() / 2**20:.1f} "
+            f"| {(rss[-1] - rss[0]) / 2**20:+.1f} | {py_peak.max() / 2**20:.2f} |"
+        )
+    if not rows:
+        return None
+    header = [
+        "| case | time/frame (ms) | RSS median (MiB) | RSS peak (MiB) | RSS growth (MiB) | Python peak/frame (MiB) |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    return "\n".join(header + rows) + "\n"
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+
+from uipc import Transform, view
+from uipc.core import Scene, SceneIO
+from uipc.geometry import (
+    SimplicialComplex,
+    SimplicialComplexIO,
+    flip_inward_triangles,
+    label_surface,
+    label_triangle_orient,
+)
+
+from .asset_dir import AssetDir
+from .cases import BENCHMARKS_ROOT
+
+# Bump when the stored layout or a step's behavior changes, so stale entries stop matching.
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def _label_surface(sc: SimplicialComplex) -> SimplicialComplex:
+    label_surface(sc)
+    return sc
+
+
+def _label_triangle_orient(sc: SimplicialComplex) -> SimplicialComplex:
+    label_triangle_orient(sc)
+    return sc
+
+
+# Preprocessing steps by name; a step takes a mesh and returns the processed mesh.
+STEPS: dict[str, Callable[[SimplicialComplex], SimplicialComplex]] = {
+    "label_surface": _label_surface,
+    "label_triangle_orient": _label_triangle_orient,
+    "flip_inward_triangles": flip_inward_triangles,
+}
+# What `process_surface` in the samples does.
+SURFACE_STEPS: tuple[str, ...] = ("label_surface", "label_triangle_orient", "flip_inward_triangles")
+
+
+def default_cache_dir() -> Path:
+    return Path(AssetDir.output_path(BENCHMARKS_ROOT)) / "mesh_cache"
+
+
+_digests: dict[tuple[str, int, int], str] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's content, memoized per process on (path, mtime, size)."""
+    st = os.stat(path)
+    memo_key = (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+    with _digests_lock:
+        digest = _digests.get(memo_key)
+    if digest is not None:
+        return digest
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digests_lock:
+        _digests[memo_key] = digest
+    return digest
+
+
+def apply_steps(sc: SimplicialComplex, steps: Iterable[str]) -> SimplicialComplex:
+    for step in steps:
+        if step not in STEPS:
+            raise KeyError(f"unknown preprocessing step '{step}', available: {', '.join(STEPS)}")
+        sc = STEPS[step](sc)
+    return sc
+
+
+# A pre-transform is a `Transform` or its 4x4 matrix; plain matrices can cross process boundaries.
+PreTransform = Transform | np.ndarray | None
+
+
+def transform_matrix(pre_transform: PreTransform) -> np.ndarray | None:
+    if pre_transform is None:
+        return None
+    matrix = pre_transform.matrix() if isinstance(pre_transform, Transform) else pre_transform
+    return np.ascontiguousarray(matrix, dtype=np.float64).reshape(4, 4)
+
+
+def read_mesh(
+    path: str | Path,
+    pre_transform: PreTransform = None,
+    steps: Iterable[str] = SURFACE_STEPS,
+) -> SimplicialComplex:
+    """Uncached `SimplicialComplexIO(pre_transform).read(path)` followed by `steps`."""
+    if isinstance(pre_transform, Transform):
+        sc = SimplicialComplexIO(pre_transform).read(str(path))
+    else:
+        sc = SimplicialComplexIO().read(str(path))
+        matrix = transform_matrix(pre_transform)
+        if matrix is not None:
+            positions = view(sc.positions())
+            positions[:] = matrix[:3, :3] @ positions + matrix[:3, 3:]
+    return apply_steps(sc, steps)
+
+
+class MeshCache:
+    """Content-addressed on-disk cache of preprocessed meshes.
+
+    An entry is keyed by the SHA-256 of the mesh file, the pre-transform matrix
+    and the preprocessing steps, and holds the processed `SimplicialComplex`
+    with all its attributes as a single-geometry SceneIO `.bson`. Hits refresh
+    the entry's mtime; once the cache grows past `max_bytes` the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, root: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # load() runs on the worker threads of `load_meshes`
+        self._stats_lock = threading.Lock()
+
+    def key(self, path: str | Path, pre_transform: PreTransform, steps: Iterable[str]) -> str:
+        h = hashlib.sha256()
+        h.update(f"v{CACHE_VERSION}\0{file_digest(path)}\0{Path(path).suffix.lower()}\0".encode())
+        matrix = transform_matrix(pre_transform)
+        if matrix is not None:
+            h.update(matrix.tobytes())
+        h.update("\0".join(steps).encode())
+        return h.hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bson"
+
+    def get(self, key: str) -> SimplicialComplex | None:
+        entry = self.entry_path(key)
+        if not entry.exists():
+            return None
+        # entries are only ever replaced atomically, so an existing file is complete
+        scene = SceneIO.load(str(entry))
+        os.utime(entry)
+        # the only geometry of a fresh scene gets id 0
+        slot, _ = scene.geometries().find(0)
+        return slot.geometry().copy()
+
+    def put(self, key: str, sc: SimplicialComplex) -> Path:
+        entry = self.entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        scene = Scene()
+        scene.objects().create("mesh").geometries().create(sc)
+        fd, tmp = tempfile.mkstemp(suffix=".bson", dir=entry.parent)
+        os.close(fd)
+        try:
+            SceneIO(scene).save(tmp)
+            os.replace(tmp, entry)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+        return entry
+
+    def load(
+        self,
+        path: str | Path,
+        pre_transform: PreTransform = None,
+        steps: Iterable[str] = SURFACE_STEPS,
+    ) -> SimplicialComplex:
+        """`read_mesh(path, pre_transform, steps)`, served from the cache when possible."""
+        steps = tuple(steps)
+        key = self.key(path, pre_transform, steps)
+        sc = self.get(key)
+        if sc is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return sc
+        with self._stats_lock:
+            self.misses += 1
+        sc = read_mesh(path, pre_transform, steps)
+        self.put(key, sc)
+        return sc
+
+    def entries(self) -> list[tuple[Path, int, float]]:
+        """`(path, bytes, mtime)` of every entry, least recently used first."""
+        found = []
+        for entry in self.root.glob("*/*.bson"):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            found.append((entry, st.st_size, st.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes: int | None = None) -> list[Path]:
+        """Drop least recently used entries until the cache fits in `max_bytes`."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for entry, size, _ in entries:
+            if total <= limit:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed.append(entry)
+        return removed
+
+    def clear(self) -> int:
+        return len(self.evict(0))
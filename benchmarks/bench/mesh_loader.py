@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from uipc.geometry import SimplicialComplex
+
+from .mesh_cache import SURFACE_STEPS, MeshCache, PreTransform, read_mesh, transform_matrix
+
+EXECUTORS: tuple[str, ...] = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class MeshRequest:
+    """One mesh to load: read `path` with `pre_transform`, then run the named preprocessing `steps`."""
+
+    path: str | Path
+    pre_transform: PreTransform = None
+    steps: tuple[str, ...] = SURFACE_STEPS
+
+
+def _identity(request: MeshRequest) -> tuple:
+    matrix = transform_matrix(request.pre_transform)
+    return (
+        str(Path(request.path).resolve()),
+        None if matrix is None else matrix.tobytes(),
+        tuple(request.steps),
+    )
+
+
+def _load_one(request: MeshRequest, cache: MeshCache | None) -> SimplicialComplex:
+    if cache is not None:
+        return cache.load(request.path, request.pre_transform, request.steps)
+    return read_mesh(request.path, request.pre_transform, request.steps)
+
+
+def _warm_in_worker(path: str, matrix, steps: tuple[str, ...], root: str) -> None:
+    # runs in a child process: only the cache entry comes back, meshes are not picklable
+    MeshCache(Path(root)).load(path, matrix, steps)
+
+
+def load_meshes(
+    requests: Sequence[MeshRequest],
+    cache: MeshCache | None = None,
+    workers: int | None = None,
+    executor: str = "thread",
+) -> list[SimplicialComplex]:
+    """Load and preprocess many meshes concurrently; results come back in request order.
+
+    `thread` runs reads and labelling on a thread pool. `process` needs a
+    `cache`: worker processes fill the cache and the meshes are then read back
+    from it here, which keeps cold starts parallel even where the bindings
+    hold the GIL. Identical requests are loaded once.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"unknown executor '{executor}', expected one of {', '.join(EXECUTORS)}")
+    unique: dict[tuple, MeshRequest] = {}
+    for request in requests:
+        unique.setdefault(_identity(request), request)
+    pending = list(unique.values())
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+
+    if executor == "process":
+        if cache is None:
+            raise ValueError("executor='process' hands meshes back through the cache; pass a MeshCache")
+        missing = [r for r in pending if not cache.entry_path(cache.key(r.path, r.pre_transform, r.steps)).exists()]
+        if missing:
+            with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+                list(
+                    pool.map(
+                        _warm_in_worker,
+                        [str(r.path) for r in missing],
+                        [transform_matrix(r.pre_transform) for r in missing],
+                        [tuple(r.steps) for r in missing],
+                        [str(cache.root)] * len(missing),
+                    )
+                )
+        meshes = [cache.load(r.path, r.pre_transform, r.steps) for r in pending]
+    elif workers == 1:
+        meshes = [_load_one(r, cache) for r in pending]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            meshes = list(pool.map(lambda r: _load_one(r, cache), pending))
+    loaded = dict(zip(unique, meshes))
+
+    # a repeated request gets its own copy, as if it had been read again
+    seen: set[tuple] = set()
+    results = []
+    for request in requests:
+        identity = _identity(request)
+        mesh = loaded[identity]
+        results.append(mesh.copy() if identity in seen else mesh)
+        seen.add(identity)
+    return results
@@ -0,0 +1,213 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .timer_frames import frame_metric, frame_total, timer_series
+
+
+@dataclass
+class Phase:
+    index: int
+    start: int
+    stop: int
+    mean_duration: float
+    mean_contacts: float | None
+
+    @property
+    def frames(self) -> int:
+        return self.stop - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "start": self.start,
+            "stop": self.stop,
+            "mean_duration": self.mean_duration,
+            "mean_contacts": self.mean_contacts,
+        }
+
+
+def frame_signals(frames: list[dict]) -> np.ndarray:
+    """Stack the per-frame signals used for segmentation: duration and, if recorded, contacts.
+
+    Each channel is scaled by its robust noise level (MAD of first differences)
+    so that a unit shift means the same thing for every channel.
+    """
+    channels = [np.array([frame_total(f) for f in frames])]
+    contacts = frame_metric(frames, "contacts")
+    if contacts is not None:
+        channels.append(contacts)
+    scaled = []
+    for x in channels:
+        sigma = _noise_scale(x)
+        scaled.append((x - x.mean()) / sigma)
+    return np.stack(scaled, axis=1)
+
+
+def _noise_scale(x: np.ndarray) -> float:
+    if x.size < 3:
+        return 1.0
+    diffs = np.diff(x)
+    sigma = np.median(np.abs(diffs - np.median(diffs))) / (0.6745 * math.sqrt(2.0))
+    if sigma <= 0.0:
+        sigma = x.std()
+    return float(sigma) if sigma > 0.0 else 1.0
+
+
+def _segment_costs(signal: np.ndarray):
+    """Return `cost(i, j)`: squared error of fitting frames [i, j) with their mean."""
+    csum = np.vstack([np.zeros(signal.shape[1]), np.cumsum(signal, axis=0)])
+    csum2 = np.vstack([np.zeros(signal.shape[1]), np.cumsum(signal**2, axis=0)])
+
+    def cost(i: int, j: int) -> float:
+        n = j - i
+        s = csum[j] - csum[i]
+        return float((csum2[j] - csum2[i] - s * s / n).sum())
+
+    return cost
+
+
+def change_points(
+    signal: np.ndarray,
+    penalty: float | None = None,
+    min_size: int = 5,
+    n_phases: int | None = None,
+) -> list[int]:
+    """Piecewise-constant segmentation of `signal` (frames x channels).
+
+    With `n_phases` the optimal split into exactly that many phases is
+    returned; otherwise the number of phases is chosen by a BIC-style
+    `penalty` per change point (default `2 * channels * log(frames)`).
+    Returns the phase boundaries `[0, ..., frames]`.
+    """
+    n, d = signal.shape
+    if n == 0:
+        return [0]
+    min_size = max(1, min(min_size, n))
+    cost = _segment_costs(signal)
+
+    if n_phases is not None:
+        k_max = max(1, min(n_phases, n // min_size))
+        # best[k][j]: min cost of splitting frames [0, j) into k phases
+        best = np.full((k_max + 1, n + 1), np.inf)
+        prev = np.zeros((k_max + 1, n + 1), dtype=int)
+        best[0][0] = 0.0
+        for k in range(1, k_max + 1):
+            for j in range(k * min_size, n + 1):
+                for i in range((k - 1) * min_size, j - min_size + 1):
+                    c = best[k - 1][i] + cost(i, j)
+                    if c < best[k][j]:
+                        best[k][j] = c
+                        prev[k][j] = i
+        bounds = [n]
+        for k in range(k_max, 0, -1):
+            bounds.append(int(prev[k][bounds[-1]]))
+        return bounds[::-1]
+
+    if penalty is None:
+        penalty = 2.0 * d * math.log(max(n, 2))
+    # optimal partitioning with pruning (PELT)
+    f = np.full(n + 1, np.inf)
+    f[0] = -penalty
+    last = np.zeros(n + 1, dtype=int)
+    candidates = [0]
+    for j in range(min_size, n + 1):
+        ready = [i for i in candidates if j - i >= min_size]
+        f[j], last[j] = min((f[i] + cost(i, j) + penalty, i) for i in ready)
+        candidates = [i for i in candidates if j - i < min_size or f[i] + cost(i, j) <= f[j]]
+        candidates.append(j)
+    bounds = [n]
+    while bounds[-1] > 0:
+        bounds.append(int(last[bounds[-1]]))
+    return bounds[::-1]
+
+
+def _phases_from_bounds(frames: list[dict], bounds: list[int]) -> list[Phase]:
+    durations = np.array([frame_total(f) for f in frames])
+    contacts = frame_metric(frames, "contacts")
+    phases = []
+    for index, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        phases.append(
+            Phase(
+                index=index,
+                start=start,
+                stop=stop,
+                mean_duration=float(durations[start:stop].mean()),
+                mean_contacts=float(contacts[start:stop].mean()) if contacts is not None else None,
+            )
+        )
+    return phases
+
+
+def detect_phases(
+    frames: list[dict],
+    penalty: float | None = None,
+    min_size: int = 5,
+    n_phases: int | None = None,
+) -> list[Phase]:
+    """Split a run into phases (e.g. free fall, impact, pile-up) by change points in duration and contacts."""
+    bounds = change_points(frame_signals(frames), penalty=penalty, min_size=min_size, n_phases=n_phases)
+    return _phases_from_bounds(frames, bounds)
+
+
+def align_phases(
+    reference: list[Phase],
+    frames: list[dict],
+    min_size: int = 5,
+) -> list[Phase]:
+    """Segment `frames` into as many phases as `reference`, so phases compare by position.
+
+    The phases of two runs line up by what happens in them rather than by
+    frame index, even when one run reaches the pile-up earlier than the other.
+    A run shorter than `len(reference) * min_size` frames gets fewer phases.
+    """
+    bounds = change_points(frame_signals(frames), min_size=min_size, n_phases=len(reference))
+    return _phases_from_bounds(frames, bounds)
+
+
+def slice_series(series: dict[str, np.ndarray], phase: Phase) -> dict[str, np.ndarray]:
+    return {name: values[phase.start : phase.stop] for name, values in series.items()}
+
+
+def phase_medians(frames: list[dict], phases: list[Phase]) -> list[dict[str, float]]:
+    """Median duration of every timer inside each phase."""
+    series = timer_series(frames)
+    return [
+        {name: float(np.median(values)) for name, values in slice_series(series, p).items()}
+        for p in phases
+    ]
+
+
+def phase_table(
+    reference_id: str,
+    reference: list[Phase],
+    others: dict[str, tuple[list[Phase], list[dict[str, float]]]],
+    reference_medians: list[dict[str, float]],
+    timers: list[str],
+) -> str:
+    """Markdown table of per-phase medians of `timers` for the reference and every aligned run."""
+    lines = [
+        "| phase | run | frames | contacts | " + " | ".join(f"`{t}` (ms)" for t in timers) + " |",
+        "|---|---|---|---:|" + "---:|" * len(timers),
+    ]
+    runs = {reference_id: (reference, reference_medians), **others}
+    for p_index in range(len(reference)):
+        for run_id, (phases, medians) in runs.items():
+            if p_index >= len(phases):
+                continue
+            p = phases[p_index]
+            contacts = f"{p.mean_contacts:.0f}" if p.mean_contacts is not None else "-"
+            cells = []
+            for t in timers:
+                value = medians[p_index].get(t)
+                cell = f"{value * 1e3:.3f}" if value is not None else "-"
+                ref = reference_medians[p_index].get(t)
+                if run_id != reference_id and value is not None and ref:
+                    cell += f" ({value / ref - 1.0:+.1%})"
+                cells.append(cell)
+            lines.append(
+                f"| {p_index} | {run_id} | {p.start}-{p.stop - 1} | {contacts} | " + " | ".join(cells) + " |"
+            )
+    return "\n".join(lines) + "\n"
+
@@ -0,0 +1,95 @@
+import importlib
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A registered benchmark scene.
+
+    `factory` is called as `factory(config, **params)` where `config` is a
+    `Scene.default_config()` with the scenario config, the collision method and
+    any user overrides already applied.
+    """
+
+    name: str
+    factory: Callable[..., Any]
+    frames: int = 100
+    config: dict[str, Any] = field(default_factory=dict)
+    params: dict[str, Any] = field(default_factory=dict)
+    size_params: tuple[str, ...] = ()
+    # asset files or folders (relative to the assets folder) the factory reads; part of the scene cache key
+    assets: tuple[str, ...] = ()
+    description: str = ""
+
+    def create_scene(self, config: dict, **params):
+        merged = dict(self.params)
+        merged.update(params)
+        return self.factory(config, **merged)
+
+
+_SCENARIOS: dict[str, Scenario] = {}
+
+
+def scenario(
+    name: str,
+    *,
+    frames: int = 100,
+    config: dict[str, Any] | None = None,
+    params: dict[str, Any] | None = None,
+    size_params: tuple[str, ...] = (),
+    assets: tuple[str, ...] = (),
+    description: str = "",
+):
+    """Register a `create_scene(config, **params)` factory under `name`.
+
+    `config` holds scenario-specific config values keyed by slash paths
+    (e.g. `"contact/d_hat"`), `params` the default factory keyword arguments
+    and `size_params` the parameters a scaling sweep sets to the scene size.
+    `assets` lists the asset files the factory reads, so cached scenes are
+    rebuilt when one of them changes.
+    """
+
+    def register(factory: Callable[..., Any]) -> Callable[..., Any]:
+        if name in _SCENARIOS:
+            raise ValueError(f"scenario '{name}' is already registered")
+        _SCENARIOS[name] = Scenario(
+            name=name,
+            factory=factory,
+            frames=frames,
+            config=dict(config or {}),
+            params=dict(params or {}),
+            size_params=tuple(size_params),
+            assets=tuple(assets),
+            description=description or (factory.__doc__ or "").strip(),
+        )
+        return factory
+
+    return register
+
+
+def load_builtin_scenarios() -> None:
+    importlib.import_module("bench.scenarios")
+
+
+def get_scenario(name: str) -> Scenario:
+    load_builtin_scenarios()
+    try:
+        return _SCENARIOS[name]
+    except KeyError:
+        available = ", ".join(sorted(_SCENARIOS))
+        raise KeyError(f"unknown scenario '{name}', available: {available}") from None
+
+
+def scenario_names() -> list[str]:
+    load_builtin_scenarios()
+    return sorted(_SCENARIOS)
+
+
+def set_config_value(config: dict, key: str, value: Any) -> None:
+    """Set a nested config entry addressed by a slash path such as `newton/velocity_tol`."""
+    parts = key.split("/")
+    node = config
+    for part in parts[:-1]:
+        node = node[part]
+    node[parts[-1]] = value
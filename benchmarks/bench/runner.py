@@ -0,0 +1,164 @@
+import json
+import os
+from contextlib import nullcontext
+from pathlib import Path
+
+from uipc import Logger, Timer
+from uipc.core import Engine, World, Scene, SceneIO, ContactSystemFeature
+from uipc.geometry import Geometry
+from uipc.stats import SimulationStats
+
+from .cases import Case
+from .history import HistoryStore
+from .memory import MemoryProbe, memory_table
+from .registry import get_scenario, set_config_value
+from .scene_cache import SceneCache, fingerprint
+from .sections import section
+from .timer_frames import attach_frame_metrics
+
+
+def build_config(case: Case) -> dict:
+    scenario = get_scenario(case.scenario)
+    config = Scene.default_config()
+    for key, value in scenario.config.items():
+        set_config_value(config, key, value)
+    set_config_value(config, "collision_detection/method", case.method)
+    for key, value in case.overrides:
+        set_config_value(config, key, value)
+    return config
+
+
+def create_scene(case: Case, config: dict | None = None) -> Scene:
+    """Build the scene of `case`, or with `case.scene_cache` load it from the scene cache when it is current."""
+    scenario = get_scenario(case.scenario)
+    if config is None:
+        config = build_config(case)
+    params = dict(case.params)
+    if not case.scene_cache:
+        return scenario.create_scene(config, **params)
+    key = fingerprint(scenario.factory, (config,), {**scenario.params, **params}, scenario.assets)
+    with section("scene_cache"):
+        scene, _ = SceneCache().get_or_build(key, lambda: scenario.create_scene(config, **params))
+    return scene
+
+
+def scene_size(scene: Scene) -> dict[str, int]:
+    """Count the simulated bodies (geometry instances) and vertices of a scene from its SceneIO json."""
+    data = SceneIO(scene).to_json()["__data__"]
+    atlas = data["geometry_atlas"]["__data__"]
+    attributes = atlas["attributes"]
+    bodies = 0
+    vertices = 0
+    for slot in data["geometry_slots"]:
+        geometry = atlas["geometries"][slot["index"]]
+        if geometry["__meta__"]["type"] != "SimplicialComplex":
+            continue
+        geo = geometry["__data__"]
+        instances = len(attributes[geo["instances"]["__data__"]["transform"]["index"]]["__data__"]["values"])
+        verts = len(attributes[geo["vertices"]["__data__"]["position"]["index"]]["__data__"]["values"])
+        bodies += instances
+        vertices += instances * verts
+    return {"bodies": bodies, "vertices": vertices}
+
+
+def count_contacts(csf: ContactSystemFeature, buffer: Geometry) -> dict[str, int]:
+    """Number of active contact primitives per type, e.g. `{"PT+N": 120, "EE+N": 31}`."""
+    counts = {}
+    for prim in csf.contact_primitive_types():
+        # types may be reported as "PT" or already as "PT+N"; friction ("+F") mirrors normal contacts
+        name = prim if "+" in prim else f"{prim}+N"
+        if name.endswith("+F"):
+            continue
+        csf.contact_energy(name, buffer)
+        counts[name] = buffer.instances().size()
+    return counts
+
+
+def run_case(case: Case, record_history: bool = True) -> Path:
+    """Run a single case in this process and write its `timer_frames.json`.
+
+    Per-frame harness metrics (contact counts and, with `case.memory`, RSS and
+    Python allocation peaks) are attached to each frame under `"metrics"`.
+    With `record_history` the run is also appended to the history store.
+    """
+    output = case.output_dir()
+    output.mkdir(parents=True, exist_ok=True)
+    # results of an earlier run of this case id no longer match the case.json written below
+    case.timer_frames_json().unlink(missing_ok=True)
+
+    probe = MemoryProbe() if case.memory else None
+
+    def measure(out: dict, name: str):
+        return probe.scope(out, name) if probe is not None else nullcontext()
+
+    setup_memory: dict[str, dict] = {}
+    engine = Engine(case.backend, str(output))
+    world = World(engine)
+    config = build_config(case)
+    with measure(setup_memory, "create_scene"):
+        scene = create_scene(case, config)
+    size = scene_size(scene)
+    with measure(setup_memory, "world.init"):
+        world.init(scene)
+    with open(output / "case.json", "w", encoding="utf-8") as f:
+        json.dump({**case.to_dict(), "scene": size, "memory": setup_memory}, f, indent=2)
+
+    csf = world.features().find(ContactSystemFeature)
+    contact_buffer = Geometry()
+
+    stats = SimulationStats()
+    metrics = []
+    for _ in range(case.frames):
+        frame_metrics = {}
+        scopes: dict[str, dict] = {}
+        if probe is not None:
+            probe.begin_frame()
+        world.advance()
+        with measure(scopes, "world.retrieve"):
+            world.retrieve()
+        with measure(scopes, "stats.collect"):
+            stats.collect()
+        if probe is not None:
+            frame_metrics.update(probe.end_frame())
+            frame_metrics["memory_scopes"] = scopes
+        if csf is not None:
+            by_type = count_contacts(csf, contact_buffer)
+            frame_metrics["contacts"] = sum(by_type.values())
+            frame_metrics["contacts_by_type"] = by_type
+        metrics.append(frame_metrics)
+
+    if probe is not None:
+        probe.stop()
+    stats_dir = output / "stats"
+    stats.summary_report(output_dir=str(stats_dir), workspace=str(output))
+    # written under a temporary name so an interrupted case never looks finished
+    timer_frames_json = case.timer_frames_json()
+    partial = timer_frames_json.with_suffix(".json.partial")
+    stats.save_timer_frames_json(partial)
+    attach_frame_metrics(partial, metrics)
+    os.replace(partial, timer_frames_json)
+
+    if record_history:
+        store = HistoryStore()
+        store.record(case, config, timer_frames_json)
+        store.close()
+    return timer_frames_json
+
+
+def compare(comparison_map: dict[str, Path], output_dir: Path) -> Path:
+    SimulationStats.create_comparison(
+        comparison_map=comparison_map,
+        output_dir=str(output_dir),
+        metric="duration",
+        align="union",
+    )
+    table = memory_table(comparison_map)
+    if table is not None:
+        (output_dir / "memory.md").write_text(table, encoding="utf-8")
+        print(table)
+    return output_dir
+
+
+def setup_logging() -> None:
+    Logger.set_level(Logger.Level.Info)
+    Timer.enable_all()
@@ -0,0 +1 @@
+from . import abd_bunny_grid_drop, wrecking_balls
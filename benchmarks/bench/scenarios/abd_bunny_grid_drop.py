@@ -0,0 +1,86 @@
+from uipc import Transform, Vector3, view
+from uipc.core import Scene
+from uipc.geometry import SimplicialComplexIO, label_surface, label_triangle_orient, flip_inward_triangles
+from uipc.constitution import AffineBodyConstitution
+from uipc.unit import MPa, GPa
+
+from ..asset_dir import AssetDir
+from ..mesh_cache import MeshCache
+from ..registry import scenario
+from ..sections import section
+
+
+@scenario(
+    "abd_bunny_grid_drop",
+    frames=100,
+    config={
+        "dt": 0.01,
+        "contact/d_hat": 0.01,
+        "newton/transrate_tol": 10,
+        "newton/velocity_tol": 1,
+    },
+    params={
+        "grid_x": 10,
+        "grid_z": 10,
+        "grid_spacing": 1.2,
+        "drop_height": 8.0,
+        "scale": 0.1,
+        "mesh_cache": False,
+    },
+    size_params=("grid_x", "grid_z"),
+    assets=("sim_data/tetmesh/bunny0.msh",),
+    description="Grid of ABD bunnies dropped as instances of one geometry.",
+)
+def create_scene(
+    config: dict,
+    grid_x: int,
+    grid_z: int,
+    grid_spacing: float,
+    drop_height: float,
+    scale: float,
+    mesh_cache: bool,
+) -> Scene:
+    scene = Scene(config)
+
+    scene.contact_tabular().default_model(0.2, 10 * GPa, enable=False)
+    default_contact = scene.contact_tabular().default_element()
+    abd = AffineBodyConstitution()
+
+    transform = Transform.Identity()
+    transform.scale(scale)
+    bunny_path = f"{AssetDir.tetmesh_path()}/bunny0.msh"
+    if mesh_cache:
+        with section("mesh_cache"):
+            bunny = MeshCache().load(bunny_path, transform)
+    else:
+        io = SimplicialComplexIO(transform)
+        with section("read_meshes"):
+            bunny = io.read(bunny_path)
+        with section("process_surface"):
+            label_surface(bunny)
+            label_triangle_orient(bunny)
+            bunny = flip_inward_triangles(bunny)
+
+    with section("apply_constitution"):
+        abd.apply_to(bunny, 100 * MPa)
+        default_contact.apply_to(bunny)
+    bunny.instances().resize(grid_x * grid_z)
+
+    with section("build_entries"):
+        transforms = view(bunny.transforms())
+        for iz in range(grid_z):
+            for ix in range(grid_x):
+                idx = iz * grid_x + ix
+                t = Transform.Identity()
+                x = (ix - (grid_x - 1) * 0.5) * grid_spacing
+                z = (iz - (grid_z - 1) * 0.5) * grid_spacing
+                p = Vector3.Zero()
+                p[0] = x
+                p[1] = drop_height
+                p[2] = z
+                t.translate(p)
+                transforms[idx] = t.matrix()
+
+    bunnies = scene.objects().create("bunny_grid")
+    bunnies.geometries().create(bunny)
+    return scene
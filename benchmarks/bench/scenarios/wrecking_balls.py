@@ -0,0 +1,161 @@
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+import uipc
+from uipc import view
+from uipc import Vector3, Transform, AngleAxis
+from uipc.core import Scene
+from uipc.geometry import (
+    SimplicialComplex,
+    SimplicialComplexIO,
+    ground,
+    label_surface,
+    label_triangle_orient,
+    flip_inward_triangles,
+)
+from uipc.constitution import AffineBodyConstitution
+from uipc.unit import MPa, GPa
+
+from ..asset_dir import AssetDir
+from ..instancing import group_entries, instance_geometry
+from ..mesh_cache import MeshCache
+from ..mesh_loader import MeshRequest, load_meshes
+from ..registry import scenario
+from ..sections import section
+
+# Footprint of one copy of wrecking_ball.json (x: 0.8..14.8, z: -4.5..5.0) plus a gap,
+# so tiled copies never touch each other.
+TILE_SPACING = (18.0, 12.0)
+
+
+def load_entries(copies: int = 1) -> list[dict]:
+    """Entries of sim_data/wrecking_ball.json, tiled `copies` times on a square grid in the x-z plane."""
+    scene_json_path = Path(AssetDir.asset_path()) / "sim_data" / "wrecking_ball.json"
+    with open(scene_json_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if copies == 1:
+        return entries
+
+    side = math.ceil(math.sqrt(copies))
+    tiled = []
+    for k in range(copies):
+        dx = (k % side) * TILE_SPACING[0]
+        dz = (k // side) * TILE_SPACING[1]
+        for entry in entries:
+            x, y, z = entry.get("position", (0.0, 0.0, 0.0))
+            tiled.append({**entry, "position": [x + dx, y, z + dz]})
+    return tiled
+
+
+def process_surface(sc: SimplicialComplex) -> SimplicialComplex:
+    label_surface(sc)
+    label_triangle_orient(sc)
+    return flip_inward_triangles(sc)
+
+
+def build_mesh(desc: dict, obj: uipc.core.Object, mesh: SimplicialComplex) -> None:
+    t = Transform.Identity()
+    if "position" in desc:
+        position = Vector3.Zero()
+        position[0] = desc["position"][0]
+        position[1] = desc["position"][1]
+        position[2] = desc["position"][2]
+        t.translate(position)
+
+    if "rotation" in desc:
+        rotation = Vector3.Zero()
+        rotation[0] = desc["rotation"][0]
+        rotation[1] = desc["rotation"][1]
+        rotation[2] = desc["rotation"][2]
+        rotation *= np.pi / 180.0
+        q = (
+            AngleAxis(rotation[2][0], Vector3.UnitZ())
+            * AngleAxis(rotation[1][0], Vector3.UnitY())
+            * AngleAxis(rotation[0][0], Vector3.UnitX())
+        )
+        t.rotate(q)
+
+    is_fixed = int(desc.get("is_dof_fixed", 0))
+    this_mesh = mesh.copy()
+    view(this_mesh.transforms())[0] = t.matrix()
+    view(this_mesh.instances().find("is_fixed"))[0] = is_fixed
+    obj.geometries().create(this_mesh)
+
+
+@scenario(
+    "wrecking_balls",
+    frames=300,
+    config={
+        "dt": 0.01,
+        "contact/d_hat": 0.01,
+        "newton/transrate_tol": 10,
+        "newton/velocity_tol": 1,
+    },
+    params={"copies": 1, "instanced": False, "mesh_cache": False},
+    size_params=("copies",),
+    assets=(
+        "sim_data/wrecking_ball.json",
+        "sim_data/tetmesh/cube.msh",
+        "sim_data/tetmesh/ball.msh",
+        "sim_data/tetmesh/link.msh",
+    ),
+    description="ABD wrecking-ball chains from sim_data/wrecking_ball.json, tiled `copies` times.",
+)
+def create_scene(config: dict, copies: int, instanced: bool, mesh_cache: bool) -> Scene:
+    """With `instanced`, each mesh becomes one multi-instance geometry instead of one geometry per entry.
+    With `mesh_cache`, processed meshes come from the on-disk `MeshCache`."""
+    scene = Scene(config)
+    scene.contact_tabular().default_model(0.02, 10 * GPa)
+    default_contact = scene.contact_tabular().default_element()
+    abd = AffineBodyConstitution()
+
+    with section("parse_json"):
+        wrecking_ball_scene = load_entries(copies)
+
+    tetmesh_dir = Path(AssetDir.tetmesh_path())
+    mesh_paths = [tetmesh_dir / "cube.msh", tetmesh_dir / "ball.msh", tetmesh_dir / "link.msh"]
+    if mesh_cache:
+        with section("mesh_cache"):
+            cube, ball, link = load_meshes([MeshRequest(path) for path in mesh_paths], cache=MeshCache())
+    else:
+        io = SimplicialComplexIO()
+        with section("read_meshes"):
+            cube, ball, link = [io.read(str(path)) for path in mesh_paths]
+        with section("process_surface"):
+            cube, ball, link = [process_surface(mesh) for mesh in (cube, ball, link)]
+
+    cube_obj = scene.objects().create("cubes")
+    ball_obj = scene.objects().create("balls")
+    link_obj = scene.objects().create("links")
+
+    with section("apply_constitution"):
+        abd.apply_to(cube, 100 * MPa)
+        default_contact.apply_to(cube)
+        abd.apply_to(ball, 100 * MPa)
+        default_contact.apply_to(ball)
+        abd.apply_to(link, 100 * MPa)
+        default_contact.apply_to(link)
+
+    with section("build_entries"):
+        if instanced:
+            objects = {"link.msh": (link_obj, link), "ball.msh": (ball_obj, ball), "cube.msh": (cube_obj, cube)}
+            for mesh_name, group in group_entries(wrecking_ball_scene).items():
+                if mesh_name in objects:
+                    obj, mesh = objects[mesh_name]
+                    obj.geometries().create(instance_geometry(mesh, group))
+        else:
+            for entry in wrecking_ball_scene:
+                if entry["mesh"] == "link.msh":
+                    build_mesh(entry, link_obj, link)
+                elif entry["mesh"] == "ball.msh":
+                    build_mesh(entry, ball_obj, ball)
+                elif entry["mesh"] == "cube.msh":
+                    build_mesh(entry, cube_obj, cube)
+
+    ground_obj = scene.objects().create("ground")
+    ground_obj.geometries().create(ground(-1.0))
+
+    return scene
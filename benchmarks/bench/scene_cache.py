@@ -0,0 +1,140 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from uipc.core import Scene, SceneIO
+
+from .asset_dir import AssetDir
+from .cases import BENCHMARKS_ROOT
+from .history import uipc_version
+from .mesh_cache import file_digest
+
+# Bump when the fingerprint or the stored layout changes.
+CACHE_VERSION = 3
+PACKAGE_ROOT = Path(__file__).resolve().parent
+
+
+def default_scene_cache_dir() -> Path:
+    return Path(AssetDir.output_path(BENCHMARKS_ROOT)) / "scene_cache"
+
+
+def _asset_files(assets: Iterable[str | Path]) -> list[tuple[str, Path]]:
+    """`(name, path)` of every asset file, named by its path relative to the assets folder."""
+    root = Path(AssetDir.asset_path()).resolve()
+    files = []
+    for asset in assets:
+        path = Path(asset)
+        if not path.is_absolute():
+            path = root / path
+        paths = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for p in paths:
+            p = p.resolve()
+            files.append((p.relative_to(root).as_posix() if p.is_relative_to(root) else p.as_posix(), p))
+    return files
+
+
+def _source_files(factory: Callable[..., Any]) -> list[Path]:
+    # the factory's module and every module of the bench package, since
+    # factories build on shared helpers (instancing, mesh_cache, mesh_loader, ...)
+    files = sorted(PACKAGE_ROOT.rglob("*.py"))
+    source = inspect.getsourcefile(factory)
+    if source is not None and Path(source).resolve() not in files:
+        files.append(Path(source).resolve())
+    return files
+
+
+def fingerprint(
+    factory: Callable[..., Any],
+    args: tuple = (),
+    kwargs: dict | None = None,
+    assets: Iterable[str | Path] = (),
+) -> str:
+    """Hash of everything a scene build depends on.
+
+    Covers the factory's arguments (config included), the source of the
+    module that defines it and of the whole `bench` package (the helpers it
+    builds on), the path and content of every asset file (relative paths are
+    taken from the assets folder, folders are hashed recursively) and the
+    installed uipc version.
+    """
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}\0{uipc_version()}\0{factory.__module__}.{factory.__qualname__}\0".encode())
+    for path in _source_files(factory):
+        name = path.relative_to(PACKAGE_ROOT).as_posix() if path.is_relative_to(PACKAGE_ROOT) else path.name
+        h.update(f"\0{name}\0{file_digest(path)}".encode())
+    h.update(json.dumps([list(args), kwargs or {}], sort_keys=True, default=str).encode())
+    for name, path in _asset_files(assets):
+        h.update(f"\0{name}\0{file_digest(path)}".encode())
+    return h.hexdigest()
+
+
+class SceneCache:
+    """Built scenes stored as SceneIO `.bson` files under their fingerprint."""
+
+    def __init__(self, root: Path | None = None):
+        self.root = Path(root) if root is not None else default_scene_cache_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, key: str) -> Path:
+        return self.root / f"{key}.bson"
+
+    def load(self, key: str) -> Scene | None:
+        entry = self.entry_path(key)
+        if not entry.exists():
+            return None
+        os.utime(entry)
+        return SceneIO.load(str(entry))
+
+    def store(self, key: str, scene: Scene) -> Path:
+        entry = self.entry_path(key)
+        fd, tmp = tempfile.mkstemp(suffix=".bson", dir=self.root)
+        os.close(fd)
+        try:
+            SceneIO(scene).save(tmp)
+            os.replace(tmp, entry)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return entry
+
+    def get_or_build(self, key: str, build: Callable[[], Scene]) -> tuple[Scene, bool]:
+        """`(scene, hit)`: the cached scene, or a freshly built one that is stored for next time."""
+        scene = self.load(key)
+        if scene is not None:
+            return scene, True
+        scene = build()
+        self.store(key, scene)
+        return scene, False
+
+    def clear(self) -> int:
+        entries = list(self.root.glob("*.bson"))
+        for entry in entries:
+            entry.unlink(missing_ok=True)
+        return len(entries)
+
+
+def cached(assets: Iterable[str | Path] = (), cache: SceneCache | None = None):
+    """Decorate a scene factory, e.g. `create_scene(method)`, to load its result from the cache.
+
+    The wrapper fingerprints the call with `fingerprint(factory, args, kwargs, assets)`;
+    on a hit the stored `.bson` is loaded instead of calling the factory, on a
+    miss the built scene is stored.
+    """
+    assets = tuple(assets)
+
+    def wrap(factory: Callable[..., Scene]) -> Callable[..., Scene]:
+        @functools.wraps(factory)
+        def wrapper(*args, **kwargs) -> Scene:
+            store = cache if cache is not None else SceneCache()
+            key = fingerprint(factory, args, kwargs, assets)
+            scene, _ = store.get_or_build(key, lambda: factory(*args, **kwargs))
+            return scene
+
+        return wrapper
+
+    return wrap
@@ -0,0 +1,180 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from .cases import BENCHMARKS_ROOT, Case, scenario_output
+
+# case fields that change the results but not the case id
+RESULT_FIELDS = ("frames", "backend")
+
+
+def run_case_subprocess(
+    case: Case, cpus: list[int] | None = None, log_path: Path | None = None
+) -> Path:
+    """Run a case in a fresh interpreter so Timer and device state never leak between cases.
+
+    `cpus` pins the child process to the given CPU set, `log_path` captures its output.
+    """
+    cmd = [
+        sys.executable,
+        "-m",
+        "bench",
+        "run-case",
+        json.dumps(case.to_dict()),
+    ]
+    if cpus:
+        cmd += ["--cpus", ",".join(str(c) for c in cpus)]
+    print(f"[benchmark] running {case.scenario}/{case.case_id}")
+    if log_path is None:
+        subprocess.run(cmd, check=True, cwd=BENCHMARKS_ROOT)
+    else:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "w", encoding="utf-8") as log:
+            subprocess.run(cmd, check=True, cwd=BENCHMARKS_ROOT, stdout=log, stderr=subprocess.STDOUT)
+    return case.timer_frames_json()
+
+
+def available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(jobs: int) -> list[list[int]]:
+    """Split the usable CPUs into `jobs` disjoint slots, one per worker."""
+    cpus = available_cpus()
+    if jobs > len(cpus):
+        return [[] for _ in range(jobs)]
+    size = len(cpus) // jobs
+    return [cpus[i * size : (i + 1) * size] for i in range(jobs)]
+
+
+def pin_to_cpus(cpus: list[int]) -> None:
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+class Manifest:
+    """Per-scenario record of case status, stored as `<scenario output>/manifest.json`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("cases", {})
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def for_scenario(scenario: str) -> "Manifest":
+        return Manifest(scenario_output(scenario) / "manifest.json")
+
+    def update(self, case: Case, **fields) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(case.case_id, {"case": case.to_dict()})
+            entry.update(fields)
+            self._save()
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"cases": self.entries}, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def is_done(case: Case) -> bool:
+    """Whether the case directory holds finished results of this exact case.
+
+    The case id leaves out the frame count and the backend, so the `case.json`
+    written by the run is compared too: a `--frames 10` or `--backend none`
+    run never stands in for a full one.
+    """
+    if not case.timer_frames_json().exists():
+        return False
+    try:
+        with open(case.output_dir() / "case.json", "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return False
+    requested = case.to_dict()
+    return all(stored.get(key) == requested[key] for key in RESULT_FIELDS)
+
+
+def run_cases(
+    cases: list[Case],
+    jobs: int = 1,
+    force: bool = False,
+    launch: Callable[[Case, list[int], Path | None], Path] = run_case_subprocess,
+) -> tuple[list[Case], list[tuple[Case, str]]]:
+    """Run cases on a bounded pool of `jobs` workers, one case per worker at a time.
+
+    Cases that already finished with the same frames and backend (see
+    `is_done`) are skipped unless `force` is set, so an interrupted sweep
+    resumes where it stopped. `launch` runs one
+    case and defaults to a subprocess; pass a stand-in to exercise the
+    scheduler without an engine. Returns the finished cases, in input order,
+    and the failed ones with their error.
+    """
+    manifests = {c.scenario: Manifest.for_scenario(c.scenario) for c in cases}
+    done: list[Case] = []
+    failed: list[tuple[Case, str]] = []
+
+    pending = []
+    for case in cases:
+        if not force and is_done(case):
+            manifests[case.scenario].update(case, status="done")
+            done.append(case)
+        else:
+            manifests[case.scenario].update(case, status="pending")
+            pending.append(case)
+
+    if not pending:
+        return done, failed
+
+    jobs = max(1, min(jobs, len(pending)))
+    slots: queue.Queue[list[int]] = queue.Queue()
+    for cpus in partition_cpus(jobs):
+        slots.put(cpus)
+    lock = threading.Lock()
+
+    def work(case: Case) -> None:
+        cpus = slots.get()
+        manifest = manifests[case.scenario]
+        manifest.update(case, status="running", cpus=cpus)
+        start = time.perf_counter()
+        log_path = case.output_dir() / "run.log" if jobs > 1 else None
+        try:
+            launch(case, cpus, log_path)
+        except Exception as e:
+            manifest.update(case, status="failed", error=str(e), wall_time=time.perf_counter() - start)
+            with lock:
+                failed.append((case, str(e)))
+        else:
+            manifest.update(case, status="done", wall_time=time.perf_counter() - start)
+            with lock:
+                done.append(case)
+        finally:
+            slots.put(cpus)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(work, pending))
+
+    order = {id(case): i for i, case in enumerate(cases)}
+    done.sort(key=lambda c: order[id(c)])
+    return done, failed
+
+
+def describe(cases: list[Case], jobs: int, force: bool = False) -> None:
+    """Print the dry-run plan: every case, whether it would run, and the worker CPU slots."""
+    for cpus_index, cpus in enumerate(partition_cpus(jobs)):
+        print(f"[benchmark] worker {cpus_index}: cpus {cpus or 'unpinned'}")
+    for case in cases:
+        state = "run" if force or not is_done(case) else "skip (done)"
+        print(f"[benchmark] {state:<12} {case.scenario}/{case.case_id} frames={case.frames} backend={case.backend}")
@@ -0,0 +1,30 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_recorder: ContextVar[dict[str, float] | None] = ContextVar("bench_sections", default=None)
+
+
+@contextmanager
+def section(name: str):
+    """Time a named stage of scene construction; a no-op unless inside `record_sections()`."""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder[name] = recorder.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def record_sections():
+    """Collect the wall time (seconds) of every `section()` entered in this block."""
+    recorder: dict[str, float] = {}
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
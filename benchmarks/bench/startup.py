@@ -0,0 +1,104 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from uipc.core import Engine, World, SceneIO
+
+from .cases import Case, scenario_output
+from .runner import build_config, create_scene, scene_size
+from .sections import record_sections
+
+# SceneIO picks the encoding from the file extension.
+FORMATS: tuple[str, ...] = ("json", "bson")
+
+
+def time_startup(case: Case, workdir: Path, formats: tuple[str, ...] = FORMATS) -> dict:
+    """Time one cold start of `case` with every stage measured on its own; times in seconds.
+
+    `create_scene` is split further into the `section()`s the scenario factory
+    declares. Each format is saved and loaded back once; `world.init` runs on
+    a fresh engine of `case.backend` after the IO round trips.
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    config = build_config(case)
+    timings: dict[str, float] = {}
+    with record_sections() as sections:
+        start = time.perf_counter()
+        scene = create_scene(case, config)
+        timings["create_scene"] = time.perf_counter() - start
+    timings.update({f"create_scene/{name}": t for name, t in sections.items()})
+
+    bytes_on_disk: dict[str, int] = {}
+    sio = SceneIO(scene)
+    for fmt in formats:
+        path = workdir / f"scene.{fmt}"
+        start = time.perf_counter()
+        sio.save(str(path))
+        timings[f"save.{fmt}"] = time.perf_counter() - start
+        start = time.perf_counter()
+        SceneIO.load(str(path))
+        timings[f"load.{fmt}"] = time.perf_counter() - start
+        bytes_on_disk[fmt] = path.stat().st_size
+
+    engine = Engine(case.backend, str(workdir))
+    world = World(engine)
+    start = time.perf_counter()
+    world.init(scene)
+    timings["world.init"] = time.perf_counter() - start
+    return {"timings": timings, "bytes": bytes_on_disk, "scene": scene_size(scene)}
+
+
+def startup_point(case: Case, size: int, repeat: int, formats: tuple[str, ...] = FORMATS) -> dict:
+    """Median of every stage over `repeat` cold starts at one scene size."""
+    workdir = startup_output(case.scenario) / case.case_id
+    runs = [time_startup(case, workdir, formats) for _ in range(repeat)]
+    stages = list(runs[0]["timings"])
+    return {
+        "size": size,
+        "case_id": case.case_id,
+        "scene": runs[0]["scene"],
+        "bytes": runs[0]["bytes"],
+        "median": {stage: statistics.median(run["timings"][stage] for run in runs) for stage in stages},
+        "runs": [run["timings"] for run in runs],
+    }
+
+
+def startup_report(scenario: str, points: list[dict]) -> str:
+    """One row per case, one column per stage (median ms), plus the per-entry cost of `create_scene`."""
+    stages: list[str] = []
+    for p in points:
+        stages += [s for s in p["median"] if s not in stages]
+    lines = [
+        f"## {scenario} startup",
+        "",
+        "| case | size | bodies | vertices | " + " | ".join(f"{s} (ms)" for s in stages) + " | create_scene/body (us) |",
+        "|---|---:|---:|---:|" + "---:|" * (len(stages) + 1),
+    ]
+    for p in points:
+        bodies = p["scene"]["bodies"]
+        cells = [f"{p['median'][s] * 1e3:.1f}" if s in p["median"] else "-" for s in stages]
+        per_body = f"{p['median']['create_scene'] / bodies * 1e6:.1f}" if bodies else "-"
+        lines.append(f"| {p['case_id']} | {p['size']} | {bodies} | {p['scene']['vertices']} | " + " | ".join(cells) + f" | {per_body} |")
+
+    formats = list(points[0]["bytes"]) if points else []
+    if formats:
+        lines += [
+            "",
+            "| case | " + " | ".join(f"scene.{fmt} (MiB)" for fmt in formats) + " |",
+            "|---|" + "---:|" * len(formats),
+        ]
+        for p in points:
+            lines.append(f"| {p['case_id']} | " + " | ".join(f"{p['bytes'][fmt] / 2**20:.2f}" for fmt in formats) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def write_points(points: list[dict], path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(points, f, indent=2)
+
+
+def startup_output(scenario: str) -> Path:
+    output = scenario_output(scenario) / "startup"
+    output.mkdir(parents=True, exist_ok=True)
+    return output
@@ -0,0 +1,202 @@
+import csv
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .cases import Case, expand_cases, scenario_output
+from .timer_frames import TOTAL, frame_metric, load_timer_frames, timer_series
+
+# Quantities the time per frame is fitted against. libuipc does not report the
+# broadphase candidate count to Python, so contacts are the active contact
+# primitives after narrowphase (the `"contacts"` frame metric).
+SIZE_KEYS: tuple[str, ...] = ("bodies", "vertices", "active_contacts")
+
+
+@dataclass
+class SweepPoint:
+    method: str
+    size: int
+    bodies: int
+    vertices: int
+    active_contacts: float
+    time_per_frame: float
+
+
+def doubling_sizes(max_size: int) -> list[int]:
+    """1, 2, 4, ... up to and including `max_size`."""
+    sizes = []
+    size = 1
+    while size < max_size:
+        sizes.append(size)
+        size *= 2
+    sizes.append(max_size)
+    return sizes
+
+
+def sweep_cases(
+    scenario: str,
+    size_params: tuple[str, ...],
+    sizes: list[int],
+    methods: list[str],
+    frames: int,
+    overrides: dict | None = None,
+    backend: str = "cuda",
+    params: dict | None = None,
+    scene_cache: bool = False,
+) -> dict[int, list[Case]]:
+    """One case per method and size (and extra `params` value); every parameter in `size_params` is set to the size."""
+    if not size_params:
+        raise ValueError(f"scenario '{scenario}' declares no size_params; pass --size-param")
+    return {
+        size: expand_cases(
+            [scenario],
+            methods,
+            {scenario: frames},
+            overrides=overrides,
+            params={**(params or {}), **{name: [size] for name in size_params}},
+            backend=backend,
+            scene_cache=scene_cache,
+        )
+        for size in sizes
+    }
+
+
+def collect_point(case: Case, size: int) -> SweepPoint:
+    """Summarize a finished case: scene size from `case.json`, median frame time and mean active contacts."""
+    with open(case.output_dir() / "case.json", "r", encoding="utf-8") as f:
+        scene = json.load(f).get("scene", {})
+    frames = load_timer_frames(case.timer_frames_json())
+    contacts = frame_metric(frames, "contacts")
+    return SweepPoint(
+        method=case.method,
+        size=size,
+        bodies=int(scene.get("bodies", 0)),
+        vertices=int(scene.get("vertices", 0)),
+        active_contacts=float(contacts.mean()) if contacts is not None else 0.0,
+        time_per_frame=float(np.median(timer_series(frames)[TOTAL])),
+    )
+
+
+def fit_exponent(xs: list[float], ys: list[float]) -> tuple[float, float] | None:
+    """Least-squares fit of `y = c * x^k` in log-log space; returns `(k, c)`."""
+    pairs = [(x, y) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(pairs) < 2 or len({x for x, _ in pairs}) < 2:
+        return None
+    lx = np.log([x for x, _ in pairs])
+    ly = np.log([y for _, y in pairs])
+    k, log_c = np.polyfit(lx, ly, 1)
+    return float(k), float(math.exp(log_c))
+
+
+def by_method(points: list[SweepPoint]) -> dict[str, list[SweepPoint]]:
+    groups: dict[str, list[SweepPoint]] = {}
+    for p in sorted(points, key=lambda p: p.size):
+        groups.setdefault(p.method, []).append(p)
+    return groups
+
+
+def crossovers(points: list[SweepPoint]) -> list[tuple[str, str, SweepPoint]]:
+    """`(method, overtaken, point)`: the first size at which `method`, slower until then, overtakes another."""
+    groups = by_method(points)
+    found = []
+    methods = sorted(groups)
+    for a in methods:
+        for b in methods:
+            if a == b:
+                continue
+            times_b = {p.size: p.time_per_frame for p in groups[b]}
+            was_slower = False
+            for p in groups[a]:
+                if p.size not in times_b:
+                    continue
+                if p.time_per_frame > times_b[p.size]:
+                    was_slower = True
+                elif was_slower:
+                    found.append((a, b, p))
+                    break
+    return found
+
+
+def sweep_report(scenario: str, points: list[SweepPoint]) -> str:
+    groups = by_method(points)
+    lines = [
+        f"## {scenario} scaling sweep",
+        "",
+        "| method | size | bodies | vertices | active contacts | time/frame (ms) |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    for method, group in groups.items():
+        for p in group:
+            lines.append(
+                f"| {method} | {p.size} | {p.bodies} | {p.vertices} | {p.active_contacts:.0f} | {p.time_per_frame * 1e3:.3f} |"
+            )
+
+    lines += [
+        "",
+        "Empirical scaling exponent k of time/frame ~ x^k:",
+        "",
+        "| method | " + " | ".join(f"k({key})" for key in SIZE_KEYS) + " |",
+        "|---|" + "---:|" * len(SIZE_KEYS),
+    ]
+    for method, group in groups.items():
+        cells = []
+        for key in SIZE_KEYS:
+            fit = fit_exponent([getattr(p, key) for p in group], [p.time_per_frame for p in group])
+            cells.append(f"{fit[0]:.2f}" if fit else "-")
+        lines.append(f"| {method} | " + " | ".join(cells) + " |")
+
+    found = crossovers(points)
+    lines.append("")
+    if found:
+        for method, overtaken, p in found:
+            lines.append(f"- `{method}` overtakes `{overtaken}` at size {p.size} ({p.bodies} bodies).")
+    else:
+        lines.append("- No crossover between methods in the swept range.")
+    return "\n".join(lines) + "\n"
+
+
+def write_csv(points: list[SweepPoint], path: Path) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["method", "size", "bodies", "vertices", "active_contacts", "time_per_frame"])
+        for p in points:
+            writer.writerow([p.method, p.size, p.bodies, p.vertices, p.active_contacts, p.time_per_frame])
+
+
+def plot(points: list[SweepPoint], path: Path) -> bool:
+    """Log-log plot of time per frame against each size quantity. Returns False without matplotlib."""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+
+    groups = by_method(points)
+    fig, axes = plt.subplots(1, len(SIZE_KEYS), figsize=(5 * len(SIZE_KEYS), 4))
+    for ax, key in zip(axes, SIZE_KEYS):
+        for method, group in groups.items():
+            xs = [getattr(p, key) for p in group]
+            ys = [p.time_per_frame * 1e3 for p in group]
+            fit = fit_exponent(xs, [p.time_per_frame for p in group])
+            label = f"{method} (k={fit[0]:.2f})" if fit else method
+            ax.plot(xs, ys, marker="o", label=label)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel(key.replace("_", " "))
+        ax.set_ylabel("time per frame (ms)")
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return True
+
+
+def sweep_output(scenario: str) -> Path:
+    output = scenario_output(scenario) / "sweep"
+    output.mkdir(parents=True, exist_ok=True)
+    return output
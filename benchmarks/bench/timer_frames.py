@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+# Series key for the whole-frame duration.
+TOTAL = "<frame>"
+
+
+def load_timer_frames(path: str | Path) -> list[dict]:
+    """Load the per-frame timer trees written by `SimulationStats.save_timer_frames_json`."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("frames", [])
+    return list(data)
+
+
+def attach_frame_metrics(path: str | Path, metrics: list[dict]) -> None:
+    """Store harness-side per-frame metrics under `"metrics"` of each frame, in place."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    frames = data.get("frames", []) if isinstance(data, dict) else data
+    for frame, frame_metrics in zip(frames, metrics):
+        frame.setdefault("metrics", {}).update(frame_metrics)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def frame_metric(frames: list[dict], key: str) -> np.ndarray | None:
+    """Series of a harness metric over frames, or None if the run did not record it."""
+    if not frames or any(key not in f.get("metrics", {}) for f in frames):
+        return None
+    return np.array([float(f["metrics"][key]) for f in frames])
+
+
+def node_duration(node: dict) -> float:
+    return float(node.get("duration", 0.0))
+
+
+def node_children(node: dict) -> list[dict]:
+    return node.get("children") or []
+
+
+def walk(node: dict, prefix: str = "", depth: int = 0) -> Iterator[tuple[str, int, dict]]:
+    """Yield `(path, depth, node)` for the scopes below a frame root; paths join names with '/'."""
+    for child in node_children(node):
+        name = child.get("name", "?")
+        path = f"{prefix}/{name}" if prefix else name
+        yield path, depth, child
+        yield from walk(child, path, depth + 1)
+
+
+def flatten_frame(frame: dict) -> dict[str, float]:
+    """Map every timer path of a frame to its duration (seconds), summing repeated paths."""
+    out: dict[str, float] = {}
+    for path, _, node in walk(frame):
+        out[path] = out.get(path, 0.0) + node_duration(node)
+    return out
+
+
+def frame_total(frame: dict) -> float:
+    """Duration of a whole frame: the root duration, or the sum of its top-level scopes."""
+    if "duration" in frame:
+        return node_duration(frame)
+    return sum(node_duration(c) for c in node_children(frame))
+
+
+def timer_series(frames: list[dict]) -> dict[str, np.ndarray]:
+    """Per-timer duration series over frames; frames where a timer did not run count as 0."""
+    flat = [flatten_frame(f) for f in frames]
+    names = sorted({name for f in flat for name in f})
+    series = {name: np.array([f.get(name, 0.0) for f in flat]) for name in names}
+    series[TOTAL] = np.array([frame_total(f) for f in frames])
+    return series
+
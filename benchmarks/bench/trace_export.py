@@ -0,0 +1,86 @@
+from .timer_frames import frame_total, node_children, node_duration
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def scopes(frame: dict, start: float = 0.0) -> list[tuple[str, float, float, int]]:
+    """Flatten a frame into `(name, start, end, depth)` scopes in pre-order; times in seconds.
+
+    Timer frames only carry accumulated durations, so children are laid out
+    back to back from their parent's start. A parent is stretched to cover its
+    children when they add up to more than its own duration.
+    """
+    result: list[tuple[str, float, float, int]] = []
+
+    def visit(node: dict, begin: float, depth: int) -> float:
+        slot = len(result)
+        result.append(("", 0.0, 0.0, 0))
+        cursor = begin
+        for child in node_children(node):
+            cursor = visit(child, cursor, depth + 1)
+        end = max(begin + node_duration(node), cursor)
+        result[slot] = (node.get("name", "?"), begin, end, depth)
+        return end
+
+    cursor = start
+    for child in node_children(frame):
+        cursor = visit(child, cursor, 0)
+    return result
+
+
+def to_chrome_trace(frames: list[dict], name: str = "uipc", first_index: int = 0) -> dict:
+    """Chrome trace-event JSON: one thread (track) per frame, nested complete ("X") events in microseconds."""
+    events = [{"name": "process_name", "ph": "M", "pid": 0, "args": {"name": name}}]
+    for index, frame in enumerate(frames, start=first_index):
+        events.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": index, "args": {"name": f"frame {index}"}})
+        events.append({"name": "thread_sort_index", "ph": "M", "pid": 0, "tid": index, "args": {"sort_index": index}})
+        for scope_name, start, end, _ in scopes(frame):
+            events.append(
+                {
+                    "name": scope_name,
+                    "ph": "X",
+                    "pid": 0,
+                    "tid": index,
+                    "ts": start * 1e6,
+                    "dur": (end - start) * 1e6,
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def to_speedscope(frames: list[dict], name: str = "uipc", first_index: int = 0) -> dict:
+    """speedscope evented profiles, one per frame, sharing a frame-name table; times in milliseconds."""
+    names: dict[str, int] = {}
+    profiles = []
+    for index, frame in enumerate(frames, start=first_index):
+        events = []
+        stack: list[tuple[int, float]] = []
+        for scope_name, start, end, depth in scopes(frame):
+            while len(stack) > depth:
+                frame_id, stack_end = stack.pop()
+                events.append({"type": "C", "frame": frame_id, "at": stack_end * 1e3})
+            frame_id = names.setdefault(scope_name, len(names))
+            events.append({"type": "O", "frame": frame_id, "at": start * 1e3})
+            stack.append((frame_id, end))
+        while stack:
+            frame_id, stack_end = stack.pop()
+            events.append({"type": "C", "frame": frame_id, "at": stack_end * 1e3})
+        end_value = max([frame_total(frame) * 1e3] + [e["at"] for e in events])
+        profiles.append(
+            {
+                "type": "evented",
+                "name": f"frame {index}",
+                "unit": "milliseconds",
+                "startValue": 0.0,
+                "endValue": end_value,
+                "events": events,
+            }
+        )
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "bench.trace_export",
+        "activeProfileIndex": 0,
+        "shared": {"frames": [{"name": n} for n in names]},
+        "profiles": profiles,
+    }
@@ -0,0 +1,29 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from synthetic import make_frames
+
+# the harness is run as `python -m bench` from the benchmarks folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def write_frames(tmp_path):
+    """`write_frames(name, durations, contacts=None)` -> path of a `timer_frames.json`."""
+
+    def write(name: str, durations, contacts=None) -> Path:
+        path = tmp_path / name / "timer_frames.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"frames": make_frames(durations, contacts)}, f)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
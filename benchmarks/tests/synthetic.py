@@ -0,0 +1,12 @@
+# synthetic `timer_frames.json` content for the tests
+
+
+def make_frames(durations, contacts=None) -> list[dict]:
+    """Timer frames with a `Newton` scope taking half of every frame."""
+    frames = []
+    for i, d in enumerate(durations):
+        frame = {"duration": float(d), "children": [{"name": "Newton", "duration": float(d) / 2}]}
+        if contacts is not None:
+            frame["metrics"] = {"contacts": float(contacts[i])}
+        frames.append(frame)
+    return frames
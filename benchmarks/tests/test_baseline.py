@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+from bench.baseline import TESTS, compare_series
+
+
+def series(rng, median: float, n: int = 60) -> dict[str, np.ndarray]:
+    frame = rng.normal(median, median * 0.02, n)
+    return {"Newton": frame / 2, "<frame>": frame}
+
+
+@pytest.mark.parametrize("test", TESTS)
+def test_same_distribution_passes(rng, test):
+    results = compare_series(series(rng, 0.010), series(rng, 0.010), ["Newton"], 0.05, 0.95, test, 8)
+    assert [r.timer for r in results if r.gated] == ["Newton"]
+    assert not any(r.regressed for r in results)
+
+
+@pytest.mark.parametrize("test", TESTS)
+def test_slowdown_beyond_threshold_fails(rng, test):
+    results = compare_series(series(rng, 0.010), series(rng, 0.012), ["Newton"], 0.05, 0.95, test, 8)
+    (newton,) = [r for r in results if r.gated]
+    assert newton.regressed
+    assert newton.change == pytest.approx(0.2, abs=0.02)
+    # only gated timers fail the run
+    assert not any(r.regressed for r in results if not r.gated)
+
+
+@pytest.mark.parametrize("test", TESTS)
+def test_slowdown_within_threshold_passes(rng, test):
+    results = compare_series(series(rng, 0.010), series(rng, 0.0101), ["Newton"], 0.05, 0.95, test, 8)
+    assert not any(r.regressed for r in results)
+
+
+def test_gate_pattern_without_a_timer_fails(rng):
+    results = compare_series(series(rng, 0.010), series(rng, 0.010), ["Newtn"], 0.05, 0.95, "bootstrap", 8)
+    (typo,) = [r for r in results if r.missing]
+    assert typo.timer == "Newtn" and typo.missing == "baseline and current"
+    assert typo.regressed and math.isnan(typo.change)
+
+
+def test_gated_timer_missing_from_current_fails(rng):
+    current = series(rng, 0.010)
+    del current["Newton"]
+    results = compare_series(series(rng, 0.010), current, ["Newton"], 0.05, 0.95, "mannwhitney", 8)
+    (missing,) = [r for r in results if r.missing]
+    assert missing.timer == "Newton" and missing.missing == "current"
+    assert missing.regressed
+
+
+def test_unknown_test_is_rejected(rng):
+    with pytest.raises(ValueError):
+        compare_series(series(rng, 0.010), series(rng, 0.010), [], 0.05, 0.95, "t-test", 8)
@@ -0,0 +1,19 @@
+from bench.cases import Case
+from bench.history import HistoryStore, trend_table
+from bench.timer_frames import TOTAL
+
+
+def test_trend_compares_against_the_first_recorded_run(tmp_path, write_frames):
+    store = HistoryStore(tmp_path / "history.sqlite")
+    case = Case(scenario="wrecking_balls", method="stackless_bvh", frames=10)
+    for i, duration in enumerate([0.010, 0.020, 0.030]):
+        store.record(case, {}, write_frames(f"run{i}", [duration] * 10))
+
+    rows = store.trend("wrecking_balls", TOTAL, limit=2)
+    first = store.first_medians("wrecking_balls", TOTAL)
+    assert [row[-1] for row in rows] == [0.020, 0.030]
+    assert list(first.values()) == [0.010]
+
+    changes = [line.rsplit("|", 2)[1].strip() for line in trend_table(rows, first).splitlines()[2:]]
+    assert changes == ["+100.0%", "+200.0%"]
+    store.close()
@@ -0,0 +1,37 @@
+import numpy as np
+from synthetic import make_frames
+
+from bench.baseline import compare_case_phases
+from bench.phases import change_points, frame_signals
+
+
+def two_phases(rng, n: int) -> tuple[np.ndarray, np.ndarray]:
+    # free fall, then a pile-up with more contacts and slower frames
+    durations = np.concatenate([rng.normal(0.010, 0.0002, n), rng.normal(0.030, 0.0002, n)])
+    contacts = np.concatenate([np.zeros(n), np.full(n, 200.0)])
+    return durations, contacts
+
+
+def test_change_points_find_the_step(rng):
+    durations, contacts = two_phases(rng, 40)
+    assert change_points(frame_signals(make_frames(durations, contacts))) == [0, 40, 80]
+
+
+def test_identical_runs_pass_every_phase(rng, write_frames):
+    durations, contacts = two_phases(rng, 40)
+    baseline = write_frames("baseline", durations, contacts)
+    current = write_frames("current", durations, contacts)
+    results = compare_case_phases(baseline, current, ["<frame>"])
+    assert len(results) >= 2
+    assert all(cp is not None for _, cp, _ in results)
+    assert not any(r.regressed for _, _, rs in results for r in rs)
+
+
+def test_phase_missing_from_a_short_run_fails(rng, write_frames):
+    durations, contacts = two_phases(rng, 40)
+    baseline = write_frames("baseline", durations, contacts)
+    current = write_frames("current", durations[:6], contacts[:6])
+    results = compare_case_phases(baseline, current, ["<frame>"])
+    missing = [rs for _, cp, rs in results if cp is None]
+    assert missing
+    assert all(r.regressed and r.missing == "current phase" for rs in missing for r in rs)
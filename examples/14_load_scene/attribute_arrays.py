@@ -0,0 +1,185 @@
+import json
+import re
+
+import numpy as np
+
+from scene_index import BSON_ARRAY, BSON_DOCUMENT, BSON_SCALARS, BsonScanner
+
+# ---------------------------------------------------------------------------
+# Attribute `values` as typed NumPy arrays.
+#
+# JSON values are parsed in one vectorized pass (brackets dropped, numbers
+# read by np.fromstring). BSON values are fixed size records behind every
+# array index, so they are read and written through strided np.ndarray views
+# of the mapped file: no Python object per number in either direction.
+# ---------------------------------------------------------------------------
+SCALAR_TYPE = re.compile(r"(F|I|U)(8|16|32|64)")
+VECTOR_TYPE = re.compile(r"Vector(\d+)(i?)")
+MATRIX_TYPE = re.compile(r"Matrix(\d+)x(\d+)")
+
+
+def element_type(type_name: str):
+    """
+    :return: (dtype, shape of one element) of a libuipc attribute type, or None (e.g. `string`)
+    """
+    m = SCALAR_TYPE.fullmatch(type_name)
+    if m:
+        kind = {"F": "f", "I": "i", "U": "u"}[m.group(1)]
+        return np.dtype(f"{kind}{int(m.group(2)) // 8}"), ()
+    m = VECTOR_TYPE.fullmatch(type_name)
+    if m:
+        return np.dtype(np.int32 if m.group(2) else np.float64), (int(m.group(1)), 1)
+    m = MATRIX_TYPE.fullmatch(type_name)
+    if m:
+        return np.dtype(np.float64), (int(m.group(1)), int(m.group(2)))
+    return None
+
+
+# ------------------------------------------------------------------
+# JSON
+# ------------------------------------------------------------------
+def json_values(buf, start: int, end: int, type_name: str) -> np.ndarray:
+    """
+    Parse the `values` array in `buf[start:end]` into an (n, *element shape) array.
+    """
+    dtype, shape = element_type(type_name)
+    text = bytes(buf[start:end]).translate(None, b"[] \t\r\n")
+    parse = np.float64 if dtype.kind == "f" else np.uint64 if dtype.kind == "u" else np.int64
+    flat = np.fromstring(text, dtype=parse, sep=",") if text else np.zeros(0, dtype=parse)
+    return flat.astype(dtype, copy=False).reshape((-1,) + shape)
+
+
+def json_encode(values: np.ndarray) -> bytes:
+    """
+    The JSON text of `values`, nested the way SceneIO writes it.
+    """
+    return json.dumps(values.tolist(), separators=(",", ":")).encode("utf-8")
+
+
+# ------------------------------------------------------------------
+# BSON
+# ------------------------------------------------------------------
+def _record_layout(scanner: BsonScanner, pos: int):
+    # (type offset, type, value offset) of every scalar of the element at
+    # `pos`, relative to its value offset, and the size of that value
+    t, v = scanner.value(pos)
+    if t in BSON_SCALARS:
+        return [(None, t, 0)], BSON_SCALARS[t].itemsize
+    if t not in (BSON_ARRAY, BSON_DOCUMENT):
+        return None, 0
+    layout = []
+    stack = [pos]
+    while stack:
+        p = stack.pop()
+        for e in reversed(list(scanner.elements(p))):
+            et, ev = scanner.value(e)
+            if et in BSON_SCALARS:
+                layout.append((e - v, et, ev - v))
+            elif et in (BSON_ARRAY, BSON_DOCUMENT):
+                stack.append(e)
+            else:
+                return None, 0
+    layout.sort(key=lambda r: r[2])
+    return layout, scanner.int32(v)
+
+
+def bson_views(scanner: BsonScanner, pos: int, type_name: str):
+    """
+    Strided views of the numbers of the BSON `values` array at `pos`.
+
+    :return: a list of (first row, component, view), or None when the records
+        are not uniform (e.g. ints stored with mixed widths)
+    """
+    dtype, shape = element_type(type_name)
+    components = int(np.prod(shape, dtype=np.int64))
+    buf = scanner.buf
+    _, v = scanner.value(pos)
+    remaining = scanner.int32(v) - 5
+    p = v + 4
+    if remaining == 0:
+        return []
+    first_type = buf[p]
+    layout, record = _record_layout(scanner, p)
+    if layout is None or len(layout) != components:
+        return None
+
+    views = []
+    row = 0
+    digits = 1
+    while remaining > 0:
+        # array keys are "0", "1", ...: within a run of keys with the same
+        # number of digits every element has the same size
+        capacity = 10 if digits == 1 else 9 * 10 ** (digits - 1)
+        stride = 2 + digits + record
+        count = min(capacity, remaining // stride)
+        if count == 0 or (count < capacity and count * stride != remaining):
+            return None
+
+        def strided(offset: int, dt):
+            return np.ndarray((count,), dtype=dt, buffer=buf, offset=p + offset, strides=(stride,))
+
+        if not (strided(0, np.uint8) == first_type).all():
+            return None
+        if layout[0][0] is not None and not (strided(2 + digits, np.int32) == record).all():
+            return None
+        for k, (type_offset, t, value_offset) in enumerate(layout):
+            if type_offset is not None and not (strided(2 + digits + type_offset, np.uint8) == t).all():
+                return None
+            views.append((row, k, strided(2 + digits + value_offset, BSON_SCALARS[t])))
+        row += count
+        p += count * stride
+        remaining -= count * stride
+        digits += 1
+    return views
+
+
+def _rows(views) -> int:
+    return max((row + len(view) for row, _, view in views), default=0)
+
+
+def bson_values(scanner: BsonScanner, pos: int, type_name: str) -> np.ndarray:
+    """
+    Read the BSON `values` array at `pos` into an (n, *element shape) array.
+    """
+    dtype, shape = element_type(type_name)
+    views = bson_views(scanner, pos, type_name)
+    if views is None:
+        return np.asarray(scanner.load(pos), dtype=dtype).reshape((-1,) + shape)
+    out = np.empty((_rows(views), int(np.prod(shape, dtype=np.int64))), dtype=dtype)
+    for row, k, view in views:
+        out[row:row + len(view), k] = view
+    return out.reshape((-1,) + shape)
+
+
+def bson_write(scanner: BsonScanner, pos: int, type_name: str, values: np.ndarray):
+    """
+    Overwrite the BSON `values` array at `pos` in place; the scanner's buffer
+    must be writable and `values` must have the stored number of elements.
+    """
+    views = bson_views(scanner, pos, type_name)
+    if views is None:
+        raise ValueError("the stored values are not uniform records, rewrite the attribute instead")
+    _, shape = element_type(type_name)
+    flat = np.asarray(values).reshape(-1, int(np.prod(shape, dtype=np.int64)))
+    if len(flat) != _rows(views):
+        raise ValueError(f"expected {_rows(views)} values, got {len(flat)}")
+    for row, k, view in views:
+        column = flat[row:row + len(view), k]
+        if view.dtype.kind in "iu" and column.size:
+            info = np.iinfo(view.dtype)
+            if column.min() < info.min or column.max() > info.max:
+                raise ValueError(f"values out of range of the stored {view.dtype}")
+        view[:] = column
+
+
+def read_values(index, i: int) -> np.ndarray:
+    """
+    :return: the values of attribute `i` of a `SceneIndex` as an (n, *element shape) array
+    """
+    type_name = index.attribute_meta(i)["type"]
+    if element_type(type_name) is None:
+        raise TypeError(f"attribute {i} is a {type_name}, which has no array form")
+    start, end = index.value_spans[i]
+    if index.bson:
+        return bson_values(index.scanner, start, type_name)
+    return json_values(index.buf, start, end, type_name)
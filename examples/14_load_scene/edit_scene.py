@@ -5,111 +5,149 @@
 # @date 2025-05-17
 # @version 1.0
 # ---------------------------------
-import json
-from asset_dir import AssetDir
-
-def flatten_json(y):
-    out = {}
-
-    def flatten(x, name=''):
-
-        # If the Nested key-value
-        # pair is of dict type
-        if type(x) is dict:
-
-            for a in x:
-                flatten(x[a], name + a + '_')
-
-        # If the Nested key-value
-        # pair is of list type
-        elif type(x) is list:
-
-            i = 0
-
-            for a in x:
-                flatten(a, name + str(i) + '_')
-                i += 1
-        else:
-            out[name[:-1]] = x
+import mmap
+import shutil
 
-    flatten(y)
-    return out
+import numpy as np
 
-def unflatten_json(y):
-    out = {}
-
-    for a in y:
-        keys = a.split('_')
-        d = out
-
-        for i in range(len(keys) - 1):
-            if keys[i] not in d:
-                d[keys[i]] = {}
-            d = d[keys[i]]
-
-        d[keys[-1]] = y[a]
-
-    return out
+from asset_dir import AssetDir
+from attribute_arrays import bson_write, json_encode, read_values
+from scene_index import BsonScanner, SceneIndex
 
 
 class SceneEdit:
     def __init__(self, scene_path: str):
         self.name = "scene"
         self.scene_path = scene_path
-        self.scene_dict = json.load(open(scene_path, "r"))
-        self.scene_dict_flat = flatten_json(self.scene_dict)
-        # save the scene_dict_flat to a lmdb in memory
-        self.geometries = self.scene_dict["__data__"]["geometry_atlas"]["__data__"]["geometries"]
-        # print("geometries", self.geometries)
-        print("Number of geometries", len(self.geometries)) # 20
-        self.attributes = self.scene_dict["__data__"]["geometry_atlas"]["__data__"]["attributes"]
-        print("Number of attributes", len(self.attributes))
-        self.geometry_slots = self.scene_dict["__data__"]["geometry_slots"]
-        print("Number of geometry slots", len(self.geometry_slots))
-        self.objects = self.scene_dict["__data__"]["object_collection"]["objects"]
-        print("Number of objects", len(self.objects))
-        for i, obj in enumerate(self.objects):
+        # index the file instead of loading it: objects, slots and the byte
+        # spans of geometries and attributes, values are parsed on demand
+        self.index = SceneIndex(scene_path)
+        print("Number of geometries", len(self.index.geometry_spans))
+        print("Number of attributes", len(self.index.attribute_spans))
+        print("Number of geometry slots", len(self.index.slots))
+        print("Number of objects", len(self.index.objects))
+        # edited attribute values by attribute index, written by save()
+        self.edits = {}
+        # searchable names: objects and the attributes of every geometry
+        self.keys = {}
+        for obj in self.index.objects:
+            self.keys[f"objects/{obj['name']}"] = obj
+            for gid in obj["geometries"]:
+                for collection, refs in self.index.attribute_refs(gid).items():
+                    for attr_name, attr_index in refs.items():
+                        self.keys[f"geometries/{gid}/{collection}/{attr_name}"] = attr_index
+
+    def describe(self):
+        for i, obj in enumerate(self.index.objects):
             print(f"Object {i}: {obj}")
-            obj_geom = obj["geometries"]
-            for obj_g in obj_geom:
-                print(f"Object {i} Geometry: {obj_g}")
-                g_slot = self.geometry_slots[obj_g]["index"]
-                print(f"Object {i} Geometry Slot: {g_slot}")
-                gg = self.geometries[g_slot]
-                print(f"Object {i} Geometry: {gg}")
+            for obj_g in obj["geometries"]:
+                gg = self.index.geometry(obj_g)
                 g_type = gg["__meta__"]["type"]
-                print(f"Object {i} Geometry Type: {g_type}")
+                print(f"Object {i} Geometry {obj_g}: slot {self.index.slots[obj_g]}, type {g_type}")
 
                 if g_type == "SimplicialComplex":
-                    v = gg["__data__"]["vertices"]
-                    v_pos_attr_id = v["__data__"]["position"]["index"]
-                    v_pos_attr = self.attributes[v_pos_attr_id]
-                    tri = gg["__data__"]["triangles"]
-
-                    print(v_pos_attr)
+                    v_pos_attr_id = self.index.attribute_index(obj_g, "vertices", "position")
+                    print(f"Object {i} Geometry {obj_g} position: attribute {v_pos_attr_id}, "
+                          f"{self.index.attribute_meta(v_pos_attr_id)['type']}")
                 else:
                     print(f"Object {i} Geometry Type: {g_type} is not SimplicialComplex")
 
     def __call__(self, pattern: str):
         """
-        :param pattern: the pattern to search for
-        :return: a list of objects that match the pattern
+        Search the objects and geometry attributes by name. Keys are
+        `objects/<name>` and `geometries/<id>/<collection>/<attribute>`; the
+        values are not parsed, use `array()` or `attribute()` for them (or
+        `to_json()` for the whole scene as a dict).
+
+        :param pattern: the pattern to search for, e.g. `objects/cubes` or `vertices/position`
+        :return: (key, object or attribute index) of the objects and geometry attributes that match the pattern
         """
-        result = []
-        for k, v in self.scene_dict_flat.items():
-            if pattern in k:
-                result.append((k, v))
-        return result
+        return [(k, v) for k, v in self.keys.items() if pattern in k]
 
+    def attribute(self, gid: int, collection: str, name: str) -> dict:
+        return self.index.attribute(gid, collection, name)
+
+    def array(self, gid: int, collection: str, name: str) -> np.ndarray:
+        """
+        :return: the values of an attribute as an (n, *element shape) array, e.g. (n, 3, 1) for positions
+        """
+        index = self.index.attribute_index(gid, collection, name)
+        if index in self.edits:
+            return self.edits[index]
+        return read_values(self.index, index)
+
+    def geometry_ids(self, objects=None) -> list:
+        """
+        :param objects: object IDs or names, all objects if None
+        """
+        objects = self.index.objects if objects is None else [self.index.object(o) for o in objects]
+        return [gid for obj in objects for gid in obj["geometries"]]
+
+    def arrays(self, name: str, collection: str = "vertices", objects=None) -> dict:
+        """
+        :return: {geometry id: values} of attribute `name` for the geometries of `objects` that have it
+        """
+        out = {}
+        for gid in self.geometry_ids(objects):
+            if name in self.index.attribute_refs(gid).get(collection, {}):
+                out[gid] = self.array(gid, collection, name)
+        return out
+
+    def edit(self, name: str, fn, collection: str = "vertices", objects=None):
+        """
+        Batch edit: replace attribute `name` of the geometries of `objects`
+        with `fn(values)`, a vectorized function of the whole array. An
+        attribute shared by several geometries is edited once.
+        """
+        done = set()
+        for gid in self.geometry_ids(objects):
+            index = self.index.attribute_refs(gid).get(collection, {}).get(name)
+            if index is None or index in done:
+                continue
+            done.add(index)
+            values = self.array(gid, collection, name)
+            new = np.asarray(fn(values), dtype=values.dtype)
+            if new.shape[1:] != values.shape[1:]:
+                raise ValueError(f"edit of {name} changed the element shape {values.shape[1:]} to {new.shape[1:]}")
+            self.edits[index] = new
+
+    def save(self, path: str):
+        """
+        Write the scene with the edits to `path`. Everything but the edited
+        values is copied byte for byte; BSON values are written in place
+        through strided views, JSON values are re-encoded and spliced in.
+        """
+        if self.index.bson:
+            shutil.copyfile(self.scene_path, path)
+            with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as buf:
+                scanner = BsonScanner(buf)
+                for index, values in self.edits.items():
+                    bson_write(scanner, self.index.value_spans[index][0],
+                               self.index.attribute_meta(index)["type"], values)
+            return
+        with open(path, "wb") as f, memoryview(self.index.buf) as src:
+            pos = 0
+            for index in sorted(self.edits, key=lambda i: self.index.value_spans[i][0]):
+                start, end = self.index.value_spans[index]
+                f.write(src[pos:start])
+                f.write(json_encode(self.edits[index]))
+                pos = end
+            f.write(src[pos:])
 
     def to_json(self):
-        return unflatten_json(self.scene_dict_flat)
+        # the whole scene, parsed at once
+        s = self.index.scanner
+        return s.load(s.root(), len(self.index.buf))
+
 
 if __name__ == "__main__":
     folder = AssetDir.folder(__file__)
     scene_path = f"{folder}/scene.json"
     scene_edit = SceneEdit(scene_path)
-    # objects = scene_edit("objectsd")
-    # geometries = scene_edit("geometry_atlas___data___geometries")
-    # print(geometries)
-
+    scene_edit.describe()
+    print(scene_edit("objects/"))
+    print(scene_edit("vertices/position"))
+    # lift the ramp by 0.1 in one vectorized edit and save the edited scene
+    print(scene_edit.arrays("position", objects=["ramp"]))
+    scene_edit.edit("position", lambda p: p + np.array([[0.0], [0.1], [0.0]]), objects=["ramp"])
+    scene_edit.save(f"{AssetDir.output_path(__file__)}/scene_edited.json")
@@ -0,0 +1,423 @@
+import json
+import mmap
+import re
+import struct
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Index a SceneIO JSON (or BSON) dump without loading it.
+#
+# The file is memory-mapped and scanned once. Only the structure is walked:
+# arrays of numbers (attribute `values`) are skipped with a vectorized bracket
+# count (BSON carries the sizes), and every attribute and geometry is
+# remembered as a byte span that is parsed on demand. Memory stays
+# proportional to the number of attributes, not to the size of the file.
+# ---------------------------------------------------------------------------
+WHITESPACE = frozenset(b" \t\r\n")
+STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.S)
+SCALAR = re.compile(rb"-?[0-9][0-9.eE+-]*|true|false|null")
+OPEN = frozenset(b"[{")
+CHUNK = 1 << 22
+
+
+class JsonScanner:
+    """
+    Walk the structure of a JSON buffer (bytes or mmap) by byte offsets.
+    """
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.size = len(buf)
+
+    def ws(self, pos: int) -> int:
+        while pos < self.size and self.buf[pos] in WHITESPACE:
+            pos += 1
+        return pos
+
+    def expect(self, pos: int, char: bytes) -> int:
+        pos = self.ws(pos)
+        if self.buf[pos:pos + 1] != char:
+            raise ValueError(f"expected {char.decode()} at byte {pos}")
+        return pos + 1
+
+    def string(self, pos: int):
+        """
+        :return: the decoded string at `pos` and the offset after it
+        """
+        m = STRING.match(self.buf, pos)
+        if m is None:
+            raise ValueError(f"expected a string at byte {pos}")
+        return json.loads(m.group()), m.end()
+
+    def skip(self, pos: int) -> int:
+        """
+        :return: the offset right after the value starting at `pos`
+        """
+        pos = self.ws(pos)
+        c = self.buf[pos]
+        if c == ord('"'):
+            return STRING.match(self.buf, pos).end()
+        if c in OPEN:
+            return self._skip_container(pos)
+        m = SCALAR.match(self.buf, pos)
+        if m is None:
+            raise ValueError(f"unexpected byte {bytes([c])!r} at {pos}")
+        return m.end()
+
+    def _skip_container(self, pos: int) -> int:
+        if self.buf[pos] == ord("{"):
+            return self.walk_object(pos, lambda key, start: None)
+        end = self._skip_numbers(pos)
+        return end if end is not None else self.walk_array(pos, lambda start: None)
+
+    def _skip_numbers(self, pos: int):
+        # count brackets with numpy in growing chunks; gives up (None) on a
+        # string or an object, which could hide brackets
+        depth = 0
+        start = pos
+        chunk_size = 256
+        while start < self.size:
+            chunk = np.frombuffer(self.buf, dtype=np.uint8, count=min(chunk_size, self.size - start), offset=start)
+            d = depth + np.cumsum((chunk == ord("[")).astype(np.int32) - (chunk == ord("]")))
+            zero = np.flatnonzero(d == 0)
+            end = int(zero[0]) + 1 if zero.size else len(chunk)
+            head = chunk[:end]
+            if ((head == ord('"')) | (head == ord("{"))).any():
+                return None
+            if zero.size:
+                return start + end
+            depth = int(d[-1])
+            start += len(chunk)
+            chunk_size = min(chunk_size * 4, CHUNK)
+        raise ValueError(f"unterminated array at byte {pos}")
+
+    def walk_object(self, pos: int, visit) -> int:
+        """
+        Call `visit(key, start)` for every member of the object at `pos`; it
+        returns the end of the value it consumed, or None to have it skipped.
+
+        :return: the offset after the object
+        """
+        pos = self.expect(pos, b"{")
+        pos = self.ws(pos)
+        if self.buf[pos] == ord("}"):
+            return pos + 1
+        while True:
+            key, pos = self.string(self.ws(pos))
+            start = self.ws(self.expect(pos, b":"))
+            end = visit(key, start)
+            pos = self.ws(self.skip(start) if end is None else end)
+            c = self.buf[pos]
+            if c == ord("}"):
+                return pos + 1
+            if c != ord(","):
+                raise ValueError(f"expected , or }} at byte {pos}")
+            pos += 1
+
+    def walk_array(self, pos: int, visit) -> int:
+        """
+        Call `visit(start)` for every item of the array at `pos`; it returns
+        the end of the item it consumed, or None to have it skipped.
+
+        :return: the offset after the array
+        """
+        pos = self.ws(self.expect(pos, b"["))
+        if self.buf[pos] == ord("]"):
+            return pos + 1
+        while True:
+            start = self.ws(pos)
+            end = visit(start)
+            pos = self.ws(self.skip(start) if end is None else end)
+            c = self.buf[pos]
+            if c == ord("]"):
+                return pos + 1
+            if c != ord(","):
+                raise ValueError(f"expected , or ] at byte {pos}")
+            pos += 1
+
+    def spans(self, pos: int):
+        """
+        :return: `(start, end)` of every item of the array at `pos`, and the offset after the array
+        """
+        out = []
+
+        def visit(start):
+            out.append((start, self.skip(start)))
+            return out[-1][1]
+
+        return out, self.walk_array(pos, visit)
+
+    def root(self) -> int:
+        return self.ws(0)
+
+    def load(self, start: int, end: int):
+        return json.loads(self.buf[start:end])
+
+
+# BSON element types written by SceneIO.save(*.bson) and the size of the fixed size ones
+BSON_DOUBLE, BSON_STRING, BSON_DOCUMENT, BSON_ARRAY, BSON_BINARY = 0x01, 0x02, 0x03, 0x04, 0x05
+BSON_BOOL, BSON_NULL, BSON_INT32, BSON_UINT64, BSON_INT64 = 0x08, 0x0A, 0x10, 0x11, 0x12
+BSON_SCALARS = {
+    BSON_DOUBLE: np.dtype("<f8"),
+    BSON_BOOL: np.dtype("u1"),
+    BSON_INT32: np.dtype("<i4"),
+    BSON_UINT64: np.dtype("<u8"),
+    BSON_INT64: np.dtype("<i8"),
+}
+INT32 = struct.Struct("<i")
+
+
+class BsonScanner:
+    """
+    The `JsonScanner` interface over a BSON buffer. A position is the offset
+    of an element (its type byte); `ROOT` is the top level document.
+    Documents carry their size, so skipping is O(1).
+    """
+
+    ROOT = -1
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.size = len(buf)
+
+    def root(self) -> int:
+        return self.ROOT
+
+    def value(self, pos: int):
+        """
+        :return: the type of the element at `pos` and the offset of its value
+        """
+        if pos == self.ROOT:
+            return BSON_DOCUMENT, 0
+        return self.buf[pos], self.buf.find(b"\0", pos + 1) + 1
+
+    def key(self, pos: int) -> str:
+        return bytes(self.buf[pos + 1:self.buf.find(b"\0", pos + 1)]).decode("utf-8")
+
+    def int32(self, offset: int) -> int:
+        return INT32.unpack_from(self.buf, offset)[0]
+
+    def value_size(self, t: int, v: int) -> int:
+        if t in (BSON_DOCUMENT, BSON_ARRAY):
+            return self.int32(v)
+        if t == BSON_STRING:
+            return 4 + self.int32(v)
+        if t == BSON_BINARY:
+            return 5 + self.int32(v)
+        if t == BSON_NULL:
+            return 0
+        return BSON_SCALARS[t].itemsize
+
+    def skip(self, pos: int) -> int:
+        t, v = self.value(pos)
+        return v + self.value_size(t, v)
+
+    def elements(self, pos: int):
+        """
+        :return: the element offsets of the document or array at `pos`
+        """
+        _, v = self.value(pos)
+        end = v + self.int32(v) - 1
+        p = v + 4
+        while p < end:
+            yield p
+            p = self.skip(p)
+
+    def walk_object(self, pos: int, visit) -> int:
+        for p in self.elements(pos):
+            visit(self.key(p), p)
+        return self.skip(pos)
+
+    def walk_array(self, pos: int, visit) -> int:
+        for p in self.elements(pos):
+            visit(p)
+        return self.skip(pos)
+
+    def spans(self, pos: int):
+        return [(p, self.skip(p)) for p in self.elements(pos)], self.skip(pos)
+
+    def load(self, start: int, end: int = None):
+        t, v = self.value(start)
+        if t == BSON_DOCUMENT:
+            return {self.key(p): self.load(p) for p in self.elements(start)}
+        if t == BSON_ARRAY:
+            return [self.load(p) for p in self.elements(start)]
+        if t == BSON_STRING:
+            return bytes(self.buf[v + 4:v + 3 + self.int32(v)]).decode("utf-8")
+        if t == BSON_BINARY:
+            return bytes(self.buf[v + 5:v + 5 + self.int32(v)])
+        if t == BSON_NULL:
+            return None
+        x = np.frombuffer(self.buf, dtype=BSON_SCALARS[t], count=1, offset=v)[0]
+        return bool(x) if t == BSON_BOOL else x.item()
+
+
+class SceneIndex:
+    """
+    Object, geometry and attribute lookups on a SceneIO JSON or BSON file,
+    indexed in one streaming pass.
+
+    Objects are found by ID or name, geometries by ID through the geometry
+    slots, and attributes by geometry ID, collection and name; all of them
+    are dictionary lookups. Geometries and attributes are parsed from their
+    byte span when they are first asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        self.buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.bson = str(path).endswith(".bson")
+        self.scanner = BsonScanner(self.buf) if self.bson else JsonScanner(self.buf)
+
+        self.attribute_spans = []
+        self.value_spans = []  # span of the `values` array of every attribute
+        self.attribute_metas = []
+        self.geometry_spans = []
+        self.spans = {}  # other top level members of the scene, parsed on demand
+        self.objects = []
+        self.slots = {}  # geometry id -> index in the atlas
+        self.rest_slots = {}
+        self._build()
+
+        self.objects_by_id = {o["id"]: o for o in self.objects}
+        self.objects_by_name = {}
+        for o in self.objects:
+            self.objects_by_name.setdefault(o["name"], []).append(o)
+        self._geometries = {}
+
+    # ------------------------------------------------------------------
+    # index
+    # ------------------------------------------------------------------
+    def _build(self):
+        s = self.scanner
+
+        def attribute(start):
+            # keep the span of the attribute, its `values` and its parsed `__meta__`
+            meta = {}
+            values = [None]
+
+            def data(key, start):
+                if key == "values":
+                    values[0] = (start, s.skip(start))
+                    return values[0][1]
+                return None
+
+            def member(key, start):
+                if key == "__data__":
+                    return s.walk_object(start, data)
+                if key == "__meta__":
+                    end = s.skip(start)
+                    meta.update(s.load(start, end))
+                    return end
+                return None
+
+            end = s.walk_object(start, member)
+            self.attribute_spans.append((start, end))
+            self.value_spans.append(values[0])
+            self.attribute_metas.append(meta)
+            return end
+
+        def atlas_data(key, start):
+            if key == "attributes":
+                return s.walk_array(start, attribute)
+            if key == "geometries":
+                self.geometry_spans, end = s.spans(start)
+                return end
+            return None
+
+        def atlas(key, start):
+            return s.walk_object(start, atlas_data) if key == "__data__" else None
+
+        def scene_data(key, start):
+            if key == "geometry_atlas":
+                return s.walk_object(start, atlas)
+            end = s.skip(start)
+            if key == "object_collection":
+                self.objects = s.load(start, end)["objects"]
+            elif key == "geometry_slots":
+                self.slots = {slot["id"]: slot["index"] for slot in s.load(start, end)}
+            elif key == "rest_geometry_slots":
+                self.rest_slots = {slot["id"]: slot["index"] for slot in s.load(start, end)}
+            else:
+                self.spans[key] = (start, end)
+            return end
+
+        def root(key, start):
+            return s.walk_object(start, scene_data) if key == "__data__" else None
+
+        s.walk_object(s.root(), root)
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+    def object(self, key) -> dict:
+        """
+        :param key: an object ID or name
+        :return: the object, with its geometry IDs
+        """
+        if isinstance(key, int):
+            return self.objects_by_id[key]
+        objects = self.objects_by_name[key]
+        if len(objects) > 1:
+            raise KeyError(f"{len(objects)} objects are named {key!r}, use an ID")
+        return objects[0]
+
+    def find_objects(self, pattern: str) -> list:
+        """
+        :return: the objects whose name contains `pattern`
+        """
+        return [o for name, objects in self.objects_by_name.items() if pattern in name for o in objects]
+
+    def geometry(self, gid: int, rest: bool = False) -> dict:
+        """
+        :return: the geometry of slot `gid` (its attribute references, not the values)
+        """
+        index = (self.rest_slots if rest else self.slots)[gid]
+        if index not in self._geometries:
+            self._geometries[index] = self.scanner.load(*self.geometry_spans[index])
+        return self._geometries[index]
+
+    def attribute_refs(self, gid: int, rest: bool = False) -> dict:
+        """
+        :return: {collection: {attribute name: index into the atlas attributes}}
+        """
+        out = {}
+        for collection, c in self.geometry(gid, rest)["__data__"].items():
+            refs = c.get("__data__") if isinstance(c, dict) else None
+            if isinstance(refs, dict):
+                out[collection] = {name: ref["index"] for name, ref in refs.items()}
+        return out
+
+    def attribute_index(self, gid: int, collection: str, name: str, rest: bool = False) -> int:
+        return self.attribute_refs(gid, rest)[collection][name]
+
+    def attribute(self, gid: int, collection: str, name: str, rest: bool = False) -> dict:
+        """
+        :return: the attribute JSON (`__meta__` and `__data__` with `values`)
+        """
+        index = self.attribute_index(gid, collection, name, rest)
+        return self.scanner.load(*self.attribute_spans[index])
+
+    def attribute_meta(self, index: int) -> dict:
+        """
+        :return: the `__meta__` of attribute `index`, without parsing its values
+        """
+        return self.attribute_metas[index]
+
+    def member(self, key: str):
+        """
+        :return: another top level member of the scene, e.g. `contact_tabular`
+        """
+        return self.scanner.load(*self.spans[key])
+
+    def close(self):
+        self.buf.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
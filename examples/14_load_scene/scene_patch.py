@@ -0,0 +1,161 @@
+import mmap
+import os
+import shutil
+
+import numpy as np
+
+from asset_dir import AssetDir
+from attribute_arrays import bson_write, element_type, json_encode
+from scene_index import WHITESPACE, BsonScanner, SceneIndex
+
+# the attribute delta understood by 15_scene_commit (attribute_diff.apply_attribute_delta)
+DELTA_TYPE = "AttributeDelta"
+
+
+class ScenePatch:
+    """
+    Rewrite attribute values of a saved scene file in place.
+
+    `set()` queues new values, `apply()` writes them and returns the matching
+    attribute delta, which a live `Scene` can take like a commit. Only the
+    patched payloads are written when they fit:
+
+    - BSON values have a fixed size per element and are always overwritten
+      in place (the number of elements must stay the same).
+    - JSON values are re-encoded and padded with spaces into their old span
+      and the whitespace after it. When one no longer fits, the file is
+      rewritten once, leaving `slack` (a fraction of the new size) of spaces
+      after every patched value so the next patches of a sweep fit again.
+    """
+
+    def __init__(self, path: str, slack: float = 0.1):
+        self.path = path
+        self.slack = slack
+        self.index = SceneIndex(path)
+        self.patches = {}  # attribute index -> values
+        self.bytes_written = 0
+        self.rewrites = 0
+
+    def set(self, gid: int, collection: str, name: str, values, rest: bool = False):
+        """
+        Queue new values for an attribute. An attribute shared by several
+        geometries changes for all of them.
+        """
+        index = self.index.attribute_index(gid, collection, name, rest)
+        type_name = self.index.attribute_meta(index)["type"]
+        if element_type(type_name) is None:
+            raise TypeError(f"{name} is a {type_name}, which can not be patched as an array")
+        dtype, shape = element_type(type_name)
+        self.patches[index] = np.asarray(values, dtype=dtype).reshape((-1,) + shape)
+
+    def _users(self) -> dict:
+        # attribute index -> [(geometry id, collection, name)] of the scene geometries
+        users = {}
+        for gid in self.index.slots:
+            for collection, refs in self.index.attribute_refs(gid).items():
+                for name, index in refs.items():
+                    users.setdefault(index, []).append((gid, collection, name))
+        return users
+
+    def delta(self) -> dict:
+        """
+        :return: the queued patches as an attribute delta (rest geometries are left out)
+        """
+        users = self._users()
+        geometries = {}
+        for index, values in self.patches.items():
+            attr = {
+                "__data__": {"values": values.tolist()},
+                "__meta__": {"type": self.index.attribute_meta(index)["type"]},
+            }
+            for gid, collection, name in users.get(index, []):
+                geometries.setdefault(gid, {}).setdefault(collection, {})[name] = attr
+        return {
+            "__data__": {"geometries": [{"id": gid, "collections": c} for gid, c in sorted(geometries.items())]},
+            "__meta__": {"type": DELTA_TYPE},
+        }
+
+    def apply(self) -> dict:
+        """
+        Write the queued patches to the file.
+
+        :return: the attribute delta of what was written
+        """
+        delta = self.delta()
+        if self.index.bson:
+            self._apply_bson()
+        else:
+            self._apply_json()
+        self.patches = {}
+        return delta
+
+    def _apply_bson(self):
+        with open(self.path, "r+b") as f, mmap.mmap(f.fileno(), 0) as buf:
+            scanner = BsonScanner(buf)
+            for index, values in self.patches.items():
+                start, end = self.index.value_spans[index]
+                bson_write(scanner, start, self.index.attribute_meta(index)["type"], values)
+                self.bytes_written += end - start
+
+    def _capacity(self, index: int) -> tuple:
+        # the span of a JSON value plus the whitespace after it: padding left
+        # by an earlier patch or rewrite is room for the next one
+        start, end = self.index.value_spans[index]
+        buf = self.index.buf
+        while end < len(buf) and buf[end] in WHITESPACE:
+            end += 1
+        return start, end
+
+    def _apply_json(self):
+        encoded = {index: json_encode(values) for index, values in self.patches.items()}
+        capacity = {index: self._capacity(index) for index in encoded}
+        if any(len(data) > capacity[i][1] - capacity[i][0] for i, data in encoded.items()):
+            self._rewrite_json(encoded, capacity)
+            return
+        with open(self.path, "r+b") as f:
+            for index, data in encoded.items():
+                start, end = capacity[index]
+                f.seek(start)
+                f.write(data.ljust(end - start))
+                self.bytes_written += end - start
+                # the value now ends earlier or later, the rest of its room is whitespace
+                self.index.value_spans[index] = (start, start + len(data))
+
+    def _rewrite_json(self, encoded: dict, capacity: dict):
+        tmp = f"{self.path}.partial"
+        with open(tmp, "wb") as f, memoryview(self.index.buf) as src:
+            pos = 0
+            for index in sorted(encoded, key=lambda i: capacity[i][0]):
+                start, end = capacity[index]
+                data = encoded[index]
+                f.write(src[pos:start])
+                f.write(data.ljust(max(end - start, int(len(data) * (1 + self.slack)))))
+                pos = end
+            f.write(src[pos:])
+            self.bytes_written += f.tell()
+        self.index.close()
+        os.replace(tmp, self.path)
+        self.index = SceneIndex(self.path)
+        self.rewrites += 1
+
+    def close(self):
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    folder = AssetDir.folder(__file__)
+    scene_path = f"{AssetDir.output_path(__file__)}/scene.json"
+    shutil.copyfile(f"{folder}/scene.json", scene_path)
+    # sweep the mass density of the cubes without touching the rest of the file
+    with ScenePatch(scene_path) as patch:
+        for density in [500.0, 1000.0, 1234.5678, 2000.0]:
+            patch.set(0, "meta", "mass_density", [density])
+            delta = patch.apply()
+            print(f"density {density}: {patch.bytes_written} bytes written, {patch.rewrites} rewrites")
+        print(delta)
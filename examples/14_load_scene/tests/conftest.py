@@ -0,0 +1,20 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# the example's modules import each other as top level modules
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(EXAMPLE_DIR))
+
+
+@pytest.fixture
+def compact_scene(tmp_path) -> Path:
+    """scene.json without any whitespace, so no value has room to grow."""
+    path = tmp_path / "scene.json"
+    with open(EXAMPLE_DIR / "scene.json", "r") as f:
+        scene = json.load(f)
+    with open(path, "w") as f:
+        json.dump(scene, f, separators=(",", ":"))
+    return path
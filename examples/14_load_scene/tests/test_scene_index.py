@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from scene_index import JsonScanner, SceneIndex
+
+SCENE = Path(__file__).resolve().parent.parent / "scene.json"
+
+
+def test_scanner_spans_cover_every_item():
+    buf = b' [1, [2, [3]] , {"a": "]\\"}"}, "x",-2.5e3 ] '
+    spans, end = JsonScanner(buf).spans(1)
+    assert [json.loads(buf[start:stop]) for start, stop in spans] == [1, [2, [3]], {"a": ']"}'}, "x", -2.5e3]
+    assert buf[end - 1:end] == b"]"
+
+
+def test_attribute_spans_match_the_parsed_scene():
+    with open(SCENE, "r") as f:
+        atlas = json.load(f)["__data__"]["geometry_atlas"]["__data__"]
+    with SceneIndex(str(SCENE)) as index:
+        assert len(index.attribute_spans) == len(atlas["attributes"])
+        for i, attribute in enumerate(atlas["attributes"]):
+            assert index.scanner.load(*index.attribute_spans[i]) == attribute
+            assert index.scanner.load(*index.value_spans[i]) == attribute["__data__"]["values"]
+            assert index.attribute_meta(i) == attribute["__meta__"]
+        assert [index.scanner.load(*span) for span in index.geometry_spans] == atlas["geometries"]
+
+
+def test_attribute_lookup_by_geometry_id():
+    with open(SCENE, "r") as f:
+        data = json.load(f)["__data__"]
+    atlas = data["geometry_atlas"]["__data__"]
+    with SceneIndex(str(SCENE)) as index:
+        for slot in data["geometry_slots"]:
+            geometry = atlas["geometries"][slot["index"]]
+            assert index.geometry(slot["id"]) == geometry
+            for name, ref in geometry["__data__"]["meta"]["__data__"].items():
+                assert index.attribute(slot["id"], "meta", name) == atlas["attributes"][ref["index"]]
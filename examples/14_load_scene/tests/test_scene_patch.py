@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+
+from attribute_arrays import read_values
+from scene_index import SceneIndex
+from scene_patch import ScenePatch
+
+
+def mass_density(path) -> np.ndarray:
+    index = SceneIndex(str(path))
+    try:
+        return read_values(index, index.attribute_index(0, "meta", "mass_density"))
+    finally:
+        index.close()
+
+
+def test_growing_patches_rewrite_once(compact_scene):
+    with ScenePatch(str(compact_scene), slack=0.5) as patch:
+        for density in [1234.5678, 1234.56789, 1234.567891, 1.25, 1234.5678912]:
+            patch.set(0, "meta", "mass_density", [density])
+            patch.apply()
+        assert patch.rewrites == 1
+    assert mass_density(compact_scene).tolist() == [1234.5678912]
+    with open(compact_scene, "r") as f:
+        json.load(f)
+
+
+def test_patch_that_fits_is_written_in_place(compact_scene):
+    size = compact_scene.stat().st_size
+    with ScenePatch(str(compact_scene)) as patch:
+        patch.set(0, "meta", "mass_density", [2.0])
+        patch.apply()
+        assert patch.rewrites == 0
+        assert patch.bytes_written < 64
+    assert compact_scene.stat().st_size == size
+    assert mass_density(compact_scene).tolist() == [2.0]
+
+
+def test_apply_returns_attribute_delta(compact_scene):
+    with ScenePatch(str(compact_scene)) as patch:
+        patch.set(0, "meta", "mass_density", [500.0])
+        delta = patch.apply()
+    assert delta["__meta__"]["type"] == "AttributeDelta"
+    geometries = {g["id"]: g["collections"] for g in delta["__data__"]["geometries"]}
+    assert geometries[0]["meta"]["mass_density"]["__data__"]["values"] == [500.0]
@@ -0,0 +1,147 @@
+import numpy as np
+
+from uipc import view
+
+# collections an attribute can live in, by accessor name
+COLLECTIONS = ('vertices', 'edges', 'triangles', 'tetrahedra', 'instances', 'meta')
+
+DELTA_TYPE = 'AttributeDelta'
+
+
+def _type_name(a: np.ndarray) -> str:
+    # libuipc attribute type names, so `CommitCodec` treats the values as floats
+    if a.ndim == 1:
+        return 'F64'
+    if a.ndim == 2 or a.shape[2] == 1:
+        return f'Vector{a.shape[1]}'
+    return f'Matrix{a.shape[1]}x{a.shape[2]}'
+
+
+def _find(geometry, collection: str, name: str):
+    accessor = getattr(geometry, collection, None)
+    return None if accessor is None else accessor().find(name)
+
+
+def _stamp(attr):
+    # the modification stamp of an attribute slot, where the uipc build exposes one
+    last_modified = getattr(attr, 'last_modified', None)
+    return last_modified() if callable(last_modified) else None
+
+
+class AttributeDiff:
+    '''
+    Send just the watched attributes that changed, instead of diffing a full
+    `SceneSnapshot(scene)` every frame.
+
+    The watched `attributes` (by name, e.g. `position` and `transform`) of
+    the geometries of `objects` (names or IDs, all objects of `scene_json`,
+    i.e. `scene_io.to_json()`, if None) are tracked per attribute slot,
+    without reading their buffers. Geometries and attributes outside that
+    selection are never read or serialized, so the diff itself is filtered:
+
+    - `touch()` marks attributes as changed; call it from the code that
+      writes them, e.g. a script editing geometry, or after
+      `world.retrieve()` for the objects the simulation moves.
+    - where the uipc build exposes `last_modified()` on attribute slots, a
+      slot whose stamp moved since the last commit counts as changed too.
+
+    `commit_to_json()` serializes only the changed attributes, straight from
+    the live buffers (no copies are kept), as an attribute delta for
+    `apply_attribute_delta`. Anything else (new objects, velocities, ...)
+    is not followed: use `SceneSnapshot` when that has to reach the reader.
+    '''
+    def __init__(self, scene, scene_json: dict, attributes=('position', 'transform'), objects=None):
+        self.scene = scene
+        self.attributes = tuple(attributes)
+        self.object_table = scene_json['__data__']['object_collection']['objects']
+        self.geometry_ids = self._geometry_ids(objects)
+        self.dirty = set()      # (geometry id, name) touched since the last commit
+        self.stamps = {}        # (geometry id, collection, name) -> last_modified() at the last commit
+        self.commits = 0
+        self.attributes_sent = 0
+        for gid in self.geometry_ids:
+            for collection, name, attr in self._slots(gid, self.attributes):
+                stamp = _stamp(attr)
+                if stamp is not None:
+                    self.stamps[(gid, collection, name)] = stamp
+
+    def _slots(self, gid: int, names):
+        slot, _ = self.scene.geometries().find(gid)
+        if slot is None:
+            return
+        geometry = slot.geometry()
+        for collection in COLLECTIONS:
+            for name in names:
+                attr = _find(geometry, collection, name)
+                if attr is not None:
+                    yield collection, name, attr
+
+    def _geometry_ids(self, objects) -> list:
+        if objects is None:
+            return sorted(g for obj in self.object_table for g in obj['geometries'])
+        wanted = set(objects)
+        return sorted(g for obj in self.object_table if obj['id'] in wanted or obj['name'] in wanted
+                      for g in obj['geometries'])
+
+    def touch(self, objects=None, attributes=None):
+        '''
+        Mark watched attributes as changed.
+
+        :param objects: object IDs or names, all objects if None
+        :param attributes: attribute names, all watched attributes if None
+        '''
+        names = self.attributes if attributes is None else [a for a in attributes if a in self.attributes]
+        selected = set(self.geometry_ids)
+        gids = [g for g in self._geometry_ids(objects) if g in selected]
+        self.dirty.update((gid, name) for gid in gids for name in names)
+
+    def commit_to_json(self) -> dict:
+        '''The watched attributes that changed since the last commit, as a JSON delta.'''
+        candidates = {}
+        for gid, name in self.dirty:
+            candidates.setdefault(gid, set()).add(name)
+        for gid, _, name in self.stamps:
+            candidates.setdefault(gid, set()).add(name)
+
+        geometries = {}
+        for gid in sorted(candidates):
+            for collection, name, attr in self._slots(gid, sorted(candidates[gid])):
+                key = (gid, collection, name)
+                stamp = _stamp(attr)
+                if (gid, name) not in self.dirty and (stamp is None or stamp == self.stamps.get(key)):
+                    continue
+                if stamp is not None:
+                    self.stamps[key] = stamp
+                values = np.asarray(attr.view())
+                self.attributes_sent += 1
+                attributes = geometries.setdefault(gid, {}).setdefault(collection, {})
+                attributes[name] = {
+                    '__data__': {'values': values.tolist()},
+                    '__meta__': {'type': _type_name(values)},
+                }
+        self.dirty.clear()
+        self.commits += 1
+        return {
+            '__data__': {'geometries': [{'id': gid, 'collections': c} for gid, c in geometries.items()]},
+            '__meta__': {'type': DELTA_TYPE},
+        }
+
+
+def is_attribute_delta(commit: dict) -> bool:
+    return commit.get('__meta__', {}).get('type') == DELTA_TYPE
+
+
+def apply_attribute_delta(scene, commit: dict):
+    '''Write the attribute values of a delta into the matching geometries of `scene`.'''
+    for g in commit['__data__']['geometries']:
+        slot, _ = scene.geometries().find(g['id'])
+        if slot is None:
+            continue
+        geometry = slot.geometry()
+        for collection, attributes in g['collections'].items():
+            for name, attr_json in attributes.items():
+                attr = _find(geometry, collection, name)
+                if attr is None:
+                    continue
+                v = view(attr)
+                v[:] = np.asarray(attr_json['__data__']['values'], dtype=v.dtype).reshape(v.shape)
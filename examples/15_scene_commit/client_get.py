@@ -12,7 +12,8 @@ from uipc.constitution import AffineBodyConstitution, StableNeoHookean
 from uipc.gui import SceneGUI
 from uipc.unit import MPa, GPa
 from asset_dir import AssetDir
-import pathlib as pl
+from commit_log import CommitLogReader
+from playback import Playback
 
 Logger.set_level(Logger.Level.Warn)
 
@@ -20,47 +21,53 @@ this_folder = AssetDir.folder(__file__)
 output_path = AssetDir.output_path(this_folder)
 
 # --------------------------------------------------------
-# load from bson (binary json)
-scene = SceneIO.load(f'{output_path}/scene/scene0.bson')
-# OR use:
-# SceneIO.from_json(...)
-# to load the scene from a json
+# commits and keyframes appended by server_run.py, memory-mapped;
+# the server may still be writing, new frames are picked up as they arrive
+commit_log = CommitLogReader(f'{output_path}/scene/commits')
+# decode the next 8 commits ahead on a background thread
+playback = Playback(commit_log, prefetch_depth=8)
+# restore keyframe 0, the same scene as:
+# SceneIO.load(f'{output_path}/scene/scene0.bson')
+playback.seek(0)
 # --------------------------------------------------------
 
-scene_io = SceneIO(scene)
-sgui = SceneGUI(scene, 'split')
+sgui = SceneGUI(playback.scene, 'split')
 
 ps.init()
 sgui.register()
 sgui.set_edge_width(1)
 
 run = False
-frame = 1
 def on_update():
     global run
-    global frame
-    
-    path = f'{output_path}/scene/scene{frame}.bson'
+    global sgui
     
     if(imgui.Button('run & stop')):
         run = not run
+    imgui.Text(playback.prefetch.stats())
     
-    if(not pl.Path(path).exists()):
+    # -----------------------------------------
+    # scrub: seeking restores the nearest keyframe and applies
+    # at most keyframe_interval commits after it
+    last = max(commit_log.frames(), default=0)
+    changed, target = imgui.SliderInt('frame', playback.frame, 0, last)
+    if(changed):
         run = False
+        if(playback.seek(target)):
+            # seeking backwards created a new scene from a keyframe
+            sgui = SceneGUI(playback.scene, 'split')
+            sgui.register()
+            sgui.set_edge_width(1)
+        sgui.update()
+    # -----------------------------------------
 
     if(run):
-        print(f'load update from {path}')
-        
-        # -----------------------------------------
-        # update from the scene commit files
-        scene_io.update(path)
-        
-        # OR use:
-        # scene_io.update_from_json(...)
-        # -----------------------------------------
-        
-        sgui.update()
-        frame += 1
+        # apply the next commit of the log
+        if(playback.step()):
+            sgui.update()
+        else:
+            run = False
 
 ps.set_user_callback(on_update)
-ps.show()
\ No newline at end of file
+ps.show()
+playback.close()
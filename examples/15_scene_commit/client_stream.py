@@ -0,0 +1,59 @@
+import polyscope as ps
+from polyscope import imgui
+
+from uipc import Logger
+from uipc.core import SceneIO
+from uipc.gui import SceneGUI
+from commit_log import KEYFRAME
+from commit_stream import CommitSubscriber
+from commit_writer import decode_json
+from attribute_diff import apply_attribute_delta, is_attribute_delta
+
+Logger.set_level(Logger.Level.Warn)
+
+# --------------------------------------------------------
+# live view of a server_run.py that writes to a CommitServer;
+# the server starts every connection with its latest keyframe
+subscriber = CommitSubscriber()
+print('waiting for the server ...')
+messages = []
+while not any(kind == KEYFRAME for _, kind, _ in messages):
+    messages += subscriber.wait(1.0)
+# --------------------------------------------------------
+
+ps.init()
+scene = None
+scene_io = None
+sgui = None
+frame = None
+
+def apply(messages):
+    global scene, scene_io, sgui, frame
+    for f, kind, data in messages:
+        if kind == KEYFRAME:
+            # first keyframe, a resync after falling behind or a reconnect
+            scene = SceneIO.from_json(decode_json(data))
+            scene_io = SceneIO(scene)
+            sgui = SceneGUI(scene, 'split')
+            sgui.register()
+            sgui.set_edge_width(1)
+        else:
+            commit = decode_json(data)
+            if is_attribute_delta(commit):
+                apply_attribute_delta(scene, commit)
+            else:
+                scene_io.update_from_json(commit)
+        frame = f
+    if messages:
+        sgui.update()
+
+apply(messages)
+
+def on_update():
+    state = 'connected' if subscriber.connected else 'reconnecting'
+    imgui.Text(f'frame {frame} ({state})')
+    apply(subscriber.poll())
+
+ps.set_user_callback(on_update)
+ps.show()
+subscriber.close()
@@ -0,0 +1,80 @@
+import argparse as ap
+import time
+import warnings
+
+import numpy as np
+
+from asset_dir import AssetDir
+from commit_codec import CommitCodec, available_compressions
+from commit_log import CommitLogReader
+from commit_writer import decode_json, encode_json
+
+
+def configs(compressions: list[str]) -> list[dict]:
+    out = [dict(compression='none', delta=False)]
+    for c in compressions:
+        if c == 'none':
+            continue
+        out.append(dict(compression=c, delta=False))
+        out.append(dict(compression=c, delta=True))
+    best = compressions[-1]
+    out.append(dict(compression=best, delta=True, precision='f32'))
+    out.append(dict(compression=best, delta=True, precision='f16'))
+    return out
+
+
+def max_error(a, b) -> float:
+    '''Largest absolute difference between the numbers of two JSON trees.'''
+    if isinstance(a, dict):
+        return max((max_error(a[k], b[k]) for k in a), default=0.0)
+    if isinstance(a, list):
+        if a and not isinstance(a[0], (dict, str)):
+            try:
+                return float(np.max(np.abs(np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64))))
+            except (TypeError, ValueError):
+                pass
+        return max((max_error(x, y) for x, y in zip(a, b)), default=0.0)
+    if isinstance(a, float):
+        return abs(a - b)
+    return 0.0
+
+
+def bench(entries: list, config: dict) -> dict:
+    encoder = CommitCodec(**config)
+    decoder = CommitCodec(**config)
+    start = time.perf_counter()
+    payloads = [encoder.encode(commit, kind) for kind, commit in entries]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    decoded = [decoder.decode(p) for p in payloads]
+    decode_s = time.perf_counter() - start
+    error = max(max_error(a, b) for (_, a), b in zip(entries, decoded))
+    return dict(codec=repr(encoder), size=sum(len(p) for p in payloads),
+                encode_s=encode_s, decode_s=decode_s, error=error)
+
+
+if __name__ == '__main__':
+    parser = ap.ArgumentParser(description='Compare commit encodings on a commit log written by server_run.py')
+    parser.add_argument('log', type=str, nargs='?', help='Commit log path without suffix',
+                        default=f'{AssetDir.output_path(AssetDir.folder(__file__))}/scene/commits')
+    parser.add_argument('-n', '--frames', type=int, help='Number of payloads to encode', default=200)
+    args = parser.parse_args()
+
+    reader = CommitLogReader(args.log)
+    if len(reader) == 0:
+        raise SystemExit(f'no commits in {args.log}, run server_run.py first')
+    entries = []
+    for e in reader.entries[:args.frames]:
+        kind, frame = int(e['kind']), int(e['frame'])
+        entries.append((kind, decode_json(reader.read(frame, kind))))
+    json_size = sum(len(encode_json(commit)) for _, commit in entries)
+    mb = json_size / 1e6
+
+    compressions = available_compressions()
+    warnings.simplefilter('ignore')
+    print(f'{len(entries)} payloads, {mb:.1f} MB as JSON; compressions available: {", ".join(compressions)}')
+    print(f'{"codec":<20}{"MB":>10}{"ratio":>8}{"enc MB/s":>10}{"dec MB/s":>10}{"max error":>12}')
+    for config in configs(compressions):
+        r = bench(entries, config)
+        print(f'{r["codec"]:<20}{r["size"] / 1e6:>10.2f}{json_size / r["size"]:>8.1f}'
+              f'{mb / r["encode_s"]:>10.1f}{mb / r["decode_s"]:>10.1f}{r["error"]:>12.3g}')
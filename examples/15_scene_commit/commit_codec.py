@@ -0,0 +1,308 @@
+import json
+import re
+import struct
+import threading
+import warnings
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from commit_log import COMMIT, KEYFRAME
+
+# ---------------------------------------------------------------------------
+# A binary commit payload:
+#
+#   PREAMBLE  magic, version, compression, precision, kind,
+#             seq, ref, skeleton length, raw body length
+#   body      (compressed) skeleton JSON + float arrays
+#
+# The float `values` of every attribute are taken out of the commit JSON (the
+# skeleton keeps a {'__array__': i} placeholder) and stored as raw arrays,
+# optionally quantized and XORed with the same attribute (geometry id,
+# collection and name, see `_array_keys`) of the previous payload. `ref` is
+# the `seq` of that previous payload, -1 when the payload decodes on its own
+# (keyframes and the first commit after them).
+# ---------------------------------------------------------------------------
+MAGIC = b'UCMT'
+VERSION = 2
+PREAMBLE = struct.Struct('<4sBBBBqqII')
+
+COMPRESSIONS = ('none', 'zlib', 'lz4', 'zstd')
+PRECISIONS = {'f64': np.float64, 'f32': np.float32, 'f16': np.float16}
+UINTS = {8: np.uint64, 4: np.uint32, 2: np.uint16}
+
+FLOAT_TYPE = re.compile(r'^(F32|F64|Vector\d+|Matrix\d+x\d+)$')
+GEOMETRY_SLOTS = ('geometry_slots', 'rest_geometry_slots')
+
+
+def _compressor(name: str, level: int):
+    '''`(compress, decompress(data, raw_size))` of a compression, or None if its module is missing.'''
+    if name == 'none':
+        return (lambda b: b), (lambda b, n: b)
+    if name == 'zlib':
+        return (lambda b: zlib.compress(b, level)), (lambda b, n: zlib.decompress(b))
+    try:
+        if name == 'zstd':
+            import zstandard
+            c = zstandard.ZstdCompressor(level=level)
+            return c.compress, (lambda b, n: zstandard.ZstdDecompressor().decompress(b, max_output_size=n))
+        if name == 'lz4':
+            import lz4.block
+            return ((lambda b: lz4.block.compress(b, store_size=False)),
+                    (lambda b, n: lz4.block.decompress(b, uncompressed_size=n)))
+    except ImportError:
+        return None
+    raise ValueError(f'unknown compression {name!r}, expected one of {COMPRESSIONS}')
+
+
+def available_compressions() -> list[str]:
+    return [name for name in COMPRESSIONS if _compressor(name, 1) is not None]
+
+
+def _is_float_attribute(node: dict) -> bool:
+    meta, data = node.get('__meta__'), node.get('__data__')
+    return (isinstance(meta, dict) and isinstance(data, dict)
+            and FLOAT_TYPE.match(str(meta.get('type', ''))) is not None
+            and isinstance(data.get('values'), list))
+
+
+def _refs(collection) -> dict:
+    refs = collection.get('__data__') if isinstance(collection, dict) else None
+    return refs if isinstance(refs, dict) else {}
+
+
+def _atlas_keys(data: dict) -> dict:
+    # atlas attribute index -> (slots, geometry id, collection, name), or
+    # ('attribute_collections', collection, name) for scene level attributes
+    atlas = data.get('geometry_atlas', {}).get('__data__') if isinstance(data, dict) else None
+    if not isinstance(atlas, dict):
+        return {}
+    keys = {}
+    geometries = atlas.get('geometries', [])
+    for slots in GEOMETRY_SLOTS:
+        for slot in data.get(slots, []):
+            geometry = geometries[slot['index']].get('__data__') if slot['index'] < len(geometries) else None
+            for collection, c in (geometry or {}).items():
+                for name, ref in _refs(c).items():
+                    if isinstance(ref, dict) and 'index' in ref:
+                        keys.setdefault(ref['index'], (slots, slot['id'], collection, name))
+    for collection, c in (atlas.get('attribute_collections') or {}).items():
+        for name, ref in _refs(c).items():
+            if isinstance(ref, dict) and 'index' in ref:
+                keys.setdefault(ref['index'], ('attribute_collections', collection, name))
+    return keys
+
+
+def _array_keys(skeleton: dict, paths: list) -> list:
+    '''
+    Key of every array that stays the same from one commit to the next, so
+    the XOR delta pairs the same attribute even when the atlas indices shift.
+
+    An atlas attribute, at `(..., 'attributes', i, '__data__', 'values')`, is
+    keyed by the slot list, geometry id, collection and name that refer to
+    it; an attribute delta entry, at `('__data__', 'geometries', k,
+    'collections', collection, name, '__data__', 'values')`, the same way
+    by its geometry id. Anything else keeps its JSON path.
+    '''
+    data = skeleton.get('__data__') if isinstance(skeleton, dict) else None
+    atlas_keys = _atlas_keys(data)
+    keys = []
+    for path in paths:
+        key = path
+        if len(path) == 8 and path[:2] == ('__data__', 'geometries') and path[3] == 'collections':
+            key = ('geometry_slots', data['geometries'][path[2]]['id'], path[4], path[5])
+        elif len(path) >= 4 and path[-4] == 'attributes':
+            key = atlas_keys.get(path[-3], path)
+        keys.append(key)
+    return keys
+
+
+def _shuffle(a: np.ndarray) -> bytes:
+    # group the bytes by significance: sign/exponent bytes of neighbouring values compress together
+    return a.view(np.uint8).reshape(-1, a.itemsize).T.tobytes()
+
+
+def _unshuffle(data, dtype, count: int) -> np.ndarray:
+    dtype = np.dtype(dtype)
+    b = np.frombuffer(data, dtype=np.uint8, count=count * dtype.itemsize)
+    return np.ascontiguousarray(b.reshape(dtype.itemsize, count).T).view(dtype).reshape(-1)
+
+
+class CommitCodec:
+    '''
+    Encode scene commits to compact binary payloads; a drop-in
+    `encode`/`decode` pair for `CommitWriter` and `Playback`.
+
+    - `compression`: 'zstd' or 'lz4' (optional modules, falling back to zlib
+      with a warning), 'zlib' or 'none'.
+    - `delta`: XOR float arrays with the same attribute of the previous
+      commit. Lossless; unchanged values become zero bytes.
+    - `precision`: 'f64' keeps values exact, 'f32' and 'f16' quantize them
+      and are meant for visualization-only consumers. Only the `quantize`
+      attributes (by name, `position` and `transform` by default) of
+      regular commits are quantized; keyframes, config and every other
+      attribute stay exact, and so do arrays out of the range of the
+      precision.
+
+    The delta chain restarts at every keyframe, so a reader that seeks to a
+    keyframe and applies the commits after it in order can decode them.
+    '''
+    def __init__(self, compression: str = 'zstd', delta: bool = True, precision: str = 'f64',
+                 level: int = 3, history: int = 32, quantize=('position', 'transform')):
+        if precision not in PRECISIONS:
+            raise ValueError(f'unknown precision {precision!r}, expected one of {list(PRECISIONS)}')
+        if _compressor(compression, level) is None:
+            warnings.warn(f'{compression} is not installed, falling back to zlib')
+            compression = 'zlib'
+        self.compression = compression
+        self.delta = delta
+        self.precision = precision
+        self.quantize = set(quantize)
+        self.level = level
+        self.compress, _ = _compressor(compression, level)
+        # encoder state: arrays of the previous payload by `_array_keys` key
+        self.seq = 0
+        self.previous = {}
+        # decoder state: arrays of recently decoded payloads by seq
+        self.history = history
+        self.decoded = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        delta = '+xor' if self.delta else ''
+        return f'{self.compression}{delta}/{self.precision}'
+
+    # ------------------------------------------------------------------
+    # encode
+    # ------------------------------------------------------------------
+    def _extract(self, node, path: tuple, arrays: list):
+        if isinstance(node, dict):
+            if _is_float_attribute(node):
+                try:
+                    values = np.asarray(node['__data__']['values'], dtype=np.float64)
+                except (TypeError, ValueError):
+                    values = None   # ragged, left in the skeleton as it is
+                if values is not None:
+                    data = dict(node['__data__'], values={'__array__': len(arrays)})
+                    arrays.append((path + ('__data__', 'values'), values))
+                    return {k: data if k == '__data__' else v for k, v in node.items()}
+            return {k: self._extract(v, path + (k,), arrays) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._extract(v, path + (i,), arrays) for i, v in enumerate(node)]
+        return node
+
+    def _lossy(self, key: tuple) -> bool:
+        # geometry attributes are keyed (slots, id, collection, name), see `_array_keys`
+        return len(key) == 4 and key[0] in GEOMETRY_SLOTS and key[-1] in self.quantize
+
+    def _quantize(self, a: np.ndarray) -> np.ndarray:
+        dtype = np.dtype(PRECISIONS[self.precision])
+        finite = a[np.isfinite(a)]
+        if finite.size and np.abs(finite).max() > np.finfo(dtype).max:
+            # out of range for the requested precision: keep it exact
+            dtype = np.dtype(np.float64)
+        return np.ascontiguousarray(a, dtype=dtype)
+
+    def encode(self, commit: dict, kind: int = COMMIT) -> bytes:
+        arrays = []
+        skeleton = self._extract(commit, (), arrays)
+        seq = self.seq
+        self.seq += 1
+
+        current = {}
+        blocks = []
+        specs = []
+        ref = -1
+        lossy = kind == COMMIT and self.precision != 'f64'
+        keys = _array_keys(skeleton, [path for path, _ in arrays])
+        for key, (_, a) in zip(keys, arrays):
+            if lossy and self._lossy(key):
+                q = self._quantize(a)
+            else:
+                q = np.ascontiguousarray(a, dtype=np.float64)
+            current[key] = q
+            uint = UINTS[q.itemsize]
+            bits = q.reshape(-1).view(uint)
+            prev = self.previous.get(key)
+            xor = (kind == COMMIT and self.delta and prev is not None
+                   and prev.shape == q.shape and prev.dtype == q.dtype)
+            if xor:
+                bits = bits ^ prev.reshape(-1).view(uint)
+                ref = seq - 1
+            specs.append({'shape': list(a.shape), 'dtype': q.dtype.str, 'xor': xor})
+            blocks.append(_shuffle(bits))
+        # a keyframe starts a new chain: the commit after it is decoded without a reference
+        self.previous = {} if kind == KEYFRAME else current
+
+        head = json.dumps({'skeleton': skeleton, 'arrays': specs}, separators=(',', ':')).encode('utf-8')
+        raw = b''.join([head, *blocks])
+        body = self.compress(raw)
+        preamble = PREAMBLE.pack(MAGIC, VERSION, COMPRESSIONS.index(self.compression),
+                                 list(PRECISIONS).index(self.precision), kind,
+                                 seq, ref, len(head), len(raw))
+        return preamble + body
+
+    # ------------------------------------------------------------------
+    # decode
+    # ------------------------------------------------------------------
+    def _restore(self, node, arrays: list):
+        if isinstance(node, dict):
+            if set(node) == {'__array__'}:
+                return arrays[node['__array__']].tolist()
+            return {k: self._restore(v, arrays) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._restore(v, arrays) for v in node]
+        return node
+
+    def _paths(self, node, path: tuple, out: list):
+        # JSON paths of the array placeholders, in array order
+        if isinstance(node, dict):
+            if set(node) == {'__array__'}:
+                out.append(path)
+                return
+            for k, v in node.items():
+                self._paths(v, path + (k,), out)
+        elif isinstance(node, list):
+            for i, v in enumerate(node):
+                self._paths(v, path + (i,), out)
+        return out
+
+    def decode(self, data) -> dict:
+        data = memoryview(data)
+        magic, version, compression, precision, kind, seq, ref, head_len, raw_len = PREAMBLE.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('not an encoded commit')
+        if version != VERSION:
+            raise ValueError(f'encoded commit has version {version}, expected {VERSION}')
+        _, decompress = _compressor(COMPRESSIONS[compression], self.level)
+        raw = decompress(bytes(data[PREAMBLE.size:]), raw_len)
+        head = json.loads(raw[:head_len])
+
+        with self.lock:
+            previous = self.decoded.get(ref) if ref >= 0 else {}
+            if previous is None:
+                raise KeyError(f'commit {seq} is XORed with commit {ref}, which was not decoded; '
+                               'decode the commits in order from a keyframe')
+            keys = _array_keys(head['skeleton'], self._paths(head['skeleton'], (), []))
+            current = {}
+            arrays = []
+            offset = head_len
+            for key, spec in zip(keys, head['arrays']):
+                shape = spec['shape']
+                dtype = np.dtype(spec['dtype'])
+                uint = UINTS[dtype.itemsize]
+                count = int(np.prod(shape))
+                bits = _unshuffle(raw[offset:offset + count * dtype.itemsize], uint, count)
+                offset += count * dtype.itemsize
+                if spec['xor']:
+                    bits = bits ^ previous[key].reshape(-1).view(uint)
+                q = bits.view(dtype).reshape(shape)
+                current[key] = q
+                arrays.append(q.astype(np.float64))
+            self.decoded[seq] = current
+            self.decoded.move_to_end(seq)
+            while len(self.decoded) > self.history:
+                self.decoded.popitem(last=False)
+
+        return self._restore(head['skeleton'], arrays)
@@ -0,0 +1,129 @@
+from attribute_diff import is_attribute_delta
+
+
+class CommitFilter:
+    '''
+    Keep only what a viewer needs in a scene commit: the geometries of some
+    objects (by name or ID) and an allow-list of attributes such as
+    `position` and `transform`.
+
+    A commit only carries what changed, so leaving a geometry or an attribute
+    out of it leaves that part of the reader's scene untouched. Objects are
+    resolved to geometry IDs from the `object_collection` of the scene JSON
+    (`scene_io.to_json()`) and again from every commit that carries one, so
+    objects created later are picked up too.
+
+    `rest=False` also drops the rest geometries, which viewers do not draw.
+    Attribute deltas (`AttributeDiff`) are filtered the same way.
+
+    The filter runs on the finished commit: libuipc computes the diff of the
+    whole scene in `commit_to_json`, so it trims what is queued, encoded and
+    sent, not the cost of the diff itself. To select while diffing, give
+    `AttributeDiff` the `objects` and `attributes` instead.
+    '''
+    def __init__(self, scene_json: dict, objects=None, attributes=None, rest: bool = True):
+        self.objects = None if objects is None else set(objects)
+        self.attributes = None if attributes is None else set(attributes)
+        self.rest = rest
+        self.geometry_ids = None
+        self._update_objects(scene_json)
+
+    def _update_objects(self, j: dict):
+        if self.objects is None:
+            return
+        collection = j.get('__data__', {}).get('object_collection')
+        if not isinstance(collection, dict) or 'objects' not in collection:
+            return
+        ids = set()
+        for obj in collection['objects']:
+            if obj['id'] in self.objects or obj['name'] in self.objects:
+                ids.update(obj['geometries'])
+        self.geometry_ids = ids
+
+    def _keep_slot(self, slot: dict) -> bool:
+        return self.geometry_ids is None or slot['id'] in self.geometry_ids
+
+    def _keep_attribute(self, name: str, ref: dict):
+        return ref if self.attributes is None or name in self.attributes else None
+
+    def _filter_delta(self, commit: dict) -> dict:
+        geometries = []
+        for g in commit['__data__']['geometries']:
+            if not self._keep_slot(g):
+                continue
+            collections = {}
+            for collection, attributes in g['collections'].items():
+                kept = {name: a for name, a in attributes.items() if self._keep_attribute(name, a) is not None}
+                if kept:
+                    collections[collection] = kept
+            if collections:
+                geometries.append(dict(g, collections=collections))
+        return dict(commit, __data__=dict(commit['__data__'], geometries=geometries))
+
+    def __call__(self, commit: dict) -> dict:
+        if is_attribute_delta(commit):
+            return self._filter_delta(commit)
+        self._update_objects(commit)
+        data = commit.get('__data__')
+        atlas = data.get('geometry_atlas', {}).get('__data__') if isinstance(data, dict) else None
+        if not isinstance(atlas, dict) or 'geometry_slots' not in data:
+            return commit
+
+        # slots and the geometries they point to
+        slots = [s for s in data['geometry_slots'] if self._keep_slot(s)]
+        rest_slots = [s for s in data.get('rest_geometry_slots', []) if self.rest and self._keep_slot(s)]
+        kept = sorted({s['index'] for s in slots + rest_slots})
+        geometry_index = {old: new for new, old in enumerate(kept)}
+        geometries = [_map_geometry(atlas['geometries'][i], self._keep_attribute) for i in kept]
+
+        # attributes still referenced by a kept geometry or a scene level collection (config, ...)
+        collections = atlas.get('attribute_collections') or {}
+        used = set()
+        for c in [c for g in geometries for c in _collections(g).values()] + list(collections.values()):
+            used.update(ref['index'] for ref in _refs(c).values())
+        kept_attributes = sorted(used)
+        attribute_index = {old: new for new, old in enumerate(kept_attributes)}
+
+        def reindex(name, ref):
+            return dict(ref, index=attribute_index[ref['index']])
+
+        new_atlas = dict(atlas,
+                         geometries=[_map_geometry(g, reindex) for g in geometries],
+                         attributes=[atlas['attributes'][i] for i in kept_attributes])
+        if 'attribute_collections' in atlas:
+            new_atlas['attribute_collections'] = {k: _map_collection(c, reindex) for k, c in collections.items()}
+        out = dict(data,
+                   geometry_atlas=dict(data['geometry_atlas'], __data__=new_atlas),
+                   geometry_slots=[dict(s, index=geometry_index[s['index']]) for s in slots])
+        if 'rest_geometry_slots' in data:
+            out['rest_geometry_slots'] = [dict(s, index=geometry_index[s['index']]) for s in rest_slots]
+        return dict(commit, __data__=out)
+
+
+# an attribute collection is {'__data__': {name: {'index': i, ...}}}, where i
+# points into the atlas attribute list; a geometry is {'__data__': {key: collection}}
+def _refs(collection) -> dict:
+    refs = collection.get('__data__') if isinstance(collection, dict) else None
+    return refs if isinstance(refs, dict) else {}
+
+
+def _collections(geometry: dict) -> dict:
+    data = geometry.get('__data__')
+    return {k: c for k, c in data.items() if _refs(c)} if isinstance(data, dict) else {}
+
+
+def _map_collection(collection: dict, fn) -> dict:
+    refs = {}
+    for name, ref in _refs(collection).items():
+        ref = fn(name, ref)
+        if ref is not None:
+            refs[name] = ref
+    return dict(collection, __data__=refs)
+
+
+def _map_geometry(geometry: dict, fn) -> dict:
+    collections = _collections(geometry)
+    if not collections:
+        return geometry
+    data = {k: _map_collection(c, fn) if k in collections else c for k, c in geometry['__data__'].items()}
+    return dict(geometry, __data__=data)
@@ -0,0 +1,204 @@
+import bisect
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# An append-only commit log is two files:
+#
+#   <name>.log  header + commit payloads back to back
+#   <name>.idx  header + one fixed size INDEX_DTYPE entry per payload
+#
+# A payload is always written and flushed before its index entry, so anything
+# listed in the index is complete; readers can follow a log that is still
+# being written.
+# ---------------------------------------------------------------------------
+LOG_MAGIC = b'UIPCLOG\0'
+IDX_MAGIC = b'UIPCIDX\0'
+VERSION = 1
+HEADER_SIZE = 16
+
+# payload kinds: a commit (delta against the previous frame) or a keyframe (the full scene)
+COMMIT = 0
+KEYFRAME = 1
+
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('length', '<u8'),
+    ('frame', '<i8'),
+    ('kind', '<u4'),
+    ('reserved', '<u4'),
+])
+
+
+def _header(magic: bytes) -> bytes:
+    return magic + VERSION.to_bytes(4, 'little') + bytes(4)
+
+
+def _check_header(path: Path, data, magic: bytes):
+    if bytes(data[:8]) != magic:
+        raise ValueError(f'{path} is not a commit log file')
+    version = int.from_bytes(bytes(data[8:12]), 'little')
+    if version != VERSION:
+        raise ValueError(f'{path} has version {version}, expected {VERSION}')
+
+
+def log_paths(path) -> tuple[Path, Path]:
+    path = Path(path)
+    return path.with_suffix('.log'), path.with_suffix('.idx')
+
+
+class CommitLog:
+    '''
+    Append commits to a single log file with an offset index sidecar.
+    `write(frame, data)` makes it a drop-in sink for `CommitWriter`.
+    '''
+    def __init__(self, path, append: bool = False):
+        self.log_path, self.idx_path = log_paths(path)
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        mode = 'ab' if append and self.idx_path.exists() else 'wb'
+        self.log = open(self.log_path, mode)
+        self.idx = open(self.idx_path, mode)
+        if mode == 'wb':
+            self.log.write(_header(LOG_MAGIC))
+            self.idx.write(_header(IDX_MAGIC))
+            self.log.flush()
+            self.idx.flush()
+        self.offset = self.log.tell()
+
+    def append(self, frame: int, data: bytes, kind: int = COMMIT):
+        self.log.write(data)
+        self.log.flush()
+        entry = np.array([(self.offset, len(data), frame, kind, 0)], dtype=INDEX_DTYPE)
+        self.idx.write(entry.tobytes())
+        self.idx.flush()
+        self.offset += len(data)
+
+    def write(self, frame: int, data: bytes, kind: int = COMMIT):
+        self.append(frame, data, kind)
+
+    def close(self):
+        if not self.log.closed:
+            self.log.close()
+            self.idx.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CommitLogReader:
+    '''
+    Random access to the commits of a log through memory maps.
+
+    `read(frame)` is a dictionary lookup plus a slice of the mapped log, so any
+    frame is reached in O(1). `refresh()` picks up entries appended since the
+    last call and `follow()` yields new commits of a log that is still being
+    written.
+    '''
+    def __init__(self, path):
+        self.log_path, self.idx_path = log_paths(path)
+        self._log_map = None
+        self._idx_map = None
+        self.entries = np.zeros(0, dtype=INDEX_DTYPE)
+        self._rows = {}
+        self._keyframes = []
+        # a prefetch thread may read while the UI thread refreshes
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _map(self, path: Path, magic: bytes):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE:
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(path, data, magic)
+        return data
+
+    def refresh(self) -> int:
+        '''Re-map the files if they grew; returns the number of new entries.'''
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        if not self.idx_path.exists():
+            return 0
+        idx_size = self.idx_path.stat().st_size
+        count = max(0, idx_size - HEADER_SIZE) // INDEX_DTYPE.itemsize
+        if count == len(self.entries):
+            return 0
+        old = len(self.entries)
+        self._idx_map = self._map(self.idx_path, IDX_MAGIC)
+        self._log_map = self._map(self.log_path, LOG_MAGIC)
+        self.entries = np.frombuffer(self._idx_map, dtype=INDEX_DTYPE, count=count, offset=HEADER_SIZE)
+        for row in range(old, count):
+            entry = self.entries[row]
+            kind, frame = int(entry['kind']), int(entry['frame'])
+            self._rows[(kind, frame)] = row
+            if kind == KEYFRAME:
+                bisect.insort(self._keyframes, frame)
+        return count - old
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, frame: int) -> bool:
+        return (COMMIT, frame) in self._rows
+
+    def frames(self, kind: int = COMMIT) -> list[int]:
+        return sorted(frame for k, frame in self._rows if k == kind)
+
+    def keyframe_before(self, frame: int):
+        '''The latest keyframe at or before `frame`, or None.'''
+        i = bisect.bisect_right(self._keyframes, frame)
+        return self._keyframes[i - 1] if i > 0 else None
+
+    def read(self, frame: int, kind: int = COMMIT):
+        '''The payload of `frame` as a zero-copy memoryview of the mapped log, or None.'''
+        with self._lock:
+            row = self._rows.get((kind, frame))
+            if row is None:
+                return None
+            entry = self.entries[row]
+            start = int(entry['offset'])
+            return memoryview(self._log_map)[start:start + int(entry['length'])]
+
+    def follow(self, start: int = 1, poll: float = 0.05, timeout: float = None):
+        '''
+        Yield `(frame, payload)` from `start` on, waiting for commits that are
+        not written yet. Stops after `timeout` seconds without a new commit.
+        '''
+        frame = start
+        idle_since = time.perf_counter()
+        while True:
+            data = self.read(frame)
+            if data is not None:
+                yield frame, data
+                frame += 1
+                idle_since = time.perf_counter()
+                continue
+            if self.refresh():
+                continue
+            if timeout is not None and time.perf_counter() - idle_since > timeout:
+                return
+            time.sleep(poll)
+
+    def close(self):
+        self.entries = np.zeros(0, dtype=INDEX_DTYPE)
+        self._rows = {}
+        self._keyframes = []
+        for m in (self._log_map, self._idx_map):
+            if m is not None:
+                try:
+                    m.close()
+                except BufferError:
+                    # a caller still holds a view; the map is released with it
+                    pass
+        self._log_map = self._idx_map = None
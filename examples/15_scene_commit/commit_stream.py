@@ -0,0 +1,241 @@
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from commit_log import COMMIT, KEYFRAME
+
+# ---------------------------------------------------------------------------
+# Every message on the stream is a fixed size header followed by the payload
+# (whatever the writer's `encode` produced, JSON or `CommitCodec` bytes):
+#
+#   length u8, frame i8, kind u4
+#
+# An address is a path (Unix domain socket) or a (host, port) tuple (TCP).
+# ---------------------------------------------------------------------------
+HEADER = struct.Struct('<QqI')
+DEFAULT_ADDRESS = ('127.0.0.1', 5555)
+
+
+def _socket(address) -> socket.socket:
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    return socket.socket(family, socket.SOCK_STREAM)
+
+
+def _message(frame: int, data, kind: int) -> bytes:
+    return HEADER.pack(len(data), frame, kind) + bytes(data)
+
+
+class _Subscriber:
+    '''A connected client with its own bounded queue and sender thread.'''
+    def __init__(self, sock: socket.socket, max_pending: int):
+        self.sock = sock
+        self.max_pending = max_pending
+        self.limit = max_pending
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.resyncs = 0
+        self.thread = threading.Thread(target=self._run, name='commit-stream-send', daemon=True)
+
+    def push(self, message: bytes, resync: list[bytes]):
+        with self.cond:
+            if len(self.pending) >= self.limit:
+                # too slow: drop its backlog and resync from the latest keyframe
+                self.dropped += len(self.pending)
+                self.resyncs += 1
+                self.pending.clear()
+                self.pending.extend(resync)
+                self.limit = len(self.pending) + self.max_pending
+            else:
+                self.pending.append(message)
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                message = self.pending.popleft()
+                self.limit = max(self.max_pending, self.limit - 1)
+            try:
+                self.sock.sendall(message)
+            except OSError:
+                self.close()
+                return
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class CommitServer:
+    '''
+    Stream commits and keyframes to any number of subscribers.
+
+    `write(frame, data, kind)` makes it a sink for `CommitWriter`, in place
+    of (or next to) a commit log. Every subscriber has its own queue of at
+    most `max_pending` messages; a subscriber that falls behind has its
+    backlog dropped and is resynced with the latest keyframe and the commits
+    since, like a client that connects mid-run.
+    '''
+    def __init__(self, address=DEFAULT_ADDRESS, max_pending: int = 16):
+        self.address = address
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.subscribers = []
+        # the latest keyframe and the commits after it, enough to resync anyone
+        self.keyframe = None
+        self.since_keyframe = []
+        if not isinstance(address, tuple) and os.path.exists(address):
+            os.unlink(address)
+        self.sock = _socket(address)
+        if isinstance(address, tuple):
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(address)
+        self.sock.listen()
+        self.thread = threading.Thread(target=self._accept, name='commit-stream-accept', daemon=True)
+        self.thread.start()
+
+    def _resync(self) -> list[bytes]:
+        return ([self.keyframe] if self.keyframe is not None else []) + self.since_keyframe
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.sock.accept()
+            except OSError:
+                return  # closed
+            if isinstance(self.address, tuple):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            subscriber = _Subscriber(sock, self.max_pending)
+            with self.lock:
+                subscriber.pending.extend(self._resync())
+                subscriber.limit = len(subscriber.pending) + self.max_pending
+                self.subscribers.append(subscriber)
+            subscriber.thread.start()
+
+    def write(self, frame: int, data, kind: int = COMMIT):
+        message = _message(frame, data, kind)
+        with self.lock:
+            if kind == KEYFRAME:
+                self.keyframe = message
+                self.since_keyframe = []
+            else:
+                self.since_keyframe.append(message)
+            self.subscribers = [s for s in self.subscribers if not s.closed]
+            if not self.subscribers:
+                return
+            resync = self._resync()
+            for s in self.subscribers:
+                s.push(message, resync)
+
+    def stats(self) -> str:
+        with self.lock:
+            subscribers = list(self.subscribers)
+        return (f'{len(subscribers)} subscribers, '
+                f'{sum(s.dropped for s in subscribers)} messages dropped, '
+                f'{sum(s.resyncs for s in subscribers)} resyncs')
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)    # wakes up accept()
+        except OSError:
+            pass
+        self.sock.close()
+        self.thread.join()
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for s in subscribers:
+            s.close()
+        if not isinstance(self.address, tuple) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class CommitSubscriber:
+    '''
+    Receive the stream of a `CommitServer` on a background thread.
+
+    `poll()` returns the `(frame, kind, payload)` messages received since the
+    last call; when a keyframe is among them the messages before it are
+    dropped, since the keyframe replaces the scene anyway. A lost connection
+    is retried every `reconnect` seconds, and the server starts every
+    connection with its latest keyframe, so a reconnecting client resyncs.
+    '''
+    def __init__(self, address=DEFAULT_ADDRESS, reconnect: float = 1.0):
+        self.address = address
+        self.reconnect = reconnect
+        self.messages = deque()
+        self.cond = threading.Condition()
+        self.connected = False
+        self.closed = False
+        self.sock = None
+        self.thread = threading.Thread(target=self._run, name='commit-stream-recv', daemon=True)
+        self.thread.start()
+
+    def _recv_exact(self, n: int) -> bytes:
+        buf = bytearray(n)
+        view = memoryview(buf)
+        while n:
+            got = self.sock.recv_into(view[len(buf) - n:])
+            if got == 0:
+                raise ConnectionError('stream closed by the server')
+            n -= got
+        return bytes(buf)
+
+    def _run(self):
+        while not self.closed:
+            self.sock = _socket(self.address)
+            try:
+                self.sock.connect(self.address)
+                self.connected = True
+                while True:
+                    length, frame, kind = HEADER.unpack(self._recv_exact(HEADER.size))
+                    data = self._recv_exact(length)
+                    with self.cond:
+                        self.messages.append((frame, kind, data))
+                        self.cond.notify_all()
+            except OSError:
+                pass
+            finally:
+                self.connected = False
+                self.sock.close()
+            if not self.closed:
+                time.sleep(self.reconnect)
+
+    def poll(self) -> list:
+        with self.cond:
+            messages = list(self.messages)
+            self.messages.clear()
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i][1] == KEYFRAME:
+                return messages[i:]
+        return messages
+
+    def wait(self, timeout: float = None) -> list:
+        '''Like `poll()`, but block until a message arrives or `timeout` passes.'''
+        with self.cond:
+            self.cond.wait_for(lambda: self.messages or self.closed, timeout)
+        return self.poll()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.thread.join()
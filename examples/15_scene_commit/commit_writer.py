@@ -0,0 +1,162 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from commit_log import COMMIT, KEYFRAME
+from attribute_diff import AttributeDiff
+
+
+def encode_json(commit: dict, kind: int = COMMIT) -> bytes:
+    # JSON payloads stand on their own, whatever their kind
+    return json.dumps(commit, separators=(',', ':')).encode('utf-8')
+
+
+def decode_json(data) -> dict:
+    # payloads may be memoryviews of a mapped commit log
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class FileSink:
+    '''
+    Write every commit to `<folder>/scene{frame}<suffix>` and every keyframe
+    to `<folder>/scene{frame}.key<suffix>`.
+    Files are renamed into place, so a reader never sees a half written commit.
+    '''
+    def __init__(self, folder, suffix: str = '.json'):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.suffix = suffix
+
+    def path(self, frame: int, kind: int = COMMIT) -> Path:
+        key = '.key' if kind == KEYFRAME else ''
+        return self.folder / f'scene{frame}{key}{self.suffix}'
+
+    def write(self, frame: int, data: bytes, kind: int = COMMIT):
+        path = self.path(frame, kind)
+        tmp = path.with_name(path.name + '.partial')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def close(self):
+        pass
+
+
+class CommitWriter:
+    '''
+    Encode and write scene commits on a background thread.
+
+    The simulation thread only captures the diff (`scene_io.commit_to_json(ss)`)
+    and calls `submit`; encoding and the sink write happen on the writer thread.
+    At most `max_pending` commits wait in the queue: when the sink falls behind,
+    `submit` blocks (backpressure) instead of letting memory grow. Pending
+    commits are flushed by `close()`, on leaving a `with` block and at exit.
+
+    With a `scene_io`, `commit(frame, ss)` captures the diff itself and, every
+    `keyframe_interval` frames, also a full keyframe of the scene, so readers
+    can seek without replaying the run from frame 0. A `commit_filter` (see
+    `CommitFilter`) trims every diff before it is queued; keyframes stay whole.
+    '''
+    def __init__(self, sink, encode=encode_json, max_pending: int = 8,
+                 scene_io=None, keyframe_interval: int = 0, commit_filter=None):
+        self.sink = sink
+        self.scene_io = scene_io
+        self.keyframe_interval = keyframe_interval
+        self.commit_filter = commit_filter
+        self.encode = encode
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.closed = False
+        # stats
+        self.submitted = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.blocked_seconds = 0.0
+        self.max_queued = 0
+        self.thread = threading.Thread(target=self._run, name='commit-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                frame, commit, kind = item
+                if self.error is None:
+                    data = self.encode(commit, kind)
+                    self.sink.write(frame, data, kind)
+                    self.written += 1
+                    self.bytes_written += len(data)
+            except BaseException as e:
+                # keep draining so producers never dead-lock; the error surfaces on the next call
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError('commit writer failed') from error
+
+    def submit(self, frame: int, commit, kind: int = COMMIT):
+        '''Queue a captured commit; blocks while `max_pending` commits are already waiting.'''
+        if self.closed:
+            raise RuntimeError('commit writer is closed')
+        self._raise_error()
+        start = time.perf_counter()
+        self.queue.put((frame, commit, kind))
+        self.blocked_seconds += time.perf_counter() - start
+        self.submitted += 1
+        self.max_queued = max(self.max_queued, self.queue.qsize())
+
+    def keyframe(self, frame: int):
+        '''Queue the full scene as the keyframe of `frame`.'''
+        self.submit(frame, self.scene_io.to_json(), KEYFRAME)
+
+    def commit(self, frame: int, ss):
+        '''
+        Queue the diff of the scene against snapshot `ss`, plus a keyframe when
+        one is due. `ss` is a `SceneSnapshot` or an `AttributeDiff`.
+        '''
+        if isinstance(ss, AttributeDiff):
+            commit = ss.commit_to_json()
+        else:
+            commit = self.scene_io.commit_to_json(ss)
+        if self.commit_filter is not None:
+            commit = self.commit_filter(commit)
+        self.submit(frame, commit)
+        if self.keyframe_interval > 0 and frame % self.keyframe_interval == 0:
+            self.keyframe(frame)
+
+    def flush(self):
+        '''Wait until every submitted commit is written.'''
+        self.queue.join()
+        self._raise_error()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.close()
+        atexit.unregister(self.close)
+        self._raise_error()
+
+    def stats(self) -> str:
+        return (f'{self.written}/{self.submitted} commits written, '
+                f'{self.bytes_written / 2**20:.1f} MiB, '
+                f'blocked {self.blocked_seconds:.3f} s, '
+                f'max queued {self.max_queued}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
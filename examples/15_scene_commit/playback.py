@@ -0,0 +1,82 @@
+from uipc.core import SceneIO
+
+from commit_log import COMMIT, KEYFRAME, CommitLogReader
+from commit_writer import decode_json
+from attribute_diff import apply_attribute_delta, is_attribute_delta
+from prefetch import PrefetchReader
+
+
+class Playback:
+    '''
+    Replay a commit log and seek to any frame.
+
+    `seek(frame)` restores the latest keyframe at or before `frame` and applies
+    the commits after it, so its cost is bounded by the keyframe interval. A
+    seek that moves forward without crossing a keyframe continues from the
+    current scene instead.
+
+    With `prefetch_depth > 0` the next commits are decoded ahead on a
+    background thread (see `PrefetchReader`); only `update_from_json` is
+    left for the calling thread.
+    '''
+    def __init__(self, reader: CommitLogReader, decode=decode_json, prefetch_depth: int = 0):
+        self.reader = reader
+        self.decode = decode
+        self.prefetch = PrefetchReader(reader, prefetch_depth, decode) if prefetch_depth > 0 else None
+        self.scene = None
+        self.scene_io = None
+        self.frame = None
+        self.commits_applied = 0
+
+    def _load_keyframe(self, frame: int):
+        self.scene = SceneIO.from_json(self.decode(self.reader.read(frame, KEYFRAME)))
+        self.scene_io = SceneIO(self.scene)
+        self.frame = frame
+
+    def _read_commit(self, frame: int):
+        if self.prefetch is not None:
+            return self.prefetch.get(frame)
+        data = self.reader.read(frame, COMMIT)
+        return None if data is None else self.decode(data)
+
+    def _apply(self, frame: int):
+        commit = self._read_commit(frame)
+        if commit is None:
+            raise KeyError(f'commit of frame {frame} is missing from the log')
+        if is_attribute_delta(commit):
+            apply_attribute_delta(self.scene, commit)
+        else:
+            self.scene_io.update_from_json(commit)
+        self.frame = frame
+        self.commits_applied += 1
+
+    def seek(self, frame: int) -> bool:
+        '''
+        Bring the scene to `frame`. Returns True when a new scene object was
+        created from a keyframe (a GUI bound to the old one must be rebuilt).
+        '''
+        self.reader.refresh()
+        key = self.reader.keyframe_before(frame)
+        if key is None:
+            raise KeyError(f'no keyframe at or before frame {frame}')
+        reloaded = False
+        if self.scene is None or self.frame > frame or self.frame < key:
+            self._load_keyframe(key)
+            reloaded = True
+        if self.prefetch is not None:
+            self.prefetch.prime(self.frame + 1)
+        for f in range(self.frame + 1, frame + 1):
+            self._apply(f)
+        return reloaded
+
+    def step(self) -> bool:
+        '''Apply the next commit if it is available.'''
+        self.reader.refresh()
+        if self.frame is None or (self.frame + 1) not in self.reader:
+            return False
+        self._apply(self.frame + 1)
+        return True
+
+    def close(self):
+        if self.prefetch is not None:
+            self.prefetch.close()
@@ -0,0 +1,133 @@
+import threading
+
+from commit_log import CommitLogReader
+from commit_writer import decode_json
+
+
+class PrefetchReader:
+    '''
+    Decode the next `depth` commits of a log on a background thread.
+
+    Decoded commits wait in a ring buffer of `depth` slots; `get(frame)` takes
+    a ready one (a hit), waits for one that is being decoded right now (a
+    stall) or decodes it on the calling thread (a miss, e.g. after a seek).
+    The read-ahead restarts after whatever frame was asked for last. A commit
+    that fails to decode raises its exception from `get()` of that frame.
+    '''
+    def __init__(self, reader: CommitLogReader, depth: int = 8, decode=decode_json, poll: float = 0.02):
+        self.reader = reader
+        self.depth = depth
+        self.decode = decode
+        self.poll = poll
+        self.slots = [None] * depth
+        self.cond = threading.Condition()
+        self.next_get = None        # frame the consumer is expected to ask for next
+        self.next_decode = None     # frame the background thread decodes next
+        self.inflight = None        # frame being decoded right now
+        self.generation = 0         # bumped on every seek, invalidating in-flight work
+        self.stopped = False
+        # stats
+        self.hits = 0
+        self.stalls = 0
+        self.misses = 0
+        self.thread = threading.Thread(target=self._run, name='commit-prefetch', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.stopped and (
+                    self.next_decode is None or self.next_decode >= self.next_get + self.depth
+                ):
+                    self.cond.wait()
+                if self.stopped:
+                    return
+                frame = self.next_decode
+                generation = self.generation
+                data = self.reader.read(frame)
+                if data is None:
+                    # not written yet; look again later
+                    self.cond.wait(self.poll)
+                    self.reader.refresh()
+                    continue
+                self.inflight = frame
+
+            try:
+                decoded, error = self.decode(data), None
+            except Exception as e:
+                decoded, error = None, e
+
+            with self.cond:
+                self.inflight = None
+                if generation == self.generation:
+                    self.slots[frame % self.depth] = (frame, decoded, error)
+                    self.next_decode = frame + 1
+                self.cond.notify_all()
+
+    def _pending(self, frame: int) -> bool:
+        # called with the lock held
+        return self.inflight == frame or (
+            self.next_decode == frame and not self.stopped and frame in self.reader)
+
+    def _seek(self, frame):
+        # called with the lock held: read ahead from `frame` on, or pause the
+        # read-ahead if `frame` is None
+        self.generation += 1
+        self.slots = [None] * self.depth
+        self.next_get = frame
+        self.next_decode = frame
+        self.cond.notify_all()
+
+    def prime(self, frame: int):
+        '''Start reading ahead from `frame`, e.g. right after a seek.'''
+        with self.cond:
+            if self.next_get != frame:
+                self._seek(frame)
+
+    def get(self, frame: int):
+        '''The decoded commit of `frame`, or None if the log has no such frame.'''
+        with self.cond:
+            slot = self.slots[frame % self.depth]
+            if slot is None and self.next_get == frame and self._pending(frame):
+                # the read-ahead is on it: wait rather than decode it twice
+                self.stalls += 1
+                while self.slots[frame % self.depth] is None and self._pending(frame):
+                    self.cond.wait()
+                slot = self.slots[frame % self.depth]
+            if slot is not None and slot[0] == frame:
+                self.slots[frame % self.depth] = None
+                self.hits += 1
+                self.next_get = frame + 1
+                self.cond.notify_all()
+                _, decoded, error = slot
+                if error is not None:
+                    raise error
+                return decoded
+            # not prefetched: pause the read-ahead and let any in-flight decode
+            # finish, so `frame` is decoded before the ones after it (a delta
+            # codec needs them in order)
+            self.misses += 1
+            self._seek(None)
+            while self.inflight is not None:
+                self.cond.wait()
+        try:
+            self.reader.refresh()
+            data = self.reader.read(frame)
+            return None if data is None else self.decode(data)
+        finally:
+            with self.cond:
+                self._seek(frame + 1)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.stalls + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> str:
+        return (f'prefetch hit rate {self.hit_rate():.0%} '
+                f'({self.hits} hits, {self.stalls} stalls, {self.misses} misses)')
+
+    def close(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        self.thread.join()
@@ -12,6 +12,9 @@ from uipc.constitution import AffineBodyConstitution, StableNeoHookean
 from uipc.gui import SceneGUI
 from uipc.unit import MPa, GPa
 from asset_dir import AssetDir
+from commit_writer import CommitWriter
+from commit_log import CommitLog
+from attribute_diff import AttributeDiff
 
 Logger.set_level(Logger.Level.Warn)
 
@@ -77,6 +80,22 @@ g = ground(ground_height)
 ground_obj.geometries().create(g)
 
 scene_io = SceneIO(scene)
+
+# encoding and disk writes run on a background thread;
+# submit() only blocks when the writer falls max_pending commits behind.
+# all commits are appended to scene/commits.log, indexed by scene/commits.idx
+# (use commit_writer.FileSink(f'{output_path}/scene') for one file per frame).
+# every keyframe_interval frames a full keyframe is written too, so readers can seek
+# for compact binary commits pass encode=CommitCodec('zstd').encode (commit_codec.py)
+# and decode=CommitCodec('zstd').decode to Playback in client_get.py
+# a viewer that only draws the cubes can be sent a trimmed diff with
+# commit_filter=CommitFilter(scene_io.to_json(), objects=['abd', 'fem'], attributes=['position', 'transform'])
+# (with incremental = True below, AttributeDiff(..., objects=['abd', 'fem']) selects while diffing instead)
+# to stream to live viewers (client_stream.py) without touching the disk, use
+# CommitServer() from commit_stream.py as the sink instead of the CommitLog
+writer = CommitWriter(CommitLog(f'{output_path}/scene/commits'), max_pending=8,
+                      scene_io=scene_io, keyframe_interval=50)
+
 # --------------------------------------------------
 # save the scene to bson (binary json)
 scene_io.save(f'{output_path}/scene/scene0.bson')
@@ -84,27 +103,42 @@ scene_io.save(f'{output_path}/scene/scene0.bson')
 j = scene_io.to_json()
 # and pass on the json to anywhere you want
 # --------------------------------------------------
+# the initial scene is also keyframe 0 of the commit log
+writer.keyframe(0)
 
 world.init(scene)
 # record the snapshot of current scene
-# to create scene commit
-ss = SceneSnapshot(scene)
-
-while world.frame() < 1000:
-    world.advance()
-    world.retrieve()
-    path = f'{output_path}/scene/scene{world.frame()}.bson'
-    
-    # -------------------------------------------------------
-    # commit the scene update to a file
-    scene_io.commit(ss, path)
-    # OR use:
-    j = scene_io.commit_to_json(ss)
-    # and pass on the json to anywhere you want
-    # -------------------------------------------------------
-    
-    # update the scene snapshot
-    ss = SceneSnapshot(scene) 
-    print(f'frame {world.frame()} saved to {path}')
-
-print('finished!')
\ No newline at end of file
+# to create scene commit.
+# SceneSnapshot copies the whole scene and has to be rebuilt every frame;
+# AttributeDiff only follows the listed attributes and sends those that changed;
+# everything else (velocities, new objects, ...) never reaches the readers, so
+# only turn it on for viewers that draw positions and transforms alone
+incremental = False
+if incremental:
+    ss = AttributeDiff(scene, j, attributes=('position', 'transform'), objects=['abd', 'fem'])
+else:
+    ss = SceneSnapshot(scene)
+
+with writer:
+    while world.frame() < 1000:
+        world.advance()
+        world.retrieve()
+        if incremental:
+            # the simulation moved the cubes
+            ss.touch()
+        
+        # -------------------------------------------------------
+        # capture the scene update (and a keyframe when one is due)
+        # and hand it to the writer
+        writer.commit(world.frame(), ss)
+        # OR write it synchronously with:
+        # scene_io.commit(ss, f'{output_path}/scene/scene{world.frame()}.bson')
+        # -------------------------------------------------------
+        
+        # update the scene snapshot (an AttributeDiff updates itself)
+        if not incremental:
+            ss = SceneSnapshot(scene)
+
+print(f'finished! {writer.stats()}')
+if incremental:
+    print(f'{ss.attributes_sent} attributes sent in {ss.commits} commits')
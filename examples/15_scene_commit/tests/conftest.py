@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# the example's modules import each other as top level modules
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(EXAMPLE_DIR))
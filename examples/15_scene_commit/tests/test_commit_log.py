@@ -0,0 +1,45 @@
+from commit_log import INDEX_DTYPE, KEYFRAME, CommitLog, CommitLogReader
+
+
+def test_reader_indexes_every_entry(tmp_path):
+    with CommitLog(tmp_path / 'run') as log:
+        log.write(0, b'key0', KEYFRAME)
+        for frame in range(1, 6):
+            log.write(frame, f'commit{frame}'.encode())
+        log.write(4, b'key4', KEYFRAME)
+
+    reader = CommitLogReader(tmp_path / 'run')
+    assert len(reader) == 7
+    assert reader.frames() == [1, 2, 3, 4, 5]
+    assert reader.frames(KEYFRAME) == [0, 4]
+    assert reader.keyframe_before(3) == 0 and reader.keyframe_before(5) == 4
+    assert bytes(reader.read(3)) == b'commit3'
+    assert bytes(reader.read(4, KEYFRAME)) == b'key4'
+    assert reader.read(6) is None
+    reader.close()
+
+
+def test_reopened_log_keeps_its_index(tmp_path):
+    with CommitLog(tmp_path / 'run') as log:
+        log.write(1, b'one')
+    reader = CommitLogReader(tmp_path / 'run')
+    with CommitLog(tmp_path / 'run', append=True) as log:
+        log.write(2, b'two')
+    assert reader.refresh() == 1
+    assert [bytes(data) for _, data in reader.follow(1, timeout=0)] == [b'one', b'two']
+    reader.close()
+
+
+def test_torn_index_entry_is_ignored(tmp_path):
+    # a writer killed while writing an index entry leaves a partial entry behind
+    with CommitLog(tmp_path / 'run') as log:
+        log.write(1, b'one')
+        log.write(2, b'two')
+    reader = CommitLogReader(tmp_path / 'run')
+    with open(reader.idx_path, 'ab') as f:
+        f.write(b'\0' * (INDEX_DTYPE.itemsize // 2))
+    assert reader.refresh() == 0
+    reader.close()
+    reader = CommitLogReader(tmp_path / 'run')
+    assert reader.frames() == [1, 2]
+    reader.close()